@@ -0,0 +1,45 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+V2_PROGRAM = os.path.join(BASE_PATH, "엑셀취합프로그램 v2.1.0.py")
+
+
+@pytest.fixture(scope="session")
+def program():
+    """공백이 포함된 파일명의 v2 프로그램을 모듈로 로드"""
+    spec = importlib.util.spec_from_file_location("excel_consolidator", V2_PROGRAM)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    """'양식', '취합', '결과' 폴더가 있는 작업 폴더"""
+    for folder in ("양식", "취합", "결과"):
+        (tmp_path / folder).mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def make_consolidator(program, workdir):
+    """openpyxl 백엔드로 비대화형 취합기 생성 (종료 시 백엔드 정리)"""
+    backends = []
+
+    def make(**options):
+        backend = program.create_backend(name='openpyxl')
+        backends.append(backend)
+        consolidator = program.ExcelConsolidator(backend, base_path=str(workdir))
+        consolidator.interactive = False
+        for key, value in options.items():
+            setattr(consolidator, key, value)
+        return consolidator
+
+    yield make
+    for backend in backends:
+        backend.quit()
@@ -0,0 +1,85 @@
+import importlib.machinery
+import sys
+import types
+
+import pytest
+
+
+class FakeBook:
+    def __init__(self, path):
+        self.path = path
+
+
+class FakeBooks:
+    def __init__(self):
+        self.opened = []
+
+    def open(self, path):
+        self.opened.append(path)
+        return FakeBook(path)
+
+
+class FakeApp:
+    instances = []
+
+    def __init__(self, visible=False):
+        self.visible = visible
+        self.books = FakeBooks()
+        self.quit_count = 0
+        FakeApp.instances.append(self)
+
+    def quit(self):
+        self.quit_count += 1
+
+
+@pytest.fixture
+def fake_xlwings(monkeypatch):
+    FakeApp.instances = []
+    module = types.ModuleType('xlwings')
+    module.__spec__ = importlib.machinery.ModuleSpec('xlwings', None)
+    module.App = FakeApp
+    monkeypatch.setitem(sys.modules, 'xlwings', module)
+    return FakeApp
+
+
+def test_create_backend_uses_excel_when_available(program, fake_xlwings):
+    backend = program.create_backend(visible=True)
+    assert isinstance(backend, program.XlwingsBackend)
+    app = fake_xlwings.instances[0]
+    assert backend.app is app and app.visible
+
+    book = backend.open("양식.xlsx")
+    assert isinstance(book, program.XlwingsBook)
+    assert app.books.opened == ["양식.xlsx"]
+
+    backend.quit()
+    assert app.quit_count == 1
+
+
+def test_create_backend_quits_excel_when_wrapper_fails(program, fake_xlwings, monkeypatch):
+    def broken(app):
+        raise RuntimeError("wrapper failed")
+
+    monkeypatch.setattr(program, 'XlwingsBackend', broken)
+    backend = program.create_backend()
+    assert isinstance(backend, program.OpenpyxlBackend)
+    assert [app.quit_count for app in fake_xlwings.instances] == [1]
+
+
+def test_create_backend_openpyxl_by_name(program, fake_xlwings):
+    assert isinstance(program.create_backend(name='openpyxl'), program.OpenpyxlBackend)
+    assert fake_xlwings.instances == []
+
+
+def test_lazy_backend_starts_excel_on_first_open(program, fake_xlwings):
+    backend = program.LazyBackend(visible=True)
+    assert backend.name == 'xlwings'
+    assert fake_xlwings.instances == []
+
+    backend.open("양식.xlsx")
+    backend.open("답변.xlsx")
+    [app] = fake_xlwings.instances
+    assert app.visible and app.books.opened == ["양식.xlsx", "답변.xlsx"]
+
+    backend.quit()
+    assert app.quit_count == 1
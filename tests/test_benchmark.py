@@ -0,0 +1,49 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BASE_PATH
+
+BENCHMARK = os.path.join(BASE_PATH, "엑셀취합프로그램 벤치마크.py")
+
+
+@pytest.fixture(scope="module")
+def benchmark():
+    spec = importlib.util.spec_from_file_location("excel_benchmark", BENCHMARK)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_generated_workload_layout(benchmark, tmp_path):
+    config = {
+        'files': 3, 'sheets': 2, 'rows': 6, 'cols': 5, 'fill_density': 0.5, 'formula_rate': 0.1,
+        'merged': 1, 'conflict_rate': 0.0, 'seed': 0,
+    }
+    benchmark.generate_position_workload(str(tmp_path), config)
+    assert os.listdir(tmp_path / "양식") == ["양식.xlsx"]
+    assert sorted(os.listdir(tmp_path / "취합")) == ["답변_0001.xlsx", "답변_0002.xlsx", "답변_0003.xlsx"]
+
+
+def test_compare_with_baseline_flags_slower_modes(benchmark, tmp_path):
+    baseline = tmp_path / "기준.json"
+    baseline.write_text(json.dumps({'results': {'append': {'wall_time': 1.0}, 'concat': {'wall_time': 1.0}}}), encoding='utf-8')
+    results = {'append': {'wall_time': 1.1}, 'concat': {'wall_time': 1.5}, 'v1': {'wall_time': 9.0}}
+    assert benchmark.compare_with_baseline(results, str(baseline), tolerance=0.2) == ['concat']
+
+
+def test_benchmark_saves_and_compares_baseline(tmp_path):
+    baseline = tmp_path / "기준.json"
+    small = ["--modes", "append,concat", "--files", "3", "--sheets", "1", "--rows", "5", "--cols", "4"]
+    subprocess.run([sys.executable, BENCHMARK, *small, "--save", str(baseline)], check=True, capture_output=True)
+    report = json.loads(baseline.read_text(encoding='utf-8'))
+    assert set(report['results']) == {'append', 'concat'}
+    assert report['results']['append']['counts']['processed_files'] >= 1
+
+    completed = subprocess.run([sys.executable, BENCHMARK, *small, "--compare", str(baseline), "--tolerance", "100"],
+                               capture_output=True)
+    assert completed.returncode == 0
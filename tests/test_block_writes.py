@@ -0,0 +1,45 @@
+import os
+
+import openpyxl
+
+
+class RecordingSheet:
+    """결과 시트 대신 블록 쓰기/채우기 호출을 기록"""
+    def __init__(self):
+        self.writes = []
+        self.fills = []
+
+    def write_values(self, row, col, values):
+        self.writes.append((row, col, values))
+
+    def fill(self, row1, col1, row2, col2, rgb_color):
+        self.fills.append((row1, col1, row2, col2, rgb_color))
+
+
+def test_coalesce_blocks_groups_rectangles(program, workdir):
+    consolidator = program.ExcelConsolidator(program.OpenpyxlBackend(), base_path=str(workdir))
+    cells = {(1, 1), (1, 2), (2, 1), (2, 2), (5, 3), (3, 1)}
+    assert sorted(consolidator.coalesce_blocks(cells)) == [(1, 1, 2, 2), (3, 1, 3, 1), (5, 3, 5, 3)]
+    assert consolidator.coalesce_blocks(set()) == []
+
+
+def test_changes_and_reverts_are_written_as_blocks(program, workdir, make_consolidator):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "시트1"
+    ws["A1"], ws["B1"] = "항목1", "항목2"
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+    consolidator = make_consolidator()
+    template_fp = consolidator.load_template_fingerprint(template_file)
+
+    sheet = RecordingSheet()
+    changes = {"$A$2": 1, "$B$2": 2, "$A$3": 3, "$B$3": 4, "$D$9": "끝"}
+    consolidator.apply_changes_to_template(sheet, changes)
+    assert sheet.writes == [(2, 1, [[1, 2], [3, 4]]), (9, 4, [["끝"]])]
+    assert [fill[:4] for fill in sheet.fills] == [(2, 1, 3, 2), (9, 4, 9, 4)]
+
+    sheet = RecordingSheet()
+    consolidator.revert_changes(sheet, template_fp.sheets["시트1"], ["$A$1", "$B$1", "$A$2", "$B$2"])
+    assert sheet.writes == [(1, 1, [["항목1", "항목2"], [None, None]])]
+    assert len(sheet.fills) == 1
@@ -0,0 +1,117 @@
+import os
+import shutil
+from datetime import date, datetime, time
+
+import openpyxl
+import pytest
+
+EXCEL_ERRORS = {'#N/A', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#NULL!'}
+
+
+@pytest.fixture
+def xlwings_style_backend(program):
+    """xlwings처럼 값을 읽는 백엔드: 시간만 있는 셀은 1899-12-30 날짜, 오류 셀은 None"""
+    def as_xlwings(value):
+        if isinstance(value, time):
+            return datetime.combine(date(1899, 12, 30), value)
+        if isinstance(value, str) and value in EXCEL_ERRORS:
+            return None
+        return value
+
+    class Sheet(program.OpenpyxlSheet):
+        def read_range(self, row1, col1, row2, col2):
+            return [[as_xlwings(value) for value in row] for row in super().read_range(row1, col1, row2, col2)]
+
+    class Book(program.OpenpyxlBook):
+        def sheet(self, name):
+            super().sheet(name)
+            return Sheet(self, name)
+
+    class Backend(program.OpenpyxlBackend):
+        name = 'xlwings'
+
+        def open(self, path):
+            return Book(path)
+
+    return Backend()
+
+
+def test_auto_engine_compares_xlwings_values_with_xlwings_values(program, workdir, xlwings_style_backend):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "시트1"
+    ws["A1"] = "항목"
+    ws["B2"] = time(9, 30)
+    ws["C2"] = "#N/A"
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+    answer_file = os.path.join(workdir, "취합", "답변.xlsx")
+    shutil.copy(template_file, answer_file)
+    wb = openpyxl.load_workbook(answer_file)
+    wb["시트1"]["D2"] = 1
+    wb.save(answer_file)
+
+    consolidator = program.ExcelConsolidator(xlwings_style_backend, base_path=str(workdir))
+    assert not consolidator.use_xml_engine(answer_file)
+    template_fp = consolidator.load_template_fingerprint(template_file)
+    result = consolidator.extract_file_changes(answer_file, template_fp)
+    assert result['changes_by_sheet'] == {"시트1": {"$D$2": 1}}
+
+
+def test_auto_engine_uses_xml_under_openpyxl(program, workdir):
+    consolidator = program.ExcelConsolidator(program.OpenpyxlBackend(), base_path=str(workdir))
+    wb = openpyxl.Workbook()
+    path = os.path.join(workdir, "취합", "답변.xlsx")
+    wb.save(path)
+    assert consolidator.use_xml_engine(path)
+
+
+def test_compare_rules_keep_bool_apart_from_numbers(program):
+    rules = program.CompareRules()
+    assert not rules.same(True, 1)
+    assert not rules.same(1.0, True)
+    assert not rules.same(False, 0)
+    assert rules.same(True, True)
+    assert rules.same(1, 1.0)
+
+
+@pytest.mark.parametrize("engine", ['xml', 'block'])
+def test_checkbox_changed_to_number_is_a_change(program, workdir, make_consolidator, engine):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "시트1"
+    ws["A1"] = "항목"
+    ws["B2"] = True
+    ws["C2"] = 0
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+    answer_file = os.path.join(workdir, "취합", "답변.xlsx")
+    wb = openpyxl.load_workbook(template_file)
+    wb["시트1"]["B2"] = 1
+    wb["시트1"]["C2"] = False
+    wb.save(answer_file)
+
+    consolidator = make_consolidator(compare_engine=engine)
+    template_fp = consolidator.load_template_fingerprint(template_file)
+    result = consolidator.extract_file_changes(answer_file, template_fp)
+    assert result['changes_by_sheet'] == {"시트1": {"$B$2": 1, "$C$2": False}}
+
+
+def test_block_compare_skips_formulas_and_reads_past_template_range(program, workdir, make_consolidator):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "시트1"
+    ws["A1"], ws["B1"] = "항목", "합계"
+    ws["A2"], ws["B2"] = 1, "=A2*2"
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+    answer_file = os.path.join(workdir, "취합", "답변.xlsx")
+    wb["시트1"]["A2"] = 5
+    wb["시트1"]["B2"] = 99      # 수식 셀은 비교하지 않음
+    wb["시트1"]["D4"] = "추가"   # 양식 사용 범위 밖
+    wb.save(answer_file)
+
+    consolidator = make_consolidator(compare_engine='block')
+    template_fp = consolidator.load_template_fingerprint(template_file)
+    result = consolidator.extract_file_changes(answer_file, template_fp)
+    assert result['changes_by_sheet'] == {"시트1": {"$A$2": 5, "$D$4": "추가"}}
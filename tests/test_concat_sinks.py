@@ -0,0 +1,134 @@
+import os
+import sqlite3
+
+import openpyxl
+import pandas as pd
+import pytest
+
+
+def make_flaky_sink(program, fail_times):
+    class Sink(program.ConcatSink):
+        def __init__(self):
+            super().__init__(['a'], batch_rows=2)
+            self.failures = fail_times
+            self.written = []
+
+        def write_batch(self, df):
+            if self.failures:
+                self.failures -= 1
+                raise OSError("disk full")
+            self.written.extend(df['a'].tolist())
+
+    return Sink()
+
+
+def test_flush_failure_keeps_rows_already_accepted(program):
+    sink = make_flaky_sink(program, fail_times=1)
+    sink.append(pd.DataFrame({'a': [1]}))
+    with pytest.raises(OSError):
+        sink.append(pd.DataFrame({'a': [2]}))     # 이 파일의 행만 빠짐
+    sink.append(pd.DataFrame({'a': [3]}))
+    sink.close()
+    assert sink.written == [1, 3]
+
+
+def make_concat_workload(workdir, answers, start_col=1):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "시트1"
+    ws["A1"] = "제출 목록"
+    ws.cell(3, start_col).value, ws.cell(3, start_col + 1).value = "이름", "금액"
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+    for filename, rows in answers.items():
+        wb = openpyxl.load_workbook(template_file)
+        for r, row in enumerate(rows, 4):
+            for c, value in enumerate(row, start_col):
+                wb["시트1"].cell(r, c).value = value
+        wb.save(os.path.join(workdir, "취합", filename))
+
+
+def test_parquet_rejects_mismatched_file_without_dropping_accepted_rows(workdir, make_consolidator):
+    pytest.importorskip("pyarrow")
+    make_concat_workload(workdir, {
+        "f1.xlsx": [("가", 1), ("가", 11)],     # 첫 배치: 금액 칼럼 스키마 결정
+        "f2.xlsx": [("나", 2)],
+        "f3.xlsx": [("다", "미정")],     # 숫자 칼럼에 문자열
+        "f4.xlsx": [("라", 4)],
+    })
+    consolidator = make_consolidator(start_cell="A3", concat_outputs=('parquet',), concat_batch_rows=2)
+    consolidator.concat_files()
+
+    df = pd.read_parquet(os.path.join(workdir, "결과", "취합결과_시트1.parquet"))
+    assert df['출처 파일명'].tolist() == ["f1.xlsx", "f1.xlsx", "f2.xlsx", "f4.xlsx"]
+    assert df['금액'].tolist() == [1.0, 11.0, 2.0, 4.0]
+    assert consolidator.error_files == ["f3.xlsx"]
+    assert consolidator.processed_files == ["f1.xlsx", "f2.xlsx", "f4.xlsx"]
+
+
+def test_concat_start_cell_outside_column_a(workdir, make_consolidator):
+    make_concat_workload(workdir, {"f1.xlsx": [("가", 1)], "f2.xlsx": [("나", 2)]}, start_col=2)
+    consolidator = make_consolidator(start_cell="B3", concat_outputs=('xlsx', 'csv', 'sqlite'))
+    consolidator.concat_files()
+
+    ws = openpyxl.load_workbook(os.path.join(workdir, "결과", "취합결과.xlsx"))["시트1"]
+    rows = [list(row) for row in ws.iter_rows(min_row=3, max_col=4, values_only=True)]
+    assert rows == [[None, "이름", "금액", None], [None, "가", 1, "f1.xlsx"], [None, "나", 2, "f2.xlsx"]]
+
+    df = pd.read_csv(os.path.join(workdir, "결과", "취합결과_시트1.csv"), encoding='utf-8-sig')
+    assert df.columns.tolist() == ["이름", "금액", "출처 파일명"]
+
+    conn = sqlite3.connect(os.path.join(workdir, "결과", "취합결과.sqlite3"))
+    try:
+        columns = [row[1] for row in conn.execute('PRAGMA table_info("시트1")')]
+    finally:
+        conn.close()
+    assert columns == ["이름", "금액", "출처 파일명"]
+
+
+@pytest.mark.parametrize("failing, expected_error", [(0, True), (1, False)])
+def test_fanout_retry_after_partial_failure_writes_each_row_once(program, failing, expected_error):
+    sinks = [make_flaky_sink(program, fail_times=0), make_flaky_sink(program, fail_times=0)]
+    sinks[failing].failures = 1
+    fanout = program.FanoutSink(sinks, ['a'], batch_rows=2)
+    fanout.append(pd.DataFrame({'a': [1]}))
+    if expected_error:      # 어느 싱크에도 쓰이지 않은 파일은 제외
+        with pytest.raises(OSError):
+            fanout.append(pd.DataFrame({'a': [2]}))
+    else:                   # 첫 싱크에 이미 쓰인 파일은 받아들이고 두 번째 싱크는 다음 배치에서 씀
+        fanout.append(pd.DataFrame({'a': [2]}))
+    fanout.append(pd.DataFrame({'a': [3]}))
+    fanout.close()
+
+    expected = [1, 3] if expected_error else [1, 2, 3]
+    assert [sink.written for sink in sinks] == [expected, expected]
+    assert [sink.total_rows for sink in sinks] == [len(expected), len(expected)]
+
+
+def test_streamed_xlsx_rolls_over_full_sheets_with_header(workdir, make_consolidator):
+    make_concat_workload(workdir, {
+        "f1.xlsx": [("가", 1), ("가", 2)],
+        "f2.xlsx": [("나", 3), ("나", 4)],
+        "f3.xlsx": [("다", 5)],
+    })
+    wb = openpyxl.load_workbook(os.path.join(workdir, "양식", "양식.xlsx"))
+    ws = wb["시트1"]
+    ws.merge_cells("A1:B1")
+    ws.column_dimensions["A"].width = 30
+    wb.save(os.path.join(workdir, "양식", "양식.xlsx"))
+
+    # 헤더 3행 + 데이터 2행 = 시트당 5행
+    consolidator = make_consolidator(start_cell="A3", concat_sheet_rows=5, concat_batch_rows=3)
+    consolidator.concat_files()
+
+    wb = openpyxl.load_workbook(os.path.join(workdir, "결과", "취합결과.xlsx"))
+    assert wb.sheetnames == ["시트1", "시트1_2", "시트1_3"]
+    data = []
+    for ws in wb.worksheets:
+        assert ws["A1"].value == "제출 목록"
+        assert [str(merged) for merged in ws.merged_cells.ranges] == ["A1:B1"]
+        assert ws.column_dimensions["A"].width == 30
+        assert [ws["A3"].value, ws["B3"].value] == ["이름", "금액"]
+        assert ws.max_row <= 5
+        data += [list(row) for row in ws.iter_rows(min_row=4, max_col=3, values_only=True)]
+    assert data == [["가", 1, "f1.xlsx"], ["가", 2, "f1.xlsx"], ["나", 3, "f2.xlsx"], ["나", 4, "f2.xlsx"], ["다", 5, "f3.xlsx"]]
@@ -0,0 +1,62 @@
+def test_find_conflicts_reports_every_overlap_with_its_owner(program):
+    index = program.ConflictIndex()
+    index.record("시트1", {"$A$1": 1, "$B$2": 2}, "a.xlsx")
+    index.record("시트1", {"$C$3": 3}, "b.xlsx")
+    index.record("시트2", {"$A$1": 4}, "b.xlsx")
+
+    assert index.find_conflicts("시트1", {"$A$1": 9, "$C$3": 9, "$D$4": 9}) == {"$A$1": "a.xlsx", "$C$3": "b.xlsx"}
+    assert index.find_conflicts("없는 시트", {"$A$1": 9}) == {}
+
+
+def test_remove_owner_clears_only_that_files_cells(program):
+    index = program.ConflictIndex()
+    index.record("시트1", {"$B$2": 2, "$A$1": 1}, "a.xlsx")
+    index.record("시트1", {"$C$3": 3}, "b.xlsx")
+    index.record("시트2", {"$A$1": 4}, "a.xlsx")
+
+    assert index.remove_owner("a.xlsx") == {"시트1": ["$A$1", "$B$2"], "시트2": ["$A$1"]}
+    assert index.get("시트1", "$A$1") is None
+    assert index.get("시트1", "$C$3") == ("b.xlsx", 3)
+    assert index.remove_owner("a.xlsx") == {}
+    assert index.remove_owner("없는 파일.xlsx") == {}
+    assert len(index) == 1
+
+
+def test_keys_are_distinct_at_the_last_column(program):
+    # XFD = 16384번째 열: 열 번호가 14비트를 꽉 채워도 다음 행 A열과 겹치지 않음
+    assert program._address_to_key("$XFD$1") != program._address_to_key("$A$2")
+    for address in ("$A$1", "$XFD$1", "$A$2", "$XFD$1048576"):
+        assert program._key_to_address(program._address_to_key(address)) == address
+
+    index = program.ConflictIndex()
+    index.record("시트1", {"$XFD$1": "끝"}, "a.xlsx")
+    index.record("시트1", {"$A$2": "처음"}, "b.xlsx")
+    assert index.find_conflicts("시트1", {"$XFD$1": 0, "$A$2": 0}) == {"$XFD$1": "a.xlsx", "$A$2": "b.xlsx"}
+
+
+def test_snapshot_round_trip_and_reused_slots(program):
+    index = program.ConflictIndex()
+    index.record("시트1", {"$A$1": 1, "$B$1": True}, "a.xlsx")
+    index.remove_owner("a.xlsx")
+    index.record("시트1", {"$C$1": 3}, "b.xlsx")     # 지운 칸 재사용
+    index.record("시트2", {"$XFD$1048576": "끝"}, "b.xlsx")
+
+    restored = program.ConflictIndex.from_bytes(index.to_bytes())
+    assert restored.to_dict() == index.to_dict() == {
+        "시트1": {"$C$1": {'filename': "b.xlsx", 'value': 3}},
+        "시트2": {"$XFD$1048576": {'filename': "b.xlsx", 'value': "끝"}},
+    }
+    assert restored.remove_owner("b.xlsx") == {"시트1": ["$C$1"], "시트2": ["$XFD$1048576"]}
+
+
+def test_state_store_ignores_stale_snapshot(program, tmp_path):
+    state = program.StateStore(str(tmp_path / "state.sqlite3"))
+    state.add_file("a.xlsx", "h1", "c1", {"시트1": {"$A$1": 1}})
+    state.save_snapshot(state.load_index().to_bytes())
+    state.add_file("b.xlsx", "h2", "c2", {"시트1": {"$B$1": 2}})     # 스냅샷 이후 변경
+
+    assert state.load_index().to_dict() == {"시트1": {
+        "$A$1": {'filename': "a.xlsx", 'value': 1},
+        "$B$1": {'filename': "b.xlsx", 'value': 2},
+    }}
+    state.close()
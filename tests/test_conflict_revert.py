@@ -0,0 +1,47 @@
+import os
+import shutil
+
+import openpyxl
+import pytest
+
+from test_defer_result import make_answer, make_template
+
+
+class Crash(BaseException):
+    """실행 중단 흉내 (except Exception에 잡히지 않음)"""
+
+
+def test_revert_survives_crash_while_moving_origin_file(program, workdir, make_consolidator, monkeypatch):
+    template_file = make_template(workdir)
+    make_answer(workdir, template_file, "답변1.xlsx", {(2, 2): 1})
+    first = make_consolidator()
+    first.append_to_template_position()
+    assert openpyxl.load_workbook(first.result_file)["시트1"]["B2"].value == 1
+
+    # 2회차: 충돌로 원본 파일을 되돌리다가 원본 파일 이동 중에 멈춤
+    make_answer(workdir, template_file, "답변2.xlsx", {(2, 2): 2})
+    crashed = make_consolidator()
+    crashed.metrics = program.RunMetrics('append')
+    input_files = crashed.open_session()
+    move = shutil.move
+
+    def crash_on_origin(src, dst):
+        if os.path.basename(src) == "답변1.xlsx":
+            raise Crash()
+        return move(src, dst)
+
+    monkeypatch.setattr(program.shutil, "move", crash_on_origin)
+    with pytest.raises(Crash):
+        crashed.process_files(input_files)
+    crashed.state.close()
+    monkeypatch.setattr(program.shutil, "move", move)
+
+    state = program.StateStore(crashed.state_file)
+    assert state.file_hash("답변1.xlsx") is None
+    assert state.dirty_cells() == {"시트1": ["$B$2"]}
+    state.close()
+
+    # 3회차: dirty 재반영으로 결과 파일의 되돌리지 못한 셀 복구
+    resumed = make_consolidator()
+    resumed.append_to_template_position()
+    assert openpyxl.load_workbook(resumed.result_file)["시트1"]["B2"].value is None
@@ -0,0 +1,62 @@
+import os
+
+import openpyxl
+
+
+def make_template(workdir):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "시트1"
+    for c in range(1, 6):
+        ws.cell(1, c).value = f"항목{c}"
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+    return template_file
+
+
+def make_answer(workdir, template_file, filename, cells):
+    wb = openpyxl.load_workbook(template_file)
+    for (row, col), value in cells.items():
+        wb["시트1"].cell(row, col).value = value
+    wb.save(os.path.join(workdir, "취합", filename))
+
+
+def test_defer_result_resumes_after_crash_before_result_file(program, workdir, make_consolidator):
+    template_file = make_template(workdir)
+    first_cells = {(r, c): r * 10 + c for r in range(2, 6) for c in range(1, 4)}
+    make_answer(workdir, template_file, "답변1.xlsx", first_cells)
+
+    # 1회차: 파일을 받아들인 뒤 결과 파일을 만들기 전에 멈춤
+    crashed = make_consolidator(defer_result=True)
+    crashed.metrics = program.RunMetrics('append')
+    crashed.process_files(crashed.open_session())
+    crashed.state.close()
+    assert os.path.exists(os.path.join(workdir, "취합", "_처리완료", "답변1.xlsx"))
+    assert not os.path.exists(crashed.result_file)
+
+    # 2회차: 상태에서 이어서 취합
+    make_answer(workdir, template_file, "답변2.xlsx", {(7, 1): "추가"})
+    resumed = make_consolidator(defer_result=True)
+    resumed.append_to_template_position()
+
+    ws = openpyxl.load_workbook(resumed.result_file)["시트1"]
+    for (row, col), value in first_cells.items():
+        assert ws.cell(row, col).value == value
+    assert ws.cell(7, 1).value == "추가"
+
+
+def test_defer_result_starts_new_round_when_result_file_deleted(workdir, make_consolidator):
+    template_file = make_template(workdir)
+    make_answer(workdir, template_file, "round1.xlsx", {(2, 2): 1})
+    first = make_consolidator(defer_result=True)
+    first.append_to_template_position()
+    assert openpyxl.load_workbook(first.result_file)["시트1"]["B2"].value == 1
+
+    # 새 회차: 결과 파일을 지우고 같은 셀에 다른 값 제출
+    os.remove(first.result_file)
+    make_answer(workdir, template_file, "round2.xlsx", {(2, 2): 5})
+    second = make_consolidator(defer_result=True)
+    second.append_to_template_position()
+
+    assert second.conflict_files == []
+    assert openpyxl.load_workbook(second.result_file)["시트1"]["B2"].value == 5
@@ -0,0 +1,56 @@
+import glob
+import json
+import os
+import shutil
+
+import openpyxl
+
+
+def test_dry_run_reports_identical_resubmission_as_duplicate(workdir, make_consolidator):
+    wb = openpyxl.Workbook()
+    wb.active.title = "시트1"
+    wb.active["A1"] = "항목"
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+    wb["시트1"]["B2"] = 1
+    wb.save(os.path.join(workdir, "취합", "a.xlsx"))
+    shutil.copy(os.path.join(workdir, "취합", "a.xlsx"), os.path.join(workdir, "취합", "b.xlsx"))   # 같은 파일 재제출
+    wb["시트1"]["B2"] = 2
+    wb.save(os.path.join(workdir, "취합", "c.xlsx"))
+
+    make_consolidator().dry_run_conflicts()
+
+    [report_file] = glob.glob(os.path.join(workdir, "결과", "충돌점검_*.json"))
+    with open(report_file, encoding='utf-8') as f:
+        report = json.load(f)
+    assert [(pair['file_a'], pair['file_b']) for pair in report['pairs']] == [("a.xlsx", "c.xlsx")]
+    assert report['duplicates'] == [{'filename': "b.xlsx", 'original': "a.xlsx", 'consolidated': False}]
+    assert report['summary']['duplicate_files'] == 1
+    assert sorted(os.listdir(os.path.join(workdir, "취합"))) == ["_처리완료", "a.xlsx", "b.xlsx", "c.xlsx"]
+
+
+def test_dry_run_reports_resubmission_of_consolidated_file_without_writing_state(workdir, make_consolidator):
+    wb = openpyxl.Workbook()
+    wb.active.title = "시트1"
+    wb.active["A1"] = "항목"
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+    wb["시트1"]["B2"] = 1
+    wb.save(os.path.join(workdir, "취합", "a.xlsx"))
+    make_consolidator().append_to_template_position()
+
+    # 이미 취합된 파일을 다른 이름으로 다시 제출
+    shutil.copy(os.path.join(workdir, "취합", "_처리완료", "a.xlsx"), os.path.join(workdir, "취합", "a(최종).xlsx"))
+    result_folder = os.path.join(workdir, "결과")
+    state_files = {name: os.path.getmtime(os.path.join(result_folder, name))
+                   for name in os.listdir(result_folder) if name.startswith("consolidation_state")}
+
+    make_consolidator().dry_run_conflicts()
+
+    [report_file] = glob.glob(os.path.join(result_folder, "충돌점검_*.json"))
+    with open(report_file, encoding='utf-8') as f:
+        report = json.load(f)
+    assert report['pairs'] == []
+    assert report['duplicates'] == [{'filename': "a(최종).xlsx", 'original': "a.xlsx", 'consolidated': True}]
+    assert {name: os.path.getmtime(os.path.join(result_folder, name))
+            for name in os.listdir(result_folder) if name.startswith("consolidation_state")} == state_files
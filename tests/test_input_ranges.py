@@ -0,0 +1,76 @@
+import os
+
+import openpyxl
+from openpyxl.styles import Protection
+from openpyxl.worksheet.datavalidation import DataValidation
+
+
+def make_template(workdir, protect):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "시트1"
+    for c in range(1, 6):
+        ws.cell(1, c).value = f"항목{c}"
+    validation = DataValidation(type="list", formula1='"예,아니오"')
+    ws.add_data_validation(validation)
+    validation.add("B2")
+    if protect:
+        for row in (2, 3):
+            ws.cell(row, 2).protection = Protection(locked=False)
+        ws.protection.sheet = True
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+    return template_file
+
+
+def consolidate(workdir, template_file, make_consolidator, cells):
+    wb = openpyxl.load_workbook(template_file)
+    for (row, col), value in cells.items():
+        wb["시트1"].cell(row, col).value = value
+    wb.save(os.path.join(workdir, "취합", "답변.xlsx"))
+
+    consolidator = make_consolidator()
+    consolidator.append_to_template_position()
+    return openpyxl.load_workbook(consolidator.result_file)["시트1"]
+
+
+def test_unprotected_template_with_dropdown_compares_all_cells(workdir, make_consolidator):
+    template_file = make_template(workdir, protect=False)
+    assert make_consolidator().read_input_ranges(template_file) is None
+
+    ws = consolidate(workdir, template_file, make_consolidator, {(2, 2): "예", (3, 3): 30, (4, 4): "메모"})
+    assert (ws["B2"].value, ws["C3"].value, ws["D4"].value) == ("예", 30, "메모")
+
+
+def test_protected_template_compares_unlocked_cells_only(workdir, make_consolidator):
+    template_file = make_template(workdir, protect=True)
+    assert make_consolidator().read_input_ranges(template_file) == {"시트1": [(2, 2, 3, 2), (2, 2, 2, 2)]}
+
+    ws = consolidate(workdir, template_file, make_consolidator, {(2, 2): "예", (3, 2): 5, (4, 4): "메모"})
+    assert (ws["B2"].value, ws["B3"].value, ws["D4"].value) == ("예", 5, None)
+
+
+def test_protected_sheet_without_unlocked_cells_is_skipped(workdir, make_consolidator):
+    wb = openpyxl.Workbook()
+    for sheet_idx in range(2):
+        ws = wb.active if sheet_idx == 0 else wb.create_sheet()
+        ws.title = f"시트{sheet_idx + 1}"
+        ws["A1"] = "항목"
+        ws.protection.sheet = True
+    wb["시트1"]["B2"].protection = Protection(locked=False)
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+
+    consolidator = make_consolidator()
+    assert consolidator.read_input_ranges(template_file) == {"시트1": [(2, 2, 2, 2)], "시트2": []}
+    assert not consolidator.load_template_fingerprint(template_file).sheets["시트2"].has_inputs
+
+    wb = openpyxl.load_workbook(template_file)
+    wb["시트1"]["B2"] = "입력"
+    wb["시트2"]["C3"] = "잠긴 셀"
+    wb.save(os.path.join(workdir, "취합", "답변.xlsx"))
+    consolidator.append_to_template_position()
+
+    result_wb = openpyxl.load_workbook(consolidator.result_file)
+    assert result_wb["시트1"]["B2"].value == "입력"
+    assert result_wb["시트2"]["C3"].value is None
@@ -0,0 +1,40 @@
+import csv
+import glob
+import json
+import os
+
+from test_defer_result import make_answer, make_template
+
+
+def test_append_writes_report_with_counters_per_file(workdir, make_consolidator):
+    template_file = make_template(workdir)
+    make_answer(workdir, template_file, "답변1.xlsx", {(2, 1): 1, (2, 2): 2})
+    make_answer(workdir, template_file, "답변2.xlsx", {(2, 2): 3})     # 답변1과 충돌
+    consolidator = make_consolidator()
+    consolidator.append_to_template_position()
+
+    [json_file] = glob.glob(os.path.join(workdir, "결과", "취합보고서_append_*.json"))
+    with open(json_file, encoding='utf-8') as f:
+        report = json.load(f)
+    assert report['mode'] == 'append'
+    assert report['summary']['input_files'] == 2
+    assert report['totals']['conflicts'] == 1
+    assert report['totals']['reverts'] == 2
+    records = {(row['filename'], row['sheet']): row for row in report['records']}
+    assert records[("답변1.xlsx", "시트1")]['cells_changed'] == 2
+    assert records[("답변2.xlsx", "시트1")]['conflicts'] == 1
+    assert records[("", "")]['template'] > 0
+
+    with open(json_file[:-5] + '.csv', encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [(row['filename'], row['sheet']) for row in rows] == [(row['filename'], row['sheet']) for row in report['records']]
+
+
+def test_progress_prints_throughput_on_last_file(program, capsys):
+    metrics = program.RunMetrics('append', progress_interval=3600)
+    metrics.start_files(2)
+    metrics.add('cells_scanned', 100, "a.xlsx", "시트1")
+    metrics.progress(1)     # 간격 전에는 출력 안 함
+    assert capsys.readouterr().out == ""
+    metrics.progress(2)
+    assert "2/2 파일" in capsys.readouterr().out
@@ -0,0 +1,28 @@
+import os
+
+import openpyxl
+
+
+def test_template_cache_is_kept_per_backend(program, workdir, monkeypatch):
+    wb = openpyxl.Workbook()
+    wb.active["A1"] = "항목"
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+
+    class OtherBackend(program.OpenpyxlBackend):
+        name = 'xlwings'
+
+    built = []
+    build = program.ExcelConsolidator.build_template_fingerprint
+
+    def counting_build(self, *args):
+        built.append(self.backend.name)
+        return build(self, *args)
+
+    monkeypatch.setattr(program.ExcelConsolidator, 'build_template_fingerprint', counting_build)
+    for backend in (program.OpenpyxlBackend(), OtherBackend(), program.OpenpyxlBackend(), OtherBackend()):
+        fingerprint = program.ExcelConsolidator(backend, base_path=str(workdir)).load_template_fingerprint(template_file)
+        assert fingerprint.backend_name == backend.name
+
+    assert built == ['openpyxl', 'xlwings']
+    assert len(os.listdir(os.path.join(workdir, "결과", "_캐시"))) == 2
@@ -0,0 +1,41 @@
+import os
+
+import openpyxl
+import pandas as pd
+
+from test_concat_sinks import make_concat_workload
+
+
+def save_with_raw_sheet(path, raw_value):
+    wb = openpyxl.load_workbook(path)
+    wb.create_sheet("원자료")["A1"] = raw_value
+    wb.save(path)
+
+
+def test_content_hash_reads_template_sheets_only(workdir, make_consolidator):
+    make_concat_workload(workdir, {"a.xlsx": [("가", 1)], "b.xlsx": [("가", 1)]})
+    a, b = (os.path.join(workdir, "취합", name) for name in ("a.xlsx", "b.xlsx"))
+    consolidator = make_consolidator()
+    plain_hash = consolidator.content_hash(a)
+    assert consolidator.content_hash(a, ["시트1"]) == plain_hash     # 추가 시트가 없으면 기존 해시와 같음
+
+    save_with_raw_sheet(a, "원자료 1")
+    save_with_raw_sheet(b, "원자료 2")
+    assert consolidator.content_hash(a, ["시트1"]) == consolidator.content_hash(b, ["시트1"]) == plain_hash
+    assert consolidator.content_hash(a) != consolidator.content_hash(b)
+
+
+def test_concat_skips_extra_sheets_and_rejects_missing_ones(workdir, make_consolidator):
+    make_concat_workload(workdir, {"a.xlsx": [("가", 1)], "b.xlsx": [("나", 2)]})
+    save_with_raw_sheet(os.path.join(workdir, "취합", "a.xlsx"), "원자료")
+    wb = openpyxl.load_workbook(os.path.join(workdir, "취합", "b.xlsx"))
+    wb["시트1"].title = "이름 바꾼 시트"
+    wb.save(os.path.join(workdir, "취합", "b.xlsx"))
+
+    consolidator = make_consolidator(start_cell="A3", concat_outputs=('csv',))
+    consolidator.concat_files()
+
+    assert consolidator.processed_files == ["a.xlsx"]
+    assert consolidator.error_files == ["b.xlsx"]
+    df = pd.read_csv(os.path.join(workdir, "결과", "취합결과_시트1.csv"), encoding='utf-8-sig')
+    assert df.values.tolist() == [["가", 1, "a.xlsx"]]
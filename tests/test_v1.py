@@ -0,0 +1,90 @@
+import importlib.util
+import os
+
+import openpyxl
+import pytest
+
+from conftest import BASE_PATH
+
+V1_PROGRAM = os.path.join(BASE_PATH, "엑셀취합프로그램(동일위치) v1.0.0.py")
+
+
+@pytest.fixture(scope="module")
+def v1():
+    spec = importlib.util.spec_from_file_location("excel_consolidator_v1", V1_PROGRAM)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_v1_workload(tmp_path, answers):
+    """양식(병합된 제목 A1:C1, 병합된 입력 칸 B3:C4)과 답변 파일 생성"""
+    for folder in ("양식", "취합"):
+        (tmp_path / folder).mkdir()
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws["A1"] = "제목"
+    ws.merge_cells("A1:C1")
+    ws.merge_cells("B3:C4")
+    ws["A2"], ws["D2"] = "항목", "=A2"
+    template_file = tmp_path / "양식" / "양식.xlsx"
+    wb.save(template_file)
+    for filename, cells in answers.items():
+        wb = openpyxl.load_workbook(template_file)
+        for coord, value in cells.items():
+            wb.active[coord] = value
+        wb.save(tmp_path / "취합" / filename)
+
+
+def test_merged_index_finds_anchor_by_row_and_column(v1):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.merge_cells("B2:D3")
+    ws.merge_cells("F2:F4")
+    merged_index = v1.build_merged_index(ws)
+
+    assert v1.merged_anchor(merged_index, 3, 4) == (2, 2)
+    assert v1.merged_anchor(merged_index, 4, 6) == (2, 6)
+    assert v1.merged_anchor(merged_index, 2, 5) is None     # 두 병합 범위 사이
+    assert v1.merged_anchor(merged_index, 1, 2) is None     # 병합 범위가 없는 행
+    assert not v1.is_covered_cell(merged_index, (2, 2))      # 왼쪽 위 셀은 값을 쓸 수 있음
+    assert v1.is_covered_cell(merged_index, (3, 2))
+
+
+def test_full_engine_writes_merged_anchors_only(v1, tmp_path):
+    make_v1_workload(tmp_path, {"답변1.xlsx": {"B3": "병합 입력", "A3": 7, "D2": 99}})
+    v1.main(str(tmp_path), engine='full')
+
+    ws = openpyxl.load_workbook(tmp_path / "output.xlsx").active
+    assert ws["B3"].value == "병합 입력"
+    assert ws["A3"].value == 7
+    assert ws["D2"].value == "=A2"      # 수식 셀은 덮어쓰지 않음
+    assert ws.merged_cells.ranges and "B3:C4" in {str(r) for r in ws.merged_cells.ranges}
+    assert os.listdir(tmp_path / "완료") == ["답변1.xlsx"]
+
+
+def test_stream_compare_keeps_conflicting_file_out_entirely(v1):
+    ori_cell_dict = {(1, 1): "제목", (2, 1): None, (2, 2): "=A1"}
+    out_cell_dict, flag_cell_dict = {}, {}
+    rows = [(1, ("제목", None)), (2, (1, "계산값", "범위 밖"))]
+    assert v1.merge_rows_stream("a.xlsx", rows, ori_cell_dict, out_cell_dict, flag_cell_dict, {}) is None
+    assert out_cell_dict == {(2, 1): 1, (2, 3): "범위 밖"}    # 수식 셀 제외, 양식 범위 밖은 빈 셀과 비교
+
+    rows = [(1, (None, "새 값")), (2, (5,))]
+    assert v1.merge_rows_stream("b.xlsx", rows, ori_cell_dict, out_cell_dict, flag_cell_dict, {}) == (2, 1)
+    assert (1, 2) not in out_cell_dict     # 충돌 전에 읽은 셀도 반영하지 않음
+    assert flag_cell_dict == {(2, 1): (1, "a.xlsx"), (2, 3): (1, "a.xlsx")}
+
+
+def test_stream_engine_moves_conflicting_file_to_review(v1, tmp_path):
+    answers = {"답변1.xlsx": {"A3": 1}, "답변2.xlsx": {"E5": "추가", "A3": 2}}     # A3 충돌
+    make_v1_workload(tmp_path, answers)
+    v1.main(str(tmp_path), engine='stream')
+
+    # 파일 순서는 os.listdir 순서: 먼저 처리된 파일만 반영
+    [accepted] = os.listdir(tmp_path / "완료")
+    [rejected] = set(answers) - {accepted}
+    assert os.listdir(tmp_path / "검토") == [f"{rejected}_{accepted}"]
+    ws = openpyxl.load_workbook(tmp_path / "output.xlsx").active
+    for coord in ("A3", "E5"):
+        assert ws[coord].value == answers[accepted].get(coord)
@@ -0,0 +1,51 @@
+import os
+import time
+
+import openpyxl
+
+from test_defer_result import make_answer, make_template
+
+
+def test_poll_waits_until_file_settles(workdir, make_consolidator):
+    template_file = make_template(workdir)
+    consolidator = make_consolidator()
+    pending = {}
+    assert consolidator.poll_ready_files(pending, settle_seconds=0) == []
+
+    make_answer(workdir, template_file, "답변1.xlsx", {(2, 1): 1})
+    assert consolidator.poll_ready_files(pending, settle_seconds=0) == []     # 처음 본 파일은 다음 확인까지 대기
+    make_answer(workdir, template_file, "답변1.xlsx", {(2, 1): 1, (3, 1): 2})
+    path = os.path.join(workdir, "취합", "답변1.xlsx")
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))    # 저장 중 (크기/수정 시각 바뀜)
+    assert consolidator.poll_ready_files(pending, settle_seconds=0) == []
+    assert consolidator.poll_ready_files(pending, settle_seconds=3600) == []  # 대기 시간 전
+    assert consolidator.poll_ready_files(pending, settle_seconds=0) == ["답변1.xlsx"]
+    assert pending == {}
+
+    os.remove(path)     # 확인 중 사라진 파일은 대기 목록에서도 제거
+    make_answer(workdir, template_file, "답변2.xlsx", {(2, 2): 1})
+    consolidator.poll_ready_files(pending, settle_seconds=0)
+    os.remove(os.path.join(workdir, "취합", "답변2.xlsx"))
+    consolidator.poll_ready_files(pending, settle_seconds=0)
+    assert pending == {}
+
+
+def test_watch_mode_picks_up_files_dropped_while_running(program, workdir, make_consolidator, monkeypatch):
+    template_file = make_template(workdir)
+    make_answer(workdir, template_file, "답변1.xlsx", {(2, 1): 1})
+    consolidator = make_consolidator()
+    sleep = time.sleep
+    polls = []
+
+    def poll_sleep(seconds):
+        polls.append(seconds)
+        if len(polls) == 2:     # 감시 중에 새 파일 도착
+            make_answer(workdir, template_file, "답변2.xlsx", {(3, 1): 2})
+        sleep(0.01)
+
+    monkeypatch.setattr(program.time, "sleep", poll_sleep)
+    consolidator.watch_input_folder(poll_interval=0, settle_seconds=0, flush_interval=0, idle_timeout=0.5)
+
+    assert consolidator.processed_files == ["답변1.xlsx", "답변2.xlsx"]
+    ws = openpyxl.load_workbook(consolidator.result_file)["시트1"]
+    assert (ws["A2"].value, ws["A3"].value) == (1, 2)
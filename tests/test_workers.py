@@ -0,0 +1,73 @@
+import os
+
+import openpyxl
+import pytest
+
+
+@pytest.fixture
+def position_workload(workdir):
+    wb = openpyxl.Workbook()
+    for sheet_idx in range(3):
+        ws = wb.active if sheet_idx == 0 else wb.create_sheet()
+        ws.title = f"시트{sheet_idx + 1}"
+        ws["A1"] = "항목"
+    template_file = os.path.join(workdir, "양식", "양식.xlsx")
+    wb.save(template_file)
+    wb["시트1"]["B2"] = 1
+    answer_file = os.path.join(workdir, "취합", "답변.xlsx")
+    wb.save(answer_file)
+    return template_file, answer_file
+
+
+def test_extract_worker_creates_backend_only_when_needed(program, make_consolidator, position_workload, monkeypatch):
+    template_file, answer_file = position_workload
+    template_fp = make_consolidator().load_template_fingerprint(template_file)
+    created = []
+    create_backend = program.create_backend
+    monkeypatch.setattr(program, 'create_backend', lambda visible=False, name=None: created.append(name) or create_backend(name=name))
+    monkeypatch.setattr(program.multiprocessing.util, 'Finalize', lambda *args, **kwargs: None)
+
+    try:
+        program._init_extract_worker('openpyxl', template_fp, {'compare_engine': 'auto'})
+        result = program._extract_worker(answer_file)
+        assert created == []    # xml 비교는 백엔드를 쓰지 않음
+        assert result['changes_by_sheet']['시트1']
+
+        program._init_extract_worker('openpyxl', template_fp, {'compare_engine': 'block'})
+        program._extract_worker(answer_file)
+        assert created == ['openpyxl']
+    finally:
+        program._worker_state['consolidator'].backend.quit()
+        program._worker_state.clear()
+
+
+def test_sheet_workers_capped_by_cpu_count(program, make_consolidator, position_workload, monkeypatch):
+    template_file, answer_file = position_workload
+    consolidator = make_consolidator(sheet_workers=8)
+    template_fp = consolidator.load_template_fingerprint(template_file)
+    monkeypatch.setattr(program.os, 'cpu_count', lambda: 1)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("작업 프로세스를 만들면 안 됨")
+
+    monkeypatch.setattr(program, 'ProcessPoolExecutor', no_pool)
+    results = list(consolidator.iter_file_changes([os.path.basename(answer_file)], template_fp))
+    assert results[0]['changes_by_sheet']['시트1']
+
+
+def test_sheet_workers_match_sequential_results(program, make_consolidator, position_workload, monkeypatch, capsys):
+    template_file, answer_file = position_workload
+    wb = openpyxl.load_workbook(answer_file)
+    wb["시트2"]["C3"] = "둘"
+    wb["시트3"]["D4"] = 3.5
+    wb.save(answer_file)
+    monkeypatch.setattr(program.os, 'cpu_count', lambda: 4)
+
+    results = {}
+    for sheet_workers in (1, 2):
+        consolidator = make_consolidator(sheet_workers=sheet_workers)
+        template_fp = consolidator.load_template_fingerprint(template_file)
+        [result] = consolidator.iter_file_changes([os.path.basename(answer_file)], template_fp)
+        results[sheet_workers] = result['changes_by_sheet']
+        assert ("시트를 병렬 비교" in capsys.readouterr().out) == (sheet_workers > 1)
+    assert results[2] == results[1] == {"시트1": {"$B$2": 1}, "시트2": {"$C$3": "둘"}, "시트3": {"$D$4": 3.5}}
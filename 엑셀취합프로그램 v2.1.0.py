@@ -1,61 +1,1774 @@
-import xlwings as xw
 import os
 import shutil
 import sys
 import re
+import csv
+import json
+import time
 import pickle
+import math
+import hashlib
+import importlib.util
+import sqlite3
+import zipfile
+import multiprocessing
+from array import array
 from collections import defaultdict
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import datetime, time as dt_time
+from xml.etree import ElementTree
+from urllib.parse import quote
+from copy import copy
+import numpy as np
+import openpyxl
+from openpyxl.cell.cell import MergedCell, WriteOnlyCell
+from openpyxl.styles import PatternFill
+from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import from_excel, CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+
+# pandas(행 이어붙이기 전용)와 xlwings(Excel 백엔드)는 쓰는 곳에서 불러옴
+# - 실행 파일 시작 시 불러오는 모듈을 줄여 첫 입력 대기까지의 시간 단축 (벤치마크 startup 모드로 측정)
+
+
+EXCEL_MAX_ROW = 1048576
+EXCEL_MAX_COL = 16384
+
+
+class XlwingsSheet:
+    """xlwings 워크시트 래퍼"""
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.name = sheet.name
+
+    def used_bounds(self):
+        """사용 범위의 마지막 행/열 반환"""
+        last_cell = self.sheet.used_range.last_cell
+        return last_cell.row, last_cell.column
+
+    def read_values(self, max_row, max_col):
+        """A1부터 (max_row, max_col)까지 값을 2차원 리스트로 반환"""
+        return self.read_range(1, 1, max_row, max_col)
+
+    def read_range(self, row1, col1, row2, col2):
+        """(row1, col1)부터 (row2, col2)까지 값을 2차원 리스트로 반환"""
+        return self.sheet.range((row1, col1), (row2, col2)).options(ndim=2).value
+
+    def read_formulas(self, max_row, max_col):
+        """A1부터 (max_row, max_col)까지 수식 문자열을 2차원 리스트로 반환"""
+        formulas = self.sheet.range((1, 1), (max_row, max_col)).formula
+        if isinstance(formulas, str):   # 단일 셀인 경우 문자열로 반환됨
+            formulas = ((formulas,),)
+        return [list(row) for row in formulas]
+
+    def read_value(self, row, col):
+        return self.sheet.range((row, col)).value
+
+    def read_color(self, row, col):
+        return self.sheet.range((row, col)).color
+
+    def read_colors(self, max_row, max_col):
+        """A1부터 (max_row, max_col)까지 채우기 색을 2차원 리스트로 반환
+
+        행 전체가 같은 색이면 한 번에 읽고, 섞여 있는 행만 셀 단위로 읽음
+        """
+        colors = []
+        for row in range(1, max_row + 1):
+            try:
+                color = self.sheet.range((row, 1), (row, max_col)).color
+                colors.append([color] * max_col)
+            except Exception:   # 색이 섞인 행
+                colors.append([self.read_color(row, col) for col in range(1, max_col + 1)])
+        return colors
+
+    def write_values(self, row, col, values):
+        """(row, col)을 왼쪽 위로 하여 2차원 값 배열 쓰기"""
+        self.sheet.range((row, col)).value = values
+
+    def fill(self, row1, col1, row2, col2, color):
+        """사각형 범위에 채우기 색 지정 (color: RGB 튜플 또는 None)"""
+        self.sheet.range((row1, col1), (row2, col2)).color = color
+
+    def unprotect(self, password):
+        self.sheet.api.Unprotect(Password=password)
+
+
+class XlwingsBook:
+    """xlwings 통합문서 래퍼"""
+    def __init__(self, book):
+        self.book = book
+
+    @property
+    def sheet_names(self):
+        return [sheet.name for sheet in self.book.sheets]
+
+    def sheet(self, name):
+        if name not in self.sheet_names:
+            raise KeyError(name)
+        return XlwingsSheet(self.book.sheets[name])
+
+    def unprotect(self, password):
+        self.book.api.Unprotect(Password=password)
+
+    def save(self):
+        self.book.save()
+
+    def close(self):
+        self.book.close()
+
+
+class XlwingsBackend:
+    """Excel(xlwings) 기반 백엔드: Excel이 설치된 데스크톱용"""
+    name = 'xlwings'
 
-class ExcelConsolidator:
     def __init__(self, app):
-        if getattr(sys, 'frozen', False):
+        self.app = app
+
+    def open(self, path):
+        return XlwingsBook(self.app.books.open(path))
+
+    def quit(self):
+        self.app.quit()
+
+
+class OpenpyxlSheet:
+    """openpyxl 워크시트 래퍼"""
+    def __init__(self, book, name):
+        self.book = book
+        self.name = name
+
+    @property
+    def ws(self):
+        """수식이 보존된 워크시트 (쓰기용)"""
+        return self.book.wb[self.name]
+
+    @property
+    def values_ws(self):
+        """계산된 값이 들어있는 워크시트 (읽기용)"""
+        return self.book.values_wb[self.name]
+
+    def used_bounds(self):
+        ws = self.book.loaded_wb[self.name]
+        return ws.max_row, ws.max_column
+
+    def read_values(self, max_row, max_col):
+        return self.read_range(1, 1, max_row, max_col)
+
+    def read_range(self, row1, col1, row2, col2):
+        return [
+            list(row) for row in self.values_ws.iter_rows(
+                min_row=row1, max_row=row2, min_col=col1, max_col=col2, values_only=True
+            )
+        ]
+
+    def read_formulas(self, max_row, max_col):
+        return [
+            ['' if v is None else str(getattr(v, 'text', v)) for v in row]
+            for row in self.ws.iter_rows(
+                min_row=1, max_row=max_row, min_col=1, max_col=max_col, values_only=True
+            )
+        ]
+
+    def read_value(self, row, col):
+        return self.ws.cell(row, col).value
+
+    def read_color(self, row, col):
+        """단색 채우기면 RGB 튜플, 아니면 None (테마 색 등은 구분하지 않음)"""
+        fill = self.ws.cell(row, col).fill
+        rgb = fill.fgColor.rgb if fill.fill_type == 'solid' else None
+        if not isinstance(rgb, str) or len(rgb) < 6:
+            return None
+        rgb = rgb[-6:]
+        return tuple(int(rgb[i:i + 2], 16) for i in (0, 2, 4))
+
+    def read_colors(self, max_row, max_col):
+        return [
+            [self.read_color(row, col) for col in range(1, max_col + 1)]
+            for row in range(1, max_row + 1)
+        ]
+
+    def write_values(self, row, col, values):
+        ws = self.ws
+        for r, row_values in enumerate(values, row):
+            for c, value in enumerate(row_values, col):
+                cell = ws.cell(r, c)
+                if not isinstance(cell, MergedCell):    # 병합된 셀(좌상단 제외)은 쓰기 불가
+                    cell.value = value
+
+    def fill(self, row1, col1, row2, col2, color):
+        if color is None:
+            pattern = PatternFill(fill_type=None)
+        else:
+            rgb = 'FF%02X%02X%02X' % tuple(color)
+            pattern = PatternFill(start_color=rgb, end_color=rgb, fill_type='solid')
+
+        ws = self.ws
+        for r in range(row1, row2 + 1):
+            for c in range(col1, col2 + 1):
+                ws.cell(r, c).fill = copy(pattern)
+
+    def unprotect(self, password):
+        self.ws.protection.sheet = False
+
+
+class OpenpyxlBook:
+    """openpyxl 통합문서 래퍼
+
+    openpyxl은 수식과 계산값을 한 번에 읽을 수 없으므로
+    수식 보존용(쓰기)과 계산값용(읽기) 통합문서를 필요할 때 각각 로드
+    """
+    def __init__(self, path):
+        self.path = path
+        self._wb = None
+        self._values_wb = None
+
+    @property
+    def wb(self):
+        if self._wb is None:
+            self._wb = openpyxl.load_workbook(self.path, keep_vba=self.path.lower().endswith('.xlsm'))
+        return self._wb
+
+    @property
+    def values_wb(self):
+        if self._values_wb is None:
+            self._values_wb = openpyxl.load_workbook(self.path, data_only=True)
+        return self._values_wb
+
+    @property
+    def loaded_wb(self):
+        """이미 로드된 통합문서 (없으면 계산값용 로드)"""
+        return self._wb or self._values_wb or self.values_wb
+
+    @property
+    def sheet_names(self):
+        return self.loaded_wb.sheetnames
+
+    def sheet(self, name):
+        if name not in self.sheet_names:
+            raise KeyError(name)
+        return OpenpyxlSheet(self, name)
+
+    def unprotect(self, password):
+        self.wb.security = None
+
+    def save(self):
+        if self._wb is not None:
+            self._wb.save(self.path)
+
+    def close(self):
+        for wb in (self._wb, self._values_wb):
+            if wb is not None:
+                wb.close()
+        self._wb = None
+        self._values_wb = None
+
+
+class OpenpyxlBackend:
+    """openpyxl 기반 백엔드: Excel 없이(리눅스 서버 등) 실행용, .xls 미지원"""
+    name = 'openpyxl'
+
+    def open(self, path):
+        if not zipfile.is_zipfile(path):
+            raise ValueError(f"openpyxl 백엔드에서 열 수 없는 형식입니다: {os.path.basename(path)}")
+        return OpenpyxlBook(path)
+
+    def quit(self):
+        pass
+
+
+class ConcatSink:
+    """concat_files 시트별 결과를 batch_rows 행 단위로 모아 내보내는 싱크
+
+    메모리에는 최대 batch_rows 행 정도만 유지 (전체 제출 행 수와 무관)
+    """
+    def __init__(self, columns, batch_rows=10000):
+        self.columns = list(columns)    # 파일마다 칼럼 순서가 달라도 양식 순서로 맞춤
+        self.batch_rows = batch_rows
+        self.pending = []
+        self.pending_rows = 0
+        self.total_rows = 0
+
+    def check(self, df):
+        """df를 이어 쓸 수 있는지 확인 (맞지 않으면 ValueError) - 파일을 받아들이기 전에 모든 시트를 확인"""
+
+    def append(self, df):
+        if df.empty:
+            return
+        self.pending.append(df.reindex(columns=self.columns))
+        self.pending_rows += len(df)
+        if self.pending_rows >= self.batch_rows:
+            try:
+                self.flush()
+            except Exception as e:
+                if self.pending_rows - len(df) < self.written_rows():
+                    # 일부 싱크에 이 파일의 행까지 이미 쓰였으면 되돌릴 수 없으므로 받아들이고, 나머지 싱크는 다음 flush에서 씀
+                    print(f"⚠️  배치 일부 저장 실패, 다음 배치에서 다시 씁니다: {e}")
+                    return
+                # 이 파일의 행은 빼고 예외 전달 (앞서 받아들인 파일의 행은 pending에 남아 다음 flush에서 다시 씀)
+                self.pending.pop()
+                self.pending_rows -= len(df)
+                raise
+
+    def written_rows(self):
+        """pending 중 이미 내보낸 앞쪽 행 수 (배치를 한 번에 쓰는 싱크는 0)"""
+        return 0
+
+    def flush(self):
+        if not self.pending:
+            return
+        import pandas as pd
+        batch = pd.concat(self.pending, axis=0)
+        self.write_batch(batch)
+        self.pending = []       # 쓰기에 성공한 뒤에 비움
+        self.pending_rows = 0
+        self.total_rows += len(batch)
+
+    def write_batch(self, df):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+
+class WorkbookRangeSink(ConcatSink):
+    """결과 통합문서 시트의 (start_row, start_col)부터 아래로 이어 쓰는 싱크"""
+    def __init__(self, result_ws, start_row, start_col, columns, batch_rows=10000):
+        super().__init__(columns, batch_rows)
+        self.result_ws = result_ws
+        self.next_row = start_row
+        self.start_col = start_col
+
+    def write_batch(self, df):
+        df = df.astype(object).where(df.notna(), None)     # DataFrame 값만 삽입 (헤더 없이)
+        self.result_ws.write_values(self.next_row, self.start_col, df.values.tolist())
+        self.next_row += len(df)
+
+
+class StreamingWorkbookWriter:
+    """concat_files 결과 xlsx를 쓰기 전용(write_only) 통합문서로 스트리밍 저장
+
+    - 양식 시트마다 start_cell까지의 헤더 행(값/서식/병합/열 너비/행 높이)을 복사한 뒤 데이터 행을 이어 씀
+    - 시트 행 수가 max_rows에 닿으면 이어쓰기 시트(시트명_2, 시트명_3, ...)를 만들고 헤더부터 다시 씀
+    - 행은 바로 임시 파일로 기록되므로 메모리에는 배치 1개만 유지
+    - 결과 Book과 같은 save()/close() 제공
+    """
+    STYLE_ATTRS = ('font', 'fill', 'border', 'alignment', 'number_format', 'protection')
+
+    def __init__(self, template_file, result_file, header_rows, max_rows=EXCEL_MAX_ROW):
+        self.path = result_file
+        self.header_rows = header_rows
+        self.max_rows = max_rows
+        self.headers = {}       # {시트명: 헤더 정보}
+        self.parts = {}         # {시트명: [현재 시트, 기록한 행 수, 이어쓰기 번호]}
+
+        template_wb = openpyxl.load_workbook(template_file)
+        try:
+            for template_ws in template_wb.worksheets:
+                self.headers[template_ws.title] = self.read_header(template_ws)
+        finally:
+            template_wb.close()
+
+        self.wb = openpyxl.Workbook(write_only=True)
+        for sheet_name in self.headers:
+            self.parts[sheet_name] = [self.create_sheet(sheet_name, sheet_name), header_rows, 1]
+
+    def read_header(self, template_ws):
+        """양식 시트의 헤더 행 (셀 값/서식, 병합 범위, 열 너비, 행 높이, 틀 고정)"""
+        rows = []
+        for row in template_ws.iter_rows(min_row=1, max_row=self.header_rows):
+            rows.append([
+                (cell.value, {attr: copy(getattr(cell, attr)) for attr in self.STYLE_ATTRS} if cell.has_style else None)
+                for cell in row
+            ])
+        return {
+            'rows': rows,
+            'merged': [str(merged) for merged in template_ws.merged_cells.ranges if merged.max_row <= self.header_rows],
+            'widths': {key: dim.width for key, dim in template_ws.column_dimensions.items() if dim.customWidth},
+            'heights': {row: dim.height for row, dim in template_ws.row_dimensions.items()
+                        if row <= self.header_rows and dim.height is not None},
+            'freeze_panes': template_ws.freeze_panes,
+        }
+
+    def create_sheet(self, sheet_name, title, index=None):
+        """시트를 만들고 양식 헤더 행 쓰기 (열 너비/행 높이는 첫 행 쓰기 전에 지정해야 함)"""
+        header = self.headers[sheet_name]
+        ws = self.wb.create_sheet(title, index)
+        for key, width in header['widths'].items():
+            ws.column_dimensions[key].width = width
+        for row, height in header['heights'].items():
+            ws.row_dimensions[row].height = height
+        for merged in header['merged']:
+            ws.merged_cells.add(merged)
+        if header['freeze_panes']:
+            ws.freeze_panes = header['freeze_panes']
+        for row in header['rows']:
+            cells = []
+            for value, style in row:
+                cell = WriteOnlyCell(ws, value)
+                for attr, style_value in (style or {}).items():
+                    setattr(cell, attr, style_value)
+                cells.append(cell)
+            ws.append(cells)
+        # 헤더 행이 양식보다 적으면(빈 행) 데이터 시작 행을 맞춤
+        for _ in range(self.header_rows - len(header['rows'])):
+            ws.append([])
+        return ws
+
+    def continuation_title(self, sheet_name, number):
+        """이어쓰기 시트명 (시트명은 31자 제한, 이미 있는 이름은 건너뜀)"""
+        while True:
+            suffix = f"_{number}"
+            title = sheet_name[:31 - len(suffix)] + suffix
+            if title not in self.wb.sheetnames:
+                return title, number
+            number += 1
+
+    def append_rows(self, sheet_name, start_col, rows):
+        """데이터 행을 start_col 열부터 이어 쓰기 (시트가 차면 이어쓰기 시트로 넘김)"""
+        part = self.parts[sheet_name]
+        padding = [None] * (start_col - 1)
+        for row in rows:
+            if part[1] >= self.max_rows:
+                title, number = self.continuation_title(sheet_name, part[2] + 1)
+                index = self.wb.sheetnames.index(part[0].title) + 1
+                part[:] = [self.create_sheet(sheet_name, title, index), self.header_rows, number]
+                print(f"   시트 '{sheet_name}'이(가) {self.max_rows:,}행을 넘어 '{title}' 시트에 이어서 씁니다.")
+            part[0].append(padding + row)
+            part[1] += 1
+
+    def sink(self, sheet_name, start_col, columns, batch_rows=10000):
+        return WorkbookStreamSink(self, sheet_name, start_col, columns, batch_rows)
+
+    def save(self):
+        self.wb.save(self.path)
+
+    def close(self):
+        pass
+
+
+class WorkbookStreamSink(ConcatSink):
+    """StreamingWorkbookWriter 시트에 이어 쓰는 싱크 (시트 행 제한을 넘으면 이어쓰기 시트로)"""
+    def __init__(self, writer, sheet_name, start_col, columns, batch_rows=10000):
+        super().__init__(columns, batch_rows)
+        self.writer = writer
+        self.sheet_name = sheet_name
+        self.start_col = start_col
+
+    def write_batch(self, df):
+        df = df.astype(object).where(df.notna(), None)
+        self.writer.append_rows(self.sheet_name, self.start_col, df.values.tolist())
+
+
+class FanoutSink(ConcatSink):
+    """배치 하나를 여러 싱크(xlsx, CSV, Parquet, SQLite)에 같이 내보내는 싱크
+
+    일부 싱크만 쓰고 실패한 배치는 싱크별로 쓴 행 수를 기억해, 다시 쓸 때 남은 행만 이어 씀 (중복 방지)
+    """
+    def __init__(self, sinks, columns, batch_rows=10000):
+        super().__init__(columns, batch_rows)
+        self.sinks = sinks
+        self.written = [0] * len(sinks)     # 싱크별로 pending 배치에서 이미 쓴 앞쪽 행 수
+
+    def check(self, df):
+        for sink in self.sinks:
+            sink.check(df)
+
+    def written_rows(self):
+        return max(self.written)
+
+    def write_batch(self, df):
+        for i, sink in enumerate(self.sinks):
+            if self.written[i] < len(df):
+                rest = df.iloc[self.written[i]:]
+                sink.write_batch(rest)
+                sink.total_rows += len(rest)
+                self.written[i] = len(df)
+        self.written = [0] * len(self.sinks)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            for sink in self.sinks:
+                sink.close()
+
+
+class CsvSink(ConcatSink):
+    """CSV 파일로 이어 쓰는 싱크 (엑셀에서 한글이 깨지지 않도록 BOM 포함)"""
+    def __init__(self, path, columns, batch_rows=10000):
+        super().__init__(columns, batch_rows)
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8-sig', newline='')
+        import pandas as pd
+        pd.DataFrame(columns=self.columns).to_csv(self.file, index=False)
+
+    def write_batch(self, df):
+        df.to_csv(self.file, header=False, index=False)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.file.close()
+
+
+class SqliteSink(ConcatSink):
+    """SQLite 테이블로 이어 쓰는 싱크 (시트 1개 = 테이블 1개, 첫 배치의 타입으로 테이블 생성, 배치마다 커밋)"""
+    def __init__(self, conn, table, columns, batch_rows=10000):
+        super().__init__(columns, batch_rows)
+        self.conn = conn
+        self.table = table
+        self.created = False
+
+    def write_batch(self, df):
+        df.to_sql(self.table, self.conn, if_exists='append' if self.created else 'replace', index=False)
+        self.conn.commit()
+        self.created = True
+
+    def close(self):
+        super().close()
+        if not self.created:    # 행이 없는 시트도 칼럼만 있는 테이블 생성
+            import pandas as pd
+            pd.DataFrame(columns=self.columns).to_sql(self.table, self.conn, if_exists='replace', index=False)
+            self.conn.commit()
+
+
+class ParquetSink(ConcatSink):
+    """Parquet 파일로 이어 쓰는 싱크 (pyarrow 필요, 첫 배치로 정한 스키마로 배치마다 row group 기록)
+
+    - 정수 칼럼은 실수로 저장 (다음 배치에 빈 값/소수가 올 수 있음)
+    - 값이 없거나 여러 타입이 섞인 칼럼은 문자열로 저장
+    - 스키마가 정해진 뒤에는 맞지 않는 값이 있는 파일을 받아들이기 전에 거름 (check)
+    """
+    def __init__(self, path, columns, batch_rows=10000):
+        super().__init__(columns, batch_rows)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet로 저장하려면 pyarrow가 필요합니다. (pip install pyarrow)") from None
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.names = [str(column) for column in self.columns]
+        self.schema = None
+        self.writer = None
+
+    def to_array(self, series, arrow_type=None):
+        pa = self.pa
+        try:
+            return pa.array(series, type=arrow_type, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError) as e:
+            if arrow_type is not None and not pa.types.is_string(arrow_type):
+                raise ValueError(f"Parquet 칼럼 '{series.name}'의 타입({arrow_type})과 맞지 않는 값이 있습니다: {e}") from e
+            import pandas as pd
+            return pa.array(series.map(lambda value: None if pd.isna(value) else str(value)), type=pa.string())
+
+    def check(self, df):
+        if self.schema is None:     # 첫 배치는 스키마를 배치 전체에서 정하므로 항상 맞음
+            return
+        df = df.reindex(columns=self.columns)
+        for i, field in enumerate(self.schema):
+            self.to_array(df.iloc[:, i], field.type)
+
+    def field_type(self, array):
+        pa = self.pa
+        if pa.types.is_null(array.type):
+            return pa.string()
+        if pa.types.is_integer(array.type):
+            return pa.float64()
+        return array.type
+
+    def write_batch(self, df):
+        pa = self.pa
+        if self.schema is None:
+            self.schema = pa.schema([
+                pa.field(name, self.field_type(self.to_array(df.iloc[:, i])))
+                for i, name in enumerate(self.names)
+            ])
+            self.writer = self.pq.ParquetWriter(self.path, self.schema)
+        arrays = [self.to_array(df.iloc[:, i], field.type) for i, field in enumerate(self.schema)]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+        if self.writer is None:     # 행이 없는 시트도 칼럼만 있는 파일 생성
+            schema = self.pa.schema([self.pa.field(name, self.pa.string()) for name in self.names])
+            self.pq.write_table(schema.empty_table(), self.path)
+
+
+@lru_cache(maxsize=None)
+def _local_name(tag):
+    """네임스페이스를 뗀 XML 태그명 (태그 종류가 적어 캐시)"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _ref_to_rowcol(ref):
+    """셀 참조를 행/열 번호로 변환 (예: AB4 → 4, 28)"""
+    col = 0
+    for i, ch in enumerate(ref):
+        if ch.isdigit():
+            return int(ref[i:]), col
+        col = col * 26 + (ord(ch.upper()) - 64)
+    raise ValueError(ref)
+
+
+class XlsxReader:
+    """xlsx/xlsm 패키지의 시트 XML을 직접 스트리밍으로 읽는 경량 리더 (Excel/openpyxl 불필요)
+
+    통합문서 목록(workbook.xml)과 관계 파일로 시트 경로만 찾고, 요청한 시트 XML(과 공유 문자열/스타일)만 압축을 풂
+    """
+    def __init__(self, path):
+        self.path = path
+        self.zip = zipfile.ZipFile(path)
+        self._sheet_parts = None
+        self._shared_strings_part = None
+        self._shared_strings = None
+        self._styles_part = None
+        self._date_styles = None
+        self.epoch = CALENDAR_WINDOWS_1900
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.zip.close()
+
+    def _read_rels(self, rels_part, base_dir):
+        """관계(.rels) 파일을 {Id: (관계 유형, 패키지 내 경로)}로 변환"""
+        rels = {}
+        with self.zip.open(rels_part) as f:
+            for _, elem in ElementTree.iterparse(f):
+                if _local_name(elem.tag) == 'Relationship':
+                    target = elem.get('Target')
+                    if target.startswith('/'):
+                        target = target.lstrip('/')
+                    else:
+                        target = os.path.normpath(os.path.join(base_dir, target)).replace('\\', '/')
+                    rels[elem.get('Id')] = (elem.get('Type', '').rsplit('/', 1)[-1], target)
+        return rels
+
+    @property
+    def sheet_parts(self):
+        """{시트명: 시트 XML 경로} (통합문서의 시트 순서)"""
+        if self._sheet_parts is None:
+            workbook_part = 'xl/workbook.xml'
+            for rel_type, target in self._read_rels('_rels/.rels', '').values():
+                if rel_type == 'officeDocument':
+                    workbook_part = target
+            base_dir = os.path.dirname(workbook_part)
+            rels = self._read_rels(f'{base_dir}/_rels/{os.path.basename(workbook_part)}.rels', base_dir)
+            for rel_type, target in rels.values():
+                if rel_type == 'sharedStrings':
+                    self._shared_strings_part = target
+                elif rel_type == 'styles':
+                    self._styles_part = target
+
+            self._sheet_parts = {}
+            with self.zip.open(workbook_part) as f:
+                for _, elem in ElementTree.iterparse(f):
+                    name = _local_name(elem.tag)
+                    if name == 'sheet':
+                        rel_id = next(v for k, v in elem.attrib.items() if _local_name(k) == 'id')
+                        self._sheet_parts[elem.get('name')] = rels[rel_id][1]
+                    elif name == 'workbookPr' and elem.get('date1904') in ('1', 'true'):
+                        self.epoch = CALENDAR_MAC_1904
+        return self._sheet_parts
+
+    @property
+    def sheet_names(self):
+        return list(self.sheet_parts)
+
+    @property
+    def shared_strings(self):
+        """공유 문자열 목록 (처음 필요할 때 로드)"""
+        if self._shared_strings is None:
+            self._shared_strings = []
+            self.sheet_parts    # 통합문서 관계에서 공유 문자열 경로 확인
+            if self._shared_strings_part is None:
+                return self._shared_strings
+            with self.zip.open(self._shared_strings_part) as f:
+                for _, elem in ElementTree.iterparse(f):
+                    if _local_name(elem.tag) == 'si':
+                        self._shared_strings.append(self._inline_text(elem))
+                        elem.clear()
+        return self._shared_strings
+
+    @property
+    def date_styles(self):
+        """날짜 표시 형식인 셀 스타일 번호 → timedelta 형식 여부 (처음 필요할 때 styles.xml에서 로드)
+
+        openpyxl과 같은 기준으로 판정하므로 openpyxl로 읽은 양식 값과 같은 형식으로 변환됨
+        """
+        if self._date_styles is None:
+            self._date_styles = {}
+            self.sheet_parts    # 통합문서 관계에서 스타일 경로 확인
+            if self._styles_part is None:
+                return self._date_styles
+            custom_formats = {}
+            with self.zip.open(self._styles_part) as f:
+                for _, elem in ElementTree.iterparse(f):
+                    name = _local_name(elem.tag)
+                    if name == 'numFmt':
+                        custom_formats[int(elem.get('numFmtId'))] = elem.get('formatCode')
+                    elif name == 'cellXfs':
+                        for idx, xf in enumerate(c for c in elem if _local_name(c.tag) == 'xf'):
+                            fmt_id = int(xf.get('numFmtId', 0))
+                            fmt = custom_formats.get(fmt_id) or builtin_format_code(fmt_id)
+                            if fmt and is_date_format(fmt):
+                                self._date_styles[idx] = is_timedelta_format(fmt)
+                        break
+        return self._date_styles
+
+    def _inline_text(self, elem):
+        """<si>/<is> 요소의 텍스트 (서식 있는 텍스트는 이어 붙이고 윗주(rPh)는 제외)"""
+        texts = []
+        for child in elem:
+            name = _local_name(child.tag)
+            if name == 't':
+                texts.append(child.text or '')
+            elif name == 'r':
+                texts.extend(t.text or '' for t in child if _local_name(t.tag) == 't')
+        return ''.join(texts)
+
+    def _convert(self, cell_type, raw, elem):
+        """셀 XML 값을 파이썬 값으로 변환"""
+        if cell_type == 'inlineStr':
+            inline = next((c for c in elem if _local_name(c.tag) == 'is'), None)
+            return self._inline_text(inline) if inline is not None else None
+        if raw is None:
+            return None
+        if cell_type == 's':
+            return self.shared_strings[int(raw)]
+        if cell_type in ('str', 'e'):
+            return raw
+        if cell_type == 'b':
+            return raw == '1'
+        if cell_type == 'd':
+            return datetime.fromisoformat(raw)
+        if any(ch in raw for ch in '.eE'):
+            return float(raw)
+        return int(raw)
+
+    def _convert_date(self, value, style):
+        """날짜 형식 스타일의 숫자를 datetime/time/timedelta로 변환 (openpyxl과 동일)"""
+        is_timedelta = self.date_styles.get(int(style)) if style else None
+        if is_timedelta is None or not isinstance(value, (int, float)) or isinstance(value, bool):
+            return value
+        try:
+            return from_excel(value, self.epoch, timedelta=is_timedelta)
+        except (OverflowError, ValueError):
+            return '#VALUE!'
+
+    def parsed_parts(self):
+        """이미 읽은 패키지 정보 (시트 경로, 공유 문자열, 날짜 스타일) - 같은 파일을 다시 열 때 재사용"""
+        return {
+            '_sheet_parts': self._sheet_parts,
+            '_shared_strings_part': self._shared_strings_part,
+            '_shared_strings': self._shared_strings,
+            '_styles_part': self._styles_part,
+            '_date_styles': self._date_styles,
+            'epoch': self.epoch,
+        }
+
+    def restore_parts(self, parts):
+        """parsed_parts()로 받은 정보 복원 (다시 파싱하지 않음)"""
+        for name, value in parts.items():
+            setattr(self, name, value)
+
+    def iter_cells(self, sheet_name, convert_dates=False):
+        """시트에 실제로 존재하는 값 있는 셀만 (row, col, value)로 스트리밍
+
+        - 처리한 행은 바로 버리므로 시트 크기와 무관하게 메모리 일정
+        - convert_dates=True이면 날짜 형식 셀을 datetime 등으로 변환 (스타일은 처음 필요할 때 로드)
+        """
+        row = col = 0
+        sheet_data = None
+        with self.zip.open(self.sheet_parts[sheet_name]) as f:
+            for event, elem in ElementTree.iterparse(f, events=('start', 'end')):
+                name = _local_name(elem.tag)
+                if event == 'start':
+                    if name == 'row':
+                        row = int(elem.get('r') or row + 1)
+                        col = 0
+                    elif name == 'sheetData':
+                        sheet_data = elem
+                    continue
+                if name == 'c':
+                    ref = elem.get('r')
+                    if ref:
+                        row, col = _ref_to_rowcol(ref)
+                    else:
+                        col += 1
+                    raw = next((c.text for c in elem if _local_name(c.tag) == 'v'), None)
+                    cell_type = elem.get('t')
+                    value = self._convert(cell_type, raw, elem)
+                    if convert_dates and cell_type in (None, 'n') and value is not None:
+                        value = self._convert_date(value, elem.get('s'))
+                    if value is not None:
+                        yield row, col, value
+                elif name == 'row':
+                    # 처리한 행은 메모리에서 제거
+                    elem.clear()
+                    if sheet_data is not None:
+                        sheet_data.remove(elem)
+
+
+class CompareRules:
+    """값 비교 규칙: 양식 값과 답변 값이 다르게 저장됐지만 같은 값으로 볼 차이 (시트별 지정 가능)
+
+    - 숫자: 상대/절대 오차(rel_tol, abs_tol) 이내면 같음 (1과 1.0, 부동소수점 오차)
+    - 날짜: 시각이 0시 정각인 datetime은 같은 날짜의 date와 같음
+    - 문자열: 앞뒤 공백 무시(strip_whitespace), 빈 문자열은 빈 셀(None)과 같음(empty_as_none)
+    - 불리언: TRUE/FALSE는 숫자 1/0과 다른 값 (체크박스를 1로 바꾼 답변도 변경으로 취급)
+    """
+    def __init__(self, rel_tol=1e-9, abs_tol=1e-9, midnight_as_date=True, strip_whitespace=True, empty_as_none=True):
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.midnight_as_date = midnight_as_date
+        self.strip_whitespace = strip_whitespace
+        self.empty_as_none = empty_as_none
+
+    @classmethod
+    def exact(cls):
+        """정규화 없이 값이 정확히 같을 때만 같음 (이전 비교 방식)"""
+        return cls(rel_tol=0.0, abs_tol=0.0, midnight_as_date=False, strip_whitespace=False, empty_as_none=False)
+
+    def normalize(self, value):
+        if isinstance(value, str):
+            if self.strip_whitespace:
+                value = value.strip()
+            if self.empty_as_none and not value:
+                return None
+            return value
+        if isinstance(value, (bool, np.bool_)):
+            return bool(value)
+        if isinstance(value, (int, float, np.integer, np.floating)):
+            return float(value)
+        if isinstance(value, datetime):
+            if self.midnight_as_date and value.tzinfo is None and value.time() == dt_time():
+                return value.date()
+            return value
+        return value
+
+    def same(self, a, b):
+        """정규화한 두 값이 같은지 확인"""
+        a, b = self.normalize(a), self.normalize(b)
+        # 파이썬에서는 True == 1 이므로 불리언은 타입까지 같아야 같은 값
+        if type(a) is bool or type(b) is bool:
+            return a is b
+        if type(a) is float and type(b) is float:
+            return math.isclose(a, b, rel_tol=self.rel_tol, abs_tol=self.abs_tol) or a == b
+        return a == b
+
+    def diff_mask(self, template_values, source_values):
+        """값 블록 비교: 배열 단위 != 로 후보를 거른 뒤 후보 셀만 규칙으로 다시 확인
+
+        != 는 True와 1을 같다고 보므로, 값이 같아도 타입이 다른 셀은 후보에 다시 넣음
+        """
+        mask = np.asarray(template_values != source_values, dtype=bool)
+        equal = ~mask
+        if equal.any():
+            value_type = np.frompyfunc(type, 1, 1)
+            mask[equal] = np.asarray(value_type(template_values[equal]) != value_type(source_values[equal]), dtype=bool)
+        for row, col in zip(*np.nonzero(mask)):
+            if self.same(template_values[row, col], source_values[row, col]):
+                mask[row, col] = False
+        return mask
+
+
+class SheetFingerprint:
+    """양식 시트 1개의 사전 계산 정보: 값 격자, 수식 마스크, 사용 범위, 채우기 색, 입력 셀 범위"""
+    def __init__(self, name, values, formula_mask, colors, input_ranges=None):
+        self.name = name
+        self.values = values                # object ndarray
+        self.formula_mask = formula_mask    # bool ndarray
+        self.colors = colors                # object ndarray (RGB 튜플 또는 None)
+        self.input_ranges = input_ranges    # [(row1, col1, row2, col2)] 잠금 해제/유효성 검사 셀, None이면 전체 셀이 입력 대상
+
+    @property
+    def bounds(self):
+        return self.values.shape
+
+    @property
+    def has_inputs(self):
+        """비교할 입력 셀이 있는 시트인지"""
+        return self.input_ranges is None or bool(self.input_ranges)
+
+    def padded(self, max_row, max_col):
+        """(max_row, max_col) 크기로 확장한 값 격자와 수식 마스크 반환"""
+        return self.window(1, 1, max_row, max_col)
+
+    def window(self, row1, col1, row2, col2):
+        """(row1, col1)~(row2, col2) 범위의 값 격자와 수식 마스크 반환 (양식 범위 밖은 None/False)"""
+        n_row, n_col = self.bounds
+        if (row1, col1, row2, col2) == (1, 1, n_row, n_col):
+            return self.values, self.formula_mask
+        values = np.full((row2 - row1 + 1, col2 - col1 + 1), None, dtype=object)
+        formula_mask = np.zeros(values.shape, dtype=bool)
+        r2, c2 = min(row2, n_row), min(col2, n_col)
+        if row1 <= r2 and col1 <= c2:
+            values[:r2 - row1 + 1, :c2 - col1 + 1] = self.values[row1 - 1:r2, col1 - 1:c2]
+            formula_mask[:r2 - row1 + 1, :c2 - col1 + 1] = self.formula_mask[row1 - 1:r2, col1 - 1:c2]
+        return values, formula_mask
+
+    def input_region(self, max_row, max_col):
+        """(max_row, max_col) 안에서 입력 셀을 모두 포함하는 최소 사각형 (없으면 None)"""
+        if self.input_ranges is None:
+            return 1, 1, max_row, max_col
+        clipped = [
+            (row1, col1, min(row2, max_row), min(col2, max_col))
+            for row1, col1, row2, col2 in self.input_ranges
+            if row1 <= max_row and col1 <= max_col
+        ]
+        if not clipped:
+            return None
+        return (min(r[0] for r in clipped), min(r[1] for r in clipped),
+                max(r[2] for r in clipped), max(r[3] for r in clipped))
+
+    def is_input(self, row, col):
+        """입력 셀 여부 (양식 범위 안은 캐시한 마스크, 밖은 범위 목록으로 판정)"""
+        if self.input_ranges is None:
+            return True
+        n_row, n_col = self.bounds
+        if row <= n_row and col <= n_col:
+            if getattr(self, '_bounded_input_mask', None) is None:
+                self._bounded_input_mask = self.input_mask(1, 1, n_row, n_col)
+            return self._bounded_input_mask[row - 1, col - 1]
+        return any(r1 <= row <= r2 and c1 <= col <= c2 for r1, c1, r2, c2 in self.input_ranges)
+
+    def filled_input_cells(self):
+        """값이 있는 입력 셀(수식 제외) 좌표 집합 - 답변에서 지운 셀 감지용 (처음 필요할 때 계산)"""
+        if getattr(self, '_filled_input_cells', None) is None:
+            mask = (self.values != None) & ~self.formula_mask     # 배열 원소별 비교
+            if self.input_ranges is not None:
+                mask &= self.input_mask(1, 1, *self.bounds)
+            self._filled_input_cells = {(row + 1, col + 1) for row, col in zip(*np.nonzero(mask))}
+        return self._filled_input_cells
+
+    def input_mask(self, row1, col1, row2, col2):
+        """(row1, col1)~(row2, col2) 범위의 입력 셀 마스크"""
+        if self.input_ranges is None:
+            return np.ones((row2 - row1 + 1, col2 - col1 + 1), dtype=bool)
+        mask = np.zeros((row2 - row1 + 1, col2 - col1 + 1), dtype=bool)
+        for r1, c1, r2, c2 in self.input_ranges:
+            r1, c1, r2, c2 = max(r1, row1), max(c1, col1), min(r2, row2), min(c2, col2)
+            if r1 <= r2 and c1 <= c2:
+                mask[r1 - row1:r2 - row1 + 1, c1 - col1:c2 - col1 + 1] = True
+        return mask
+
+    def value_at(self, row, col):
+        n_row, n_col = self.bounds
+        return self.values[row - 1, col - 1] if row <= n_row and col <= n_col else None
+
+    def color_at(self, row, col):
+        n_row, n_col = self.bounds
+        return self.colors[row - 1, col - 1] if row <= n_row and col <= n_col else None
+
+
+class TemplateFingerprint:
+    """양식 파일 전체의 지문 (양식 파일 내용 해시 + 백엔드 기준으로 디스크에 캐시)"""
+    VERSION = 5     # 지문 구조가 바뀌면 올림 (이전 캐시 무시)
+
+    def __init__(self, content_hash, sheets, backend_name=None):
+        self.content_hash = content_hash
+        self.backend_name = backend_name    # 지문을 만든 백엔드 (백엔드마다 채우기 색 형식이 달라 캐시를 따로 둠)
+        self.sheets = sheets                # {시트명: SheetFingerprint} (양식 시트 순서 유지)
+
+    @property
+    def sheet_names(self):
+        return list(self.sheets)
+
+
+@lru_cache(maxsize=1 << 16)
+def _address_to_key(address):
+    """셀 주소를 정수 좌표 키로 변환 (예: $B$3 → 3 << 14 | 1, 파일마다 같은 주소가 반복되어 캐시)"""
+    row, col = _ref_to_rowcol(address.replace('$', ''))
+    return (row << 14) | (col - 1)
+
+
+def _key_to_address(key):
+    """정수 좌표 키를 셀 주소로 변환 (예: 3 << 14 | 1 → $B$3)"""
+    row, col = key >> 14, (key & 0x3FFF) + 1
+    letters = ''
+    while col > 0:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return f"${letters}${row}"
+
+
+class CellColumns:
+    """시트 1개의 취합 셀을 열 단위 배열로 저장
+
+    - slots: {좌표 키: 칸 번호}
+    - keys/owners/values: 칸별 좌표 키, 파일 ID(-1: 빈 칸), 값
+    - 지운 칸은 free에 모아 다시 사용
+    """
+    __slots__ = ('slots', 'keys', 'owners', 'values', 'free')
+
+    def __init__(self):
+        self.slots = {}
+        self.keys = array('q')
+        self.owners = array('i')
+        self.values = []
+        self.free = []
+
+    def __len__(self):
+        return len(self.slots)
+
+    def set(self, key, file_id, value):
+        slot = self.slots.get(key)
+        if slot is None:
+            if self.free:
+                slot = self.free.pop()
+                self.keys[slot] = key
+            else:
+                slot = len(self.values)
+                self.keys.append(key)
+                self.owners.append(-1)
+                self.values.append(None)
+            self.slots[key] = slot
+        self.owners[slot] = file_id
+        self.values[slot] = value
+
+    def get(self, key):
+        """(파일 ID, 값) 또는 None"""
+        slot = self.slots.get(key)
+        return None if slot is None else (self.owners[slot], self.values[slot])
+
+    def discard(self, key, file_id):
+        """파일이 소유한 칸이면 비우기"""
+        slot = self.slots.get(key)
+        if slot is None or self.owners[slot] != file_id:
+            return
+        del self.slots[key]
+        self.owners[slot] = -1
+        self.values[slot] = None
+        self.free.append(slot)
+
+
+class ConflictIndex:
+    """취합된 셀의 소유 파일 색인 (셀 30만 개 이상에서도 가볍도록 압축 저장)
+
+    - 정방향: sheets[시트명] = CellColumns (정수 좌표 키 → 파일 ID, 값)
+    - 역방향: owned[파일 ID][시트명] = array(좌표 키)
+    - 파일명은 filenames/file_ids로 한 번만 저장 (셀마다 파일명 문자열을 두지 않음)
+    - 좌표 주소('$A$1')를 주고받는 인터페이스는 기존 changed_cells와 같음
+    """
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self, cells=None):
+        self.sheets = {}
+        self.owned = {}
+        self.filenames = []
+        self.file_ids = {}
+        # 이전 형식 {시트명: {좌표: {'filename': str, 'value': any}}}에서 생성
+        for sheet_name, sheet_cells in (cells or {}).items():
+            for coord, info in sheet_cells.items():
+                self.add(sheet_name, coord, info['filename'], info['value'])
+
+    def __len__(self):
+        """셀이 기록된 시트 수"""
+        return sum(1 for columns in self.sheets.values() if columns)
+
+    def file_id(self, filename):
+        file_id = self.file_ids.get(filename)
+        if file_id is None:
+            file_id = self.file_ids[filename] = len(self.filenames)
+            self.filenames.append(filename)
+        return file_id
+
+    def add(self, sheet_name, coord, filename, value):
+        self.record(sheet_name, {coord: value}, filename)
+
+    def record(self, sheet_name, changes, filename):
+        file_id = self.file_id(filename)
+        columns = self.sheets.get(sheet_name)
+        if columns is None:
+            columns = self.sheets[sheet_name] = CellColumns()
+        owned_keys = self.owned.setdefault(file_id, {}).setdefault(sheet_name, array('q'))
+        for coord, value in changes.items():
+            key = _address_to_key(coord)
+            columns.set(key, file_id, value)
+            owned_keys.append(key)
+
+    def get(self, sheet_name, coord):
+        """취합된 셀이면 (파일명, 값), 아니면 None"""
+        columns = self.sheets.get(sheet_name)
+        cell = columns.get(_address_to_key(coord)) if columns else None
+        return None if cell is None else (self.filenames[cell[0]], cell[1])
+
+    def sheet_changes(self, sheet_name):
+        """시트의 취합된 셀 전체 {좌표: 값}"""
+        columns = self.sheets.get(sheet_name)
+        if not columns:
+            return {}
+        return {_key_to_address(key): columns.values[slot] for key, slot in columns.slots.items()}
+
+    def find_conflicts(self, sheet_name, coords):
+        """이미 취합된 셀과 겹치는 좌표 전체를 {좌표: 소유 파일명}으로 반환"""
+        columns = self.sheets.get(sheet_name)
+        if not columns:
+            return {}
+        conflicts = {}
+        for coord in coords:
+            slot = columns.slots.get(_address_to_key(coord))
+            if slot is not None:
+                conflicts[coord] = self.filenames[columns.owners[slot]]
+        return conflicts
+
+    def remove_owner(self, filename):
+        """파일이 취합한 셀 기록을 모두 제거하고 {시트명: [좌표, ...]} 반환"""
+        file_id = self.file_ids.get(filename)
+        keys_by_sheet = self.owned.pop(file_id, {}) if file_id is not None else {}
+        coords_by_sheet = {}
+        for sheet_name, keys in keys_by_sheet.items():
+            columns = self.sheets[sheet_name]
+            for key in keys:
+                columns.discard(key, file_id)
+            coords_by_sheet[sheet_name] = [_key_to_address(key) for key in sorted(set(keys))]
+        return coords_by_sheet
+
+    def to_dict(self):
+        """이전 형식 딕셔너리 {시트명: {좌표: {'filename': str, 'value': any}}}"""
+        return {
+            sheet_name: {
+                _key_to_address(key): {'filename': self.filenames[columns.owners[slot]], 'value': columns.values[slot]}
+                for key, slot in columns.slots.items()
+            }
+            for sheet_name, columns in self.sheets.items()
+        }
+
+    def to_bytes(self):
+        """압축 스냅샷: 시트별 좌표 키/파일 ID 배열(바이트) + 값 목록"""
+        sheets = {}
+        for sheet_name, columns in self.sheets.items():
+            slots = list(columns.slots.values())
+            sheets[sheet_name] = (
+                array('q', [columns.keys[slot] for slot in slots]).tobytes(),
+                array('i', [columns.owners[slot] for slot in slots]).tobytes(),
+                [columns.values[slot] for slot in slots],
+            )
+        return pickle.dumps((self.SNAPSHOT_VERSION, self.filenames, sheets), protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data):
+        version, filenames, sheets = pickle.loads(data)
+        if version != cls.SNAPSHOT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 버전: {version}")
+        index = cls()
+        index.filenames = list(filenames)
+        index.file_ids = {filename: file_id for file_id, filename in enumerate(filenames)}
+        for sheet_name, (key_bytes, owner_bytes, values) in sheets.items():
+            columns = index.sheets[sheet_name] = CellColumns()
+            columns.keys.frombytes(key_bytes)
+            columns.owners.frombytes(owner_bytes)
+            columns.values = values
+            columns.slots = dict(zip(columns.keys, range(len(values))))
+            for key, file_id in zip(columns.keys, columns.owners):
+                index.owned.setdefault(file_id, {}).setdefault(sheet_name, array('q')).append(key)
+        return index
+
+
+class StateStore:
+    """SQLite 기반 취합 상태 저장소
+
+    - 파일 1개를 받아들이거나 되돌릴 때마다 트랜잭션으로 즉시 커밋 (중간에 멈춰도 상태 유지)
+    - dirty: 마지막 결과 파일 저장 이후 바뀐 셀 (재실행 시 이 셀만 결과 파일에 다시 반영)
+    - snapshot: 종료 시 저장한 ConflictIndex 압축 스냅샷 (generation이 같으면 셀 기록 대신 사용)
+    - read_only=True: 읽기 전용으로 열기 (점검 모드, 스키마 생성/WAL 파일 등 디스크에 쓰지 않음)
+    """
+    def __init__(self, path, read_only=False):
+        self.path = path
+        if read_only:
+            self.conn = sqlite3.connect(self.read_only_uri(path), uri=True)
+            return
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript('''
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS files (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                filename TEXT NOT NULL UNIQUE,
+                file_hash TEXT,
+                content_hash TEXT
+            );
+            CREATE TABLE IF NOT EXISTS cells (
+                sheet TEXT NOT NULL,
+                coord TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                value,
+                PRIMARY KEY (sheet, coord)
+            );
+            CREATE INDEX IF NOT EXISTS cells_filename ON cells (filename);
+            CREATE TABLE IF NOT EXISTS dirty (
+                sheet TEXT NOT NULL,
+                coord TEXT NOT NULL,
+                PRIMARY KEY (sheet, coord)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value
+            );
+            CREATE TABLE IF NOT EXISTS snapshot (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                generation INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+        ''')
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(files)')]
+        if 'content_hash' not in columns:     # 이전 버전 상태 파일
+            self.conn.execute('ALTER TABLE files ADD COLUMN content_hash TEXT')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS files_content_hash ON files (content_hash)')
+
+    @staticmethod
+    def read_only_uri(path):
+        """읽기 전용 SQLite URI
+
+        WAL 파일이 없으면(쓰고 있는 연결이 없으면) immutable로 열어 -wal/-shm 파일도 만들지 않음
+        """
+        uri_path = os.path.abspath(path).replace('\\', '/')
+        if not uri_path.startswith('/'):    # Windows 드라이브 경로 (file:/C:/...)
+            uri_path = '/' + uri_path
+        uri = f"file:{quote(uri_path, safe='/:')}?mode=ro"
+        if not os.path.exists(path + '-wal'):
+            uri += '&immutable=1'
+        return uri
+
+    @staticmethod
+    def encode_value(value):
+        """SQLite 기본 타입은 그대로, 그 외(날짜, bool 등)는 pickle로 저장"""
+        if value is None or type(value) in (int, float, str):
+            return value
+        return pickle.dumps(value)
+
+    @staticmethod
+    def decode_value(value):
+        return pickle.loads(value) if isinstance(value, bytes) else value
+
+    def is_empty(self):
+        return self.conn.execute('SELECT COUNT(*) FROM files').fetchone()[0] == 0
+
+    def generation(self):
+        """셀 기록이 바뀔 때마다 1씩 증가하는 번호"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def _bump_generation(self):
+        self.conn.execute(
+            "INSERT INTO meta VALUES ('generation', 1) ON CONFLICT(key) DO UPDATE SET value = value + 1"
+        )
+
+    def result_pending(self):
+        """지연 반영 모드로 취합한 셀이 아직 결과 파일에 쓰이지 않았는지 (결과 파일 생성 전에 멈춘 경우 True)"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'result_pending'").fetchone()
+        return bool(row and row[0])
+
+    def set_result_pending(self, pending):
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', ('result_pending', int(pending)))
+
+    def load_index(self):
+        """현재 유효한 셀 기록으로 ConflictIndex 생성 (최신 스냅샷이 있으면 스냅샷에서 바로 복원)"""
+        row = self.conn.execute('SELECT generation, data FROM snapshot').fetchone()
+        if row and row[0] == self.generation():
+            try:
+                return ConflictIndex.from_bytes(row[1])
+            except Exception as e:     # 손상된 스냅샷은 무시하고 셀 기록에서 다시 생성
+                print(f"⚠️  상태 스냅샷 로드 실패, 셀 기록에서 다시 읽습니다: {e}")
+
+        index = ConflictIndex()
+        for sheet_name, coord, filename, value in self.conn.execute(
+            'SELECT sheet, coord, filename, value FROM cells'
+        ):
+            index.add(sheet_name, coord, filename, self.decode_value(value))
+        return index
+
+    def save_snapshot(self, data):
+        """현재 셀 기록의 ConflictIndex 스냅샷 저장"""
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO snapshot VALUES (1, ?, ?)', (self.generation(), sqlite3.Binary(data))
+            )
+
+    def add_file(self, filename, file_hash, content_hash, changes_by_sheet):
+        """받아들인 파일의 변경사항 커밋"""
+        rows = [
+            (sheet_name, coord, filename, self.encode_value(value))
+            for sheet_name, changes in changes_by_sheet.items()
+            for coord, value in changes.items()
+        ]
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO files (filename, file_hash, content_hash) VALUES (?, ?, ?)',
+                (filename, file_hash, content_hash)
+            )
+            self.conn.executemany('INSERT OR REPLACE INTO cells VALUES (?, ?, ?, ?)', rows)
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO dirty VALUES (?, ?)', [(row[0], row[1]) for row in rows]
+            )
+            self._bump_generation()
+
+    def remove_file(self, filename):
+        """파일의 변경사항 제거 커밋 (충돌로 되돌린 경우)"""
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO dirty SELECT sheet, coord FROM cells WHERE filename = ?', (filename,)
+            )
+            self.conn.execute('DELETE FROM cells WHERE filename = ?', (filename,))
+            self.conn.execute('DELETE FROM files WHERE filename = ?', (filename,))
+            self._bump_generation()
+
+    def file_hash(self, filename):
+        """받아들인 파일의 해시 (없으면 None)"""
+        row = self.conn.execute('SELECT file_hash FROM files WHERE filename = ?', (filename,)).fetchone()
+        return row[0] if row else None
+
+    def find_content(self, content_hash):
+        """내용 해시가 같은 받아들인 파일명 (없으면 None)"""
+        try:
+            row = self.conn.execute(
+                'SELECT filename FROM files WHERE content_hash = ? LIMIT 1', (content_hash,)
+            ).fetchone()
+        except sqlite3.OperationalError:    # 읽기 전용으로 연 이전 버전 상태 파일 (content_hash 칼럼 없음)
+            return None
+        return row[0] if row else None
+
+    def dirty_cells(self):
+        """마지막 저장 이후 바뀐 셀 {시트명: [좌표, ...]}"""
+        dirty = defaultdict(list)
+        for sheet_name, coord in self.conn.execute('SELECT sheet, coord FROM dirty'):
+            dirty[sheet_name].append(coord)
+        return dirty
+
+    def mark_saved(self):
+        """결과 파일 저장 완료 → dirty 비우기"""
+        with self.conn:
+            self.conn.execute('DELETE FROM dirty')
+
+    def reset(self):
+        with self.conn:
+            for table in ('files', 'cells', 'dirty', 'snapshot'):
+                self.conn.execute(f'DELETE FROM {table}')
+            self._bump_generation()
+
+    def close(self):
+        self.conn.close()
+
+
+class RunMetrics:
+    """실행 계측: 파일/시트별 단계 시간과 카운터를 모아 결과 폴더에 JSON/CSV 보고서로 저장
+
+    - 단계(초): hash, template, open, compare, conflict_check, write_back, state, revert, move, save
+    - 카운터: cells_scanned, cells_changed, conflicts, reverts, rows_appended
+    - 특정 파일/시트와 무관한 항목(양식 로드, 결과 저장 등)은 파일명/시트명을 ''으로 기록
+    """
+    PHASES = ('hash', 'template', 'open', 'compare', 'conflict_check', 'write_back', 'state', 'revert', 'move', 'save')
+    COUNTERS = ('cells_scanned', 'cells_changed', 'conflicts', 'reverts', 'rows_appended')
+
+    def __init__(self, mode='', progress_interval=5.0):
+        self.mode = mode
+        self.progress_interval = progress_interval     # 진행 상황 출력 간격(초)
+        self.started = datetime.now()
+        self.start_time = time.perf_counter()
+        self.records = {}       # {(파일명, 시트명): {단계/카운터: 값}}
+        self.total_files = 0
+        self.loop_start = self.last_progress = self.start_time
+
+    def record(self, filename='', sheet_name=''):
+        key = (filename or '', sheet_name or '')
+        if key not in self.records:
+            self.records[key] = defaultdict(float)
+        return self.records[key]
+
+    @contextmanager
+    def timed(self, phase, filename='', sheet_name=''):
+        """with 블록 실행 시간을 단계 시간에 누적"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(filename, sheet_name)[phase] += time.perf_counter() - start
+
+    def add(self, name, value=1, filename='', sheet_name=''):
+        """카운터 증가"""
+        self.record(filename, sheet_name)[name] += value
+
+    def merge(self, filename, sheet_records):
+        """작업 프로세스에서 따로 잰 {시트명: {단계/카운터: 값}} 합치기"""
+        for sheet_name, values in sheet_records.items():
+            record = self.record(filename, sheet_name)
+            for name, value in values.items():
+                record[name] += value
+
+    def totals(self):
+        totals = defaultdict(float)
+        for record in self.records.values():
+            for name, value in record.items():
+                totals[name] += value
+        return totals
+
+    def start_files(self, total_files):
+        """파일 처리 시작 (처리량/남은 시간 계산 기준)"""
+        self.total_files = total_files
+        self.loop_start = self.last_progress = time.perf_counter()
+
+    def progress(self, done):
+        """처리량과 예상 남은 시간 출력 (progress_interval마다, 마지막 파일은 항상)"""
+        now = time.perf_counter()
+        if done < self.total_files and now - self.last_progress < self.progress_interval:
+            return
+        self.last_progress = now
+        elapsed = max(now - self.loop_start, 1e-9)
+        files_per_sec = done / elapsed
+        remaining = (self.total_files - done) / files_per_sec if files_per_sec else 0
+        totals = self.totals()
+        if totals['rows_appended']:
+            speed = f"{totals['rows_appended'] / elapsed:,.0f} 행/초"
+        else:
+            speed = f"{totals['cells_scanned'] / elapsed:,.0f} 셀/초"
+        print(f"   ⏱  {done}/{self.total_files} 파일 | {files_per_sec:.2f} 파일/초 | {speed} | "
+              f"남은 시간 약 {self.format_seconds(remaining)}")
+
+    @staticmethod
+    def format_seconds(seconds):
+        minutes, seconds = divmod(int(round(seconds)), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+    @staticmethod
+    def report_value(value):
+        """보고서용 값: 정수는 int, 시간은 소수점 4자리"""
+        return int(value) if float(value).is_integer() else round(value, 4)
+
+    def columns(self):
+        """보고서 칼럼: 정의된 단계/카운터 순서 + 그 외 기록된 항목"""
+        recorded = {name for record in self.records.values() for name in record}
+        names = [name for name in self.PHASES + self.COUNTERS if name in recorded]
+        return names + sorted(recorded - set(names))
+
+    def phase_summary(self):
+        """단계별 누적 시간 한 줄 요약 (오래 걸린 순)"""
+        totals = self.totals()
+        phases = sorted((name for name in self.PHASES if totals[name]), key=lambda name: -totals[name])
+        return ', '.join(f"{name} {totals[name]:.2f}s" for name in phases)
+
+    def write_report(self, folder, summary=None):
+        """결과 폴더에 취합보고서_<모드>_<시각>.json/.csv 저장 후 경로 반환"""
+        names = self.columns()
+        totals = self.totals()
+        rows = [
+            {'filename': filename, 'sheet': sheet_name,
+             **{name: self.report_value(record.get(name, 0)) for name in names}}
+            for (filename, sheet_name), record in sorted(self.records.items())
+        ]
+        report = {
+            'mode': self.mode,
+            'started': self.started.isoformat(timespec='seconds'),
+            'elapsed': round(time.perf_counter() - self.start_time, 4),
+            'summary': summary or {},
+            'totals': {name: self.report_value(totals[name]) for name in names},
+            'records': rows,
+        }
+
+        base = os.path.join(folder, f"취합보고서_{self.mode}_{self.started.strftime('%Y%m%d_%H%M%S')}")
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        with open(base + '.csv', 'w', encoding='utf-8-sig', newline='') as f:     # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+            writer = csv.DictWriter(f, fieldnames=['filename', 'sheet'] + names)
+            writer.writeheader()
+            writer.writerows(rows)
+        return base + '.json', base + '.csv'
+
+
+def create_backend(visible=False, name=None):
+    """Excel을 사용할 수 있으면 xlwings, 없으면 openpyxl 백엔드 반환 (name으로 지정 가능)"""
+    if name == 'openpyxl':
+        return OpenpyxlBackend()
+    try:
+        import xlwings as xw
+    except ImportError:     # Excel이 없는 서버 환경
+        xw = None
+    if xw is not None:
+        app = None
+        try:
+            app = xw.App(visible=visible)
+            return XlwingsBackend(app)
+        except Exception as e:
+            if app is not None:     # 실행된 Excel이 숨은 프로세스로 남지 않도록 종료
+                try:
+                    app.quit()
+                except Exception:
+                    pass
+            print(f"ℹ️  Excel을 실행할 수 없습니다: {e}")
+    print("ℹ️  openpyxl 백엔드로 실행합니다. (Excel 없이 처리)\n")
+    return OpenpyxlBackend()
+
+
+class LazyBackend:
+    """처음 파일을 열 때 백엔드를 만드는 래퍼
+
+    - xml 비교만 하는 작업 프로세스는 Excel을 실행하지 않음
+    - 실행 파일: 첫 입력 대기 전에 xlwings를 불러오거나 Excel을 실행하지 않음 (시작 시간 단축)
+    """
+    def __init__(self, name=None, visible=False):
+        self.requested_name = name
+        self.visible = visible
+        self.backend = None
+
+    @property
+    def name(self):
+        """백엔드 이름 (만들기 전에는 create_backend가 고를 백엔드를 xlwings 설치 여부로 추정)"""
+        if self.backend is not None:
+            return self.backend.name
+        if self.requested_name is not None:
+            return self.requested_name
+        return 'xlwings' if importlib.util.find_spec('xlwings') is not None else 'openpyxl'
+
+    def open(self, path):
+        if self.backend is None:
+            self.backend = create_backend(visible=self.visible, name=self.requested_name)
+        return self.backend.open(path)
+
+    def quit(self):
+        if self.backend is not None:
+            self.backend.quit()
+            self.backend = None
+
+
+# 병렬 추출 작업 프로세스별 상태 (프로세스마다 백엔드 최대 1개, block 비교/xls 파일을 열 때 생성)
+_worker_state = {}
+
+def _init_extract_worker(backend_name, template_fp, options):
+    """병렬 추출 작업 프로세스 초기화"""
+    backend = LazyBackend(backend_name)
+    # 작업 프로세스 종료 시 Excel 종료 (atexit은 자식 프로세스에서 실행되지 않음)
+    multiprocessing.util.Finalize(None, backend.quit, exitpriority=10)
+    consolidator = ExcelConsolidator(backend)
+    for key, value in options.items():
+        setattr(consolidator, key, value)
+    _worker_state['consolidator'] = consolidator
+    _worker_state['template_fp'] = template_fp
+
+def _extract_worker(file_path):
+    """작업 프로세스에서 입력 파일 1개의 변경사항 추출"""
+    return _worker_state['consolidator'].extract_file_changes(file_path, _worker_state['template_fp'])
+
+def _init_sheet_worker(template_fp, options):
+    """시트 병렬 비교 작업 프로세스 초기화 (시트 XML만 읽으므로 백엔드 불필요)"""
+    consolidator = ExcelConsolidator(None)
+    for key, value in options.items():
+        setattr(consolidator, key, value)
+    _worker_state['consolidator'] = consolidator
+    _worker_state['template_fp'] = template_fp
+    _worker_state['parts'] = (None, None)
+
+def _compare_sheet_worker(file_path, sheet_name):
+    """작업 프로세스에서 입력 파일의 시트 1개 비교 → (변경사항, 시트 계측)
+
+    파일은 시트마다 열고 닫되(파일 이동을 막지 않도록) 공유 문자열 등은 파일별로 한 번만 파싱
+    """
+    start = time.perf_counter()
+    key = (file_path, os.stat(file_path).st_mtime_ns)
+    with XlsxReader(file_path) as reader:
+        cached_key, parts = _worker_state['parts']
+        if cached_key == key:
+            reader.restore_parts(parts)
+        sheet_metrics = {}
+        changes = _worker_state['consolidator'].compare_sheet_xml(
+            _worker_state['template_fp'].sheets[sheet_name], reader, sheet_name, sheet_metrics
+        )
+        _worker_state['parts'] = (key, reader.parsed_parts())
+    sheet_metrics['compare'] = time.perf_counter() - start
+    return changes, sheet_metrics
+
+
+class ExcelConsolidator:
+    def __init__(self, backend, base_path=None):
+        if base_path is not None:
+            # 작업 폴더 직접 지정 (벤치마크 등)
+            base_path = os.path.abspath(base_path)
+        elif getattr(sys, 'frozen', False):
             # 패키징된 exe 실행 환경
             base_path = os.path.dirname(sys.executable)
         else:
             # 일반 파이썬 스크립트 실행 환경
             base_path = os.path.dirname(os.path.abspath(__file__))
 
-        self.app = app
+        self.backend = backend
+        # 콘솔에서 직접 실행한 경우에만 입력 대기 (배치 서버 등에서는 대기하지 않음)
+        self.interactive = bool(sys.stdin and sys.stdin.isatty())
 
         # 기본 경로
         self.base_path = base_path
         self.template_path = os.path.join(base_path, "양식")
         self.input_folder = os.path.join(base_path, "취합")
         self.output_folder = os.path.join(base_path, "결과")
-        self.state_file = os.path.join(base_path, "결과", "consolidation_state.pkl")
+        self.state_file = os.path.join(base_path, "결과", "consolidation_state.sqlite3")
+        self.legacy_state_file = os.path.join(base_path, "결과", "consolidation_state.pkl")    # 이전 버전 상태 파일
+        self.cache_folder = os.path.join(base_path, "결과", "_캐시")
 
         # 추가 생성 가능 폴더 경로
         self.processed_folder = os.path.join(self.input_folder, "_처리완료")
         self.conflict_folder = os.path.join(self.input_folder, "_오류", "충돌")
         self.error_subfolder = os.path.join(self.input_folder, "_오류", "처리오류")
         self.error_folder = os.path.join(self.input_folder, "_오류")
+        self.duplicate_folder = os.path.join(self.input_folder, "_중복")
         # 공통 옵션 / # 
         self.file_type = ('.xlsx', '.xls', '.xlsm')
         self.blue_color = (0, 176, 240)
-        self.changed_cells = defaultdict(dict)  # {sheet_name: {coord: {'filename': str, 'value': any}}}
+        self.workers = 1        # 2 이상이면 입력 파일 비교를 작업 프로세스 여러 개로 병렬 처리
+        self.sheet_workers = 1  # 2 이상이면 파일 1개의 시트들을 작업 프로세스 여러 개로 동시에 비교 (xml 비교, workers가 1일 때)
+        self.sheet_executor = None      # 시트 병렬 비교 작업 프로세스 풀 (iter_file_changes에서 생성)
+        self.compare_engine = 'auto'    # 'block': 백엔드로 사용 범위를 읽어 비교, 'xml': 시트 XML 스트리밍 비교, 'auto': openpyxl 백엔드의 xlsx/xlsm은 xml
+        self.compare_rules = CompareRules()     # 값 비교 규칙 (CompareRules.exact(): 정확히 같을 때만 같음)
+        self.sheet_compare_rules = {}           # {시트명: CompareRules} 시트별 비교 규칙 (없으면 compare_rules)
+        self.changed_cells = ConflictIndex()    # 취합된 셀 → 소유 파일/값 (정수 좌표·파일 ID로 압축 저장) + 파일별 역색인
+        self.state = None                       # StateStore
         self.conflict_files = []
         self.error_files = []
         self.processed_files = []
+        self.duplicate_files = []
+        self.concat_batch_rows = 10000      # concat_files: 한 번에 결과로 내보내는 최대 행 수
+        self.concat_outputs = ('xlsx',)     # concat_files: 결과 형식 ('xlsx', 'csv', 'parquet', 'sqlite' 중 1개 이상)
+        self.concat_stream_xlsx = True      # concat_files: xlsx 결과를 쓰기 전용으로 스트리밍 저장 (False: 양식 복사본에 백엔드로 쓰기)
+        self.concat_sheet_rows = EXCEL_MAX_ROW      # concat_files: 스트리밍 저장 시 시트 1개의 최대 행 수 (넘으면 시트명_2, ...)
+        self.start_cell = None              # concat_files: 첫번째 칼럼 셀 위치 (지정하면 묻지 않음)
+        self.input_hashes = {}      # {파일명: (파일 해시, 내용 해시)}
+        self.template_sheet_names = None    # 양식 시트명 (내용 해시는 이 시트만, None이면 전체 시트)
+        self.metrics = RunMetrics()     # 실행 계측 (실행마다 새로 생성, 종료 시 결과 폴더에 보고서 저장)
+        # 동일위치 취합 세션 (open_session에서 설정, 감시 모드에서는 종료할 때까지 유지)
+        self.defer_result = False   # True이면 취합 중에는 상태 저장소만 갱신하고 결과 파일은 종료 시 양식 + 취합 셀로 한 번에 생성
+        self.template_fp = None
+        self.template_file = None
+        self.result_file = None
+        self.result_wb = None           # 지연 반영 모드에서는 None
+        self.passwords = ('', '')       # (통합문서 보호 암호, 워크시트 보호 암호)
+        self.input_count = 0
+        self.processed_count = 0
+        self.error_count = 0
+        self.error_msgs = []
+
+    def has_state(self):
+        """이어서 취합할 상태 파일이 있는지 확인"""
+        return os.path.exists(self.state_file) or os.path.exists(self.legacy_state_file)
 
     def load_state(self):
         """이전 취합 상태 로드"""
         try:
-            with open(self.state_file, 'rb') as f:
-                self.changed_cells = pickle.load(f)
+            self.state = StateStore(self.state_file)
+            if self.state.is_empty() and os.path.exists(self.legacy_state_file):
+                # 이전 버전(pickle) 상태 파일 가져오기
+                with open(self.legacy_state_file, 'rb') as f:
+                    legacy_cells = pickle.load(f)     # {시트명: {좌표: {'filename': str, 'value': any}}}
+                changes_by_file = defaultdict(lambda: defaultdict(dict))
+                for sheet_name, sheet_cells in legacy_cells.items():
+                    for coord, info in sheet_cells.items():
+                        changes_by_file[info['filename']][sheet_name][coord] = info['value']
+                for filename, changes_by_sheet in changes_by_file.items():
+                    self.state.add_file(filename, None, None, changes_by_sheet)
+                self.state.mark_saved()
+            self.changed_cells = self.state.load_index()
             print(f"✓ 이전 상태 로드됨: {len(self.changed_cells)} 시트\n")
         except Exception as e:
             print(f"⚠️  상태 파일 로드 실패: {e}\n")
 
+    def has_pending_result(self):
+        """지연 반영 모드로 취합하다 결과 파일을 만들기 전에 멈춘 상태인지"""
+        if not os.path.exists(self.state_file):
+            return False
+        state = StateStore(self.state_file)
+        try:
+            return state.result_pending()
+        finally:
+            state.close()
+
+    def reset_state(self):
+        """새 취합 시작: 상태 초기화"""
+        self.state = StateStore(self.state_file)
+        self.state.reset()
+        self.changed_cells = ConflictIndex()
+
     def save_state(self):
-        """현재 취합 상태 저장"""
+        """상태 스냅샷 저장 후 상태 저장소 닫기 (변경사항은 파일마다 이미 커밋됨)"""
         try:
-            with open(self.state_file, 'wb') as f:
-                pickle.dump(self.changed_cells, f)
+            self.state.save_snapshot(self.changed_cells.to_bytes())
+            self.state.close()
             print(f"\n✓ 상태 저장 완료: {self.state_file}")
         except Exception as e:
             print(f"⚠️  상태 저장 실패: {e}")
 
+    def write_run_report(self, summary):
+        """실행 보고서(JSON/CSV)를 결과 폴더에 저장하고 단계별 시간 요약 출력"""
+        try:
+            json_file, csv_file = self.metrics.write_report(self.output_folder, summary)
+            print(f"\n📊 단계별 시간: {self.metrics.phase_summary()}")
+            print(f"📊 실행 보고서: {json_file} (CSV: {os.path.basename(csv_file)})")
+        except Exception as e:
+            print(f"⚠️  실행 보고서 저장 실패: {e}")
+
+    def replay_unsaved_changes(self, result_wb, template_fp):
+        """마지막 저장 이후 커밋된 변경사항을 결과 파일에 다시 반영 (이전 실행이 중간에 멈춘 경우)"""
+        dirty = self.state.dirty_cells()
+        if not dirty:
+            return
+        print(f"이전 실행에서 저장되지 않은 변경사항을 반영합니다... ({sum(map(len, dirty.values()))}셀)")
+        for sheet_name, coords in dirty.items():
+            result_ws = result_wb.sheet(sheet_name)
+            changes = {}
+            for coord in coords:
+                cell = self.changed_cells.get(sheet_name, coord)
+                if cell is not None:
+                    changes[coord] = cell[1]
+            self.apply_changes_to_template(result_ws, changes)
+            self.revert_changes(result_ws, template_fp.sheets[sheet_name], [c for c in coords if c not in changes])
+
+    def skip_already_processed(self, input_files):
+        """이미 취합된 파일 제외
+
+        - 같은 이름·같은 내용: 상태에 기록됐지만 이동되지 못한 파일(이전 실행 중단) → 처리완료로 이동
+        - 다른 이름·같은 내용: 이미 취합된 파일의 재제출 → _중복으로 이동
+        """
+        remaining = []
+        for filename in input_files:
+            file_path = os.path.join(self.input_folder, filename)
+            file_hash, content_hash = self.input_hashes.get(filename) or (None, None)
+            recorded_hash = self.state.file_hash(filename)
+            original = self.state.find_content(content_hash) if content_hash else None
+            if recorded_hash and recorded_hash == file_hash:
+                shutil.move(file_path, os.path.join(self.processed_folder, filename))
+                print(f"✓ {filename} - 이전 실행에서 이미 취합된 파일 (처리완료로 이동)")
+            elif original is not None and original != filename:
+                self.move_duplicate(filename, original)
+            else:
+                remaining.append(filename)
+        return remaining
+
+    def prompt(self, message):
+        """사용자 입력 받기 (비대화형 실행 시 빈 문자열)"""
+        if not self.interactive:
+            return ''
+        return input(message)
+
+    def wait_for_user(self, message):
+        """사용자 조치 대기 (비대화형 실행 시 대기할 수 없으므로 중단)"""
+        if not self.interactive:
+            raise RuntimeError("사용자 조치가 필요하여 취합을 중단합니다. 위 안내를 확인해주세요.")
+        input(message)
+
+    def open_folder(self, path):
+        """탐색기로 폴더 열기 (Windows 대화형 실행 시에만)"""
+        if self.interactive and hasattr(os, 'startfile'):
+            os.startfile(path)
+
     def create_directory_structure(self):
         """필요한 폴더 구조 생성 (오류 폴더 제외)"""
         os.makedirs(self.template_path, exist_ok=True)
@@ -89,7 +1802,7 @@ class ExcelConsolidator:
                 print(f"📍 경로: {self.template_path}")
                 print("    양식 파일(*.xlsx 또는 *.xls)을 위 폴더에 넣어주세요.\n")
                 
-                input("파일을 추가한 후 엔터를 눌러주세요: ")
+                self.wait_for_user("파일을 추가한 후 엔터를 눌러주세요: ")
                 continue
             
             if len(template_files) == 1:
@@ -102,7 +1815,7 @@ class ExcelConsolidator:
                 print(f"  {i}. {f}")
             
             print("\n불필요한 파일을 삭제하고 1개만 남겨주세요.")
-            input("정리한 후 엔터를 눌러주세요: ")
+            self.wait_for_user("정리한 후 엔터를 눌러주세요: ")
     
     def check_output_files(self):
         """결과 파일 확인 (while로 재귀 처리)"""
@@ -134,101 +1847,416 @@ class ExcelConsolidator:
             print("  1. 이어서 취합할 파일만 남기고 나머지 삭제")
             print("  2. 모든 파일을 삭제하고 새로 시작\n")
             
-            input("위 작업을 완료한 후 엔터를 눌러주세요: ")
+            self.wait_for_user("위 작업을 완료한 후 엔터를 눌러주세요: ")
     
+    def list_input_files(self):
+        """'취합' 폴더의 입력 파일 목록 (임시 파일 제외)"""
+        return [
+            f for f in os.listdir(self.input_folder)
+            if f.endswith(self.file_type) and not f.startswith('~')
+        ]
+
     def check_input_files(self):
         """입력 폴더 파일 확인 (while 재귀)"""
         while True:
-            input_files = [
-                f for f in os.listdir(self.input_folder)
-                if f.endswith(self.file_type) and not f.startswith('~')
-            ]
+            input_files = self.list_input_files()
             
             if input_files:
-                return sorted(input_files)
+                with self.metrics.timed('hash'):
+                    return self.collapse_duplicates(sorted(input_files))
             
             # 파일 없음
             print("⚠️  '취합' 폴더에 처리할 파일이 없습니다.")
             print(f"📍 경로: {self.input_folder}\n")
+            if not self.interactive:
+                return []
             print("처리할 파일들을 '취합' 폴더에 넣어주세요.")
             
             input("\n파일을 추가한 후 엔터를 눌러주세요: ")
 
-    def get_all_coords(self, ws1, ws2):
-        """두 시트의 최대 행/열을 기준으로 모든 셀 좌표 반환"""
-        max_row = max(ws1.used_range.last_cell.row, ws2.used_range.last_cell.row)
-        max_col = max(ws1.used_range.last_cell.column, ws2.used_range.last_cell.column)
-        
-        all_coords = set()
-        for row in range(1, max_row + 1):
-            for col in range(1, max_col + 1):
-                cell = ws1.cells(row, col)
-                all_coords.add(cell.address)
-        
-        return all_coords
-    
+    def read_sheet_names(self, path):
+        """통합문서 목록(workbook.xml)의 시트명 (셀 데이터는 읽지 않음, xlsx/xlsm이 아니면 None)"""
+        if not zipfile.is_zipfile(path):
+            return None
+        with XlsxReader(path) as reader:
+            return reader.sheet_names
+
+    def content_hash(self, path, sheet_names=None):
+        """셀 내용 기준 해시 (저장 시각, 공유 문자열 순서, 서식 등과 무관)
+
+        xlsx/xlsm은 시트별 (좌표, 값)만 해시하고, 그 외 형식은 파일 해시 사용
+        sheet_names(양식 시트)를 주면 그 시트만 해시하고 나머지 시트(붙여넣은 원자료 등)는 압축도 풀지 않음
+        """
+        if not zipfile.is_zipfile(path):
+            return self.file_hash(path)
+        digest = hashlib.sha256()
+        with XlsxReader(path) as reader:
+            for sheet_name in reader.sheet_names:
+                if sheet_names is not None and sheet_name not in sheet_names:
+                    continue
+                digest.update(f"\x00sheet:{sheet_name}".encode('utf-8'))
+                for row, col, value in reader.iter_cells(sheet_name):
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        value = float(value)
+                    digest.update(f"\x00{row},{col}:{value!r}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def move_duplicate(self, filename, original):
+        """중복 제출 파일을 _중복 폴더로 이동"""
+        os.makedirs(self.duplicate_folder, exist_ok=True)
+        shutil.move(os.path.join(self.input_folder, filename), os.path.join(self.duplicate_folder, filename))
+        self.duplicate_files.append(filename)
+        print(f"⚠️  {filename} - '{original}'과(와) 내용이 같은 파일 (중복 제외)")
+
+    def collapse_duplicates(self, input_files, on_duplicate=None):
+        """파일 해시/내용 해시가 같은 입력 파일은 첫 파일(파일명 순)만 남기고 _중복 폴더로 이동
+
+        on_duplicate(filename, original)를 주면 이동 대신 호출 (충돌 점검 모드)
+        """
+        on_duplicate = on_duplicate or self.move_duplicate
+        by_file_hash = {}
+        by_content_hash = {}
+        remaining = []
+        for filename in input_files:
+            file_path = os.path.join(self.input_folder, filename)
+            try:
+                file_hash = self.file_hash(file_path)
+                original = by_file_hash.get(file_hash)
+                if original is None:
+                    content_hash = self.content_hash(file_path, self.template_sheet_names)
+                    original = by_content_hash.get(content_hash)
+                else:
+                    content_hash = self.input_hashes[original][1]
+            except Exception:   # 해시를 계산할 수 없는 파일은 그대로 두고 처리 단계에서 오류 처리
+                remaining.append(filename)
+                self.input_hashes[filename] = (None, None)
+                continue
+
+            if original is not None:
+                on_duplicate(filename, original)
+                continue
+            by_file_hash[file_hash] = filename
+            by_content_hash[content_hash] = filename
+            self.input_hashes[filename] = (file_hash, content_hash)
+            remaining.append(filename)
+        return remaining
+
+    def column_letter(self, col):
+        """열 번호를 열 문자로 변환 (예: 1 → A, 28 → AB)"""
+        letters = ''
+        while col > 0:
+            col, rem = divmod(col - 1, 26)
+            letters = chr(65 + rem) + letters
+        return letters
+
+    def coord_to_address(self, row, col):
+        """행/열 번호를 xlwings 주소 형식으로 변환 (예: 1, 1 → $A$1)"""
+        return f"${self.column_letter(col)}${row}"
+
+    def address_to_rowcol(self, address):
+        """셀 주소를 행/열 번호로 변환 (예: $AB$4 → 4, 28)"""
+        match = re.match(r'^\$?([A-Za-z]+)\$?([0-9]+)$', address)
+        letters, row = match.group(1).upper(), int(match.group(2))
+        col = 0
+        for ch in letters:
+            col = col * 26 + (ord(ch) - 64)
+        return row, col
+
+    def read_block(self, ws, max_row, max_col):
+        """A1부터 (max_row, max_col)까지 값/수식을 한 번에 읽어 2차원 배열로 반환"""
+        values = np.empty((max_row, max_col), dtype=object)
+        values[:, :] = ws.read_values(max_row, max_col)
+
+        formula_mask = np.array(
+            [[str(f).startswith('=') for f in row] for row in ws.read_formulas(max_row, max_col)],
+            dtype=bool
+        ).reshape(max_row, max_col)
+
+        return values, formula_mask
+
+    def file_hash(self, path):
+        """파일 내용의 SHA-256 해시"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def read_input_ranges(self, template_file):
+        """양식의 입력 셀 범위: 보호된 시트의 잠금 해제된 셀 + 데이터 유효성 검사 범위
+
+        - 반환: {시트명: [(row1, col1, row2, col2)] 또는 None(전체 셀 비교)}
+        - 시트 보호가 켜진 시트만 잠금 해제된 셀로 제한 (잠금 해제된 셀이 없으면 [] → 입력할 수 없는 시트로 보고 비교하지 않음)
+          (보호하지 않은 시트는 잠금 속성과 무관하게 모든 셀을 입력할 수 있고, 유효성 검사 범위만으로는 제한하지 않음)
+        - 열/행 단위로 잠금 해제된 경우 시트 끝까지의 범위로 기록
+        - 입력 셀로 제한하는 시트가 없거나 읽을 수 없는 형식(xls)이면 None (전체 셀 비교)
+        """
+        if not zipfile.is_zipfile(template_file):
+            return None
+        wb = openpyxl.load_workbook(template_file)
+        try:
+            input_ranges = {}
+            for ws in wb.worksheets:
+                input_ranges[ws.title] = None
+                if not ws.protection.sheet:
+                    continue
+                unlocked = [
+                    (cell.row, cell.column)
+                    for row in ws.iter_rows() for cell in row
+                    if not isinstance(cell, MergedCell) and cell.has_style and cell.protection.locked is False
+                ]
+                ranges = self.coalesce_blocks(unlocked)
+                for dimension in ws.column_dimensions.values():
+                    if dimension.has_style and dimension.protection.locked is False:
+                        ranges.append((1, dimension.min, EXCEL_MAX_ROW, dimension.max))
+                for row, dimension in ws.row_dimensions.items():
+                    if dimension.has_style and dimension.protection.locked is False:
+                        ranges.append((row, 1, row, EXCEL_MAX_COL))
+                if not ranges:  # 보호된 시트에 잠금 해제된 셀이 없으면 입력할 수 없는 시트
+                    input_ranges[ws.title] = []
+                    continue
+                for validation in ws.data_validations.dataValidation:
+                    for cell_range in validation.sqref.ranges:
+                        ranges.append((cell_range.min_row, cell_range.min_col, cell_range.max_row, cell_range.max_col))
+                input_ranges[ws.title] = ranges
+        finally:
+            wb.close()
+        if all(ranges is None for ranges in input_ranges.values()):
+            return None
+        return input_ranges
+
+    def build_template_fingerprint(self, template_file, content_hash):
+        """양식 파일을 열어 시트별 지문 생성"""
+        try:
+            input_ranges = self.read_input_ranges(template_file)
+        except Exception as e:
+            print(f"⚠️  양식 입력 셀(잠금 해제/유효성 검사) 확인 실패, 전체 셀을 비교합니다: {e}")
+            input_ranges = None
+
+        template_wb = self.backend.open(template_file)
+        try:
+            sheets = {}
+            for sheet_name in template_wb.sheet_names:
+                template_ws = template_wb.sheet(sheet_name)
+                max_row, max_col = template_ws.used_bounds()
+                values, formula_mask = self.read_block(template_ws, max_row, max_col)
+                colors = np.empty((max_row, max_col), dtype=object)
+                colors[:, :] = template_ws.read_colors(max_row, max_col)
+                sheets[sheet_name] = SheetFingerprint(
+                    sheet_name, values, formula_mask, colors,
+                    None if input_ranges is None else input_ranges.get(sheet_name)
+                )
+        finally:
+            template_wb.close()
+
+        if input_ranges is not None:
+            input_sheets = [name for name, sheet_fp in sheets.items() if sheet_fp.input_ranges is not None]
+            print(f"✓ 입력 셀(잠금 해제/유효성 검사)만 비교합니다: {len(input_sheets)}/{len(sheets)}개 시트\n")
+        return TemplateFingerprint(content_hash, sheets, self.backend.name)
+
+    def template_cache_file(self, content_hash, backend_name):
+        """양식 지문 캐시 파일 경로 (지문 형식 버전·백엔드·양식 내용별)"""
+        return os.path.join(
+            self.cache_folder, f"template_v{TemplateFingerprint.VERSION}_{backend_name}_{content_hash[:32]}.pkl"
+        )
+
+    def load_template_fingerprint(self, template_file):
+        """양식 지문 로드 (캐시에 없으면 생성 후 저장, 캐시는 지문 형식 버전·백엔드·양식 내용별)"""
+        content_hash = self.file_hash(template_file)
+        cache_file = self.template_cache_file(content_hash, self.backend.name)
+
+        try:
+            with open(cache_file, 'rb') as f:
+                fingerprint = pickle.load(f)
+            if fingerprint.content_hash == content_hash and fingerprint.backend_name == self.backend.name:
+                print("✓ 양식 캐시 사용\n")
+                return fingerprint
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️  양식 캐시 로드 실패: {e}")
+
+        fingerprint = self.build_template_fingerprint(template_file, content_hash)
+        cache_file = self.template_cache_file(content_hash, fingerprint.backend_name)    # 실제로 만든 백엔드 기준
+        try:
+            os.makedirs(self.cache_folder, exist_ok=True)
+            with open(cache_file, 'wb') as f:
+                pickle.dump(fingerprint, f)
+        except Exception as e:
+            print(f"⚠️  양식 캐시 저장 실패: {e}")
+        return fingerprint
+
     def get_cell_value(self, ws, address):
         """셀 값을 안전하게 가져오기"""
         try:
-            return ws.range(address).value
+            return ws.read_value(*self.address_to_rowcol(address))
         except:
             return None
-    
-    def set_cell_value(self, ws, address, value):
-        """셀 값 설정"""
+
+    def set_block_values(self, ws, row1, col1, values):
+        """(row1, col1)부터 2차원 값 배열을 한 번에 설정"""
         try:
-            ws.range(address).value = value
+            ws.write_values(row1, col1, values)
         except Exception as e:
-            print(f"셀 값 설정 실패 {address}: {e}")
+            print(f"셀 값 설정 실패 {self.coord_to_address(row1, col1)}: {e}")
     
-    def set_cell_color(self, ws, address, rgb_color):
-        """셀 색상 설정"""
+    def set_block_color(self, ws, row1, col1, row2, col2, rgb_color):
+        """사각형 범위 색상을 한 번에 설정"""
         try:
-            ws.range(address).color = rgb_color
+            ws.fill(row1, col1, row2, col2, rgb_color)
         except Exception as e:
-            print(f"셀 색상 설정 실패 {address}: {e}")
+            print(f"셀 색상 설정 실패 {self.coord_to_address(row1, col1)}: {e}")
 
-    def is_formula(self, ws, address):
-        """셀이 수식인지 확인"""
-        try:
-            cell = ws.range(address)
-            return cell.formula.startswith('=')
-        except:
-            return False
+    def coalesce_blocks(self, cells):
+        """셀 좌표들을 빈틈없이 채워진 사각형 블록으로 묶기
+
+        예시:
+        - cells: {(1, 1), (1, 2), (2, 1), (2, 2), (5, 3)}
+        - 반환: [(1, 1, 2, 2), (5, 3, 5, 3)]  # (row1, col1, row2, col2)
+        """
+        # 1) 행마다 연속된 열 구간으로 묶기
+        runs = []
+        for row, col in sorted(cells):
+            if runs and runs[-1][0] == row and runs[-1][2] == col - 1:
+                runs[-1][2] = col
+            else:
+                runs.append([row, col, col])
+
+        # 2) 바로 윗 행에 같은 열 구간이 있으면 아래로 이어 붙이기
+        blocks = []
+        open_blocks = {}    # {(col1, col2): [row1, col1, row2, col2]}
+        for row, col1, col2 in runs:
+            block = open_blocks.get((col1, col2))
+            if block and block[2] == row - 1:
+                block[2] = row
+            else:
+                block = [row, col1, row, col2]
+                open_blocks[(col1, col2)] = block
+                blocks.append(block)
+        return [tuple(block) for block in blocks]
+
+    def rules_for(self, sheet_name):
+        """시트의 값 비교 규칙"""
+        return self.sheet_compare_rules.get(sheet_name, self.compare_rules)
+
+    def compare_worksheets(self, template_fp, source_ws, stats=None):
+        """양식 시트 지문과 시트를 비교하고 변경된 셀 반환
+
+        입력 시트는 사용 범위 전체를 값 블록으로 한 번만 읽은 뒤 배열 단위로 비교 (값 비교 규칙 적용)
+        stats(딕셔너리)를 주면 비교한 셀 수(cells_scanned)를 기록
+        양식에 입력 셀(잠금 해제/유효성 검사)이 지정돼 있으면 입력 셀을 감싸는 범위만 읽고 입력 셀만 비교
+        """
+        template_row, template_col = template_fp.bounds
+        source_row, source_col = source_ws.used_bounds()
+        max_row, max_col = max(template_row, source_row), max(template_col, source_col)
+
+        region = template_fp.input_region(max_row, max_col)
+        if region is None:
+            return {}
+        row1, col1, row2, col2 = region
+
+        template_values, template_formulas = template_fp.window(row1, col1, row2, col2)
+        source_values = np.empty(template_values.shape, dtype=object)
+        source_values[:, :] = source_ws.read_range(row1, col1, row2, col2)
+
+        # 수식인 경우 제외, 입력 셀만 비교
+        diff_mask = self.rules_for(template_fp.name).diff_mask(template_values, source_values) & ~template_formulas
+        if template_fp.input_ranges is not None:
+            diff_mask &= template_fp.input_mask(row1, col1, row2, col2)
+        if stats is not None:
+            stats['cells_scanned'] = stats.get('cells_scanned', 0) + diff_mask.size
+
+        changes = {}
+        for row, col in zip(*np.nonzero(diff_mask)):
+            changes[self.coord_to_address(row + row1, col + col1)] = source_values[row, col]
+
+        return changes
+
+    def compare_sheet_xml(self, template_fp, reader, sheet_name, stats=None):
+        """시트 XML을 스트리밍하며 실제로 있는 셀만 양식 지문과 비교 (희소 비교)
+
+        - 사용 범위(사각형) 크기와 무관하게 값 있는 셀 수에 비례, 메모리 일정
+        - 양식에 값이 있는데 답변에 없는 셀(지운 셀)은 None으로 변경된 것으로 처리
+        - 결과는 compare_worksheets와 같은 {좌표: 값} (값 비교 규칙 적용)
+        """
+        values, formula_mask = template_fp.values, template_fp.formula_mask
+        rules = self.rules_for(sheet_name)
+        n_row, n_col = template_fp.bounds
+        filled = template_fp.filled_input_cells()
 
-    def compare_worksheets(self, template_ws, source_ws):
-        """두 시트를 비교하고 변경된 셀 반환"""
-        all_coords = self.get_all_coords(template_ws, source_ws)
-        
         changes = {}
-        for coord in all_coords:
-            # 수식인 경우 제외 $ 잠금해제된 것만 하면 더 좋을 듯
-            if self.is_formula(template_ws, coord):
+        seen = set()
+        scanned = 0
+        for row, col, value in reader.iter_cells(sheet_name, convert_dates=True):
+            scanned += 1
+            if not template_fp.is_input(row, col):
                 continue
+            if row <= n_row and col <= n_col:
+                if formula_mask[row - 1, col - 1]:
+                    continue
+                template_value = values[row - 1, col - 1]
+            else:
+                template_value = None
+            if (row, col) in filled:
+                seen.add((row, col))
+            if (value != template_value or type(value) is not type(template_value)) and not rules.same(template_value, value):
+                changes[self.coord_to_address(row, col)] = value
 
-            template_value = self.get_cell_value(template_ws, coord)
-            source_value = self.get_cell_value(source_ws, coord)
-            
-            if template_value != source_value:
-                changes[coord] = source_value
-        
+        for row, col in filled - seen:
+            if not rules.same(values[row - 1, col - 1], None):
+                changes[self.coord_to_address(row, col)] = None
+
+        if stats is not None:
+            stats['cells_scanned'] = stats.get('cells_scanned', 0) + scanned
         return changes
-    
+
+    def xml_engine_enabled(self):
+        """시트 XML 스트리밍 비교를 쓸 수 있는지
+
+        'auto'는 openpyxl 백엔드일 때만 사용 (양식 지문 값은 백엔드로 읽으므로 값 형식이 XML과 같아야 함,
+        xlwings는 시간만 있는 셀을 1899-12-30 날짜로, 오류 셀을 None으로 읽어 가짜 변경이 생김)
+        """
+        if self.compare_engine == 'auto':
+            return self.backend.name == 'openpyxl'
+        return self.compare_engine == 'xml'
+
+    def use_xml_engine(self, file_path):
+        """입력 파일을 시트 XML 스트리밍으로 비교할지 여부"""
+        if not self.xml_engine_enabled():
+            return False
+        if self.compare_engine == 'xml':
+            return True
+        return zipfile.is_zipfile(file_path)
+
     def apply_changes_to_template(self, result_ws, changes):
-        """템플릿에 변경사항 적용"""
-        for coord, value in changes.items():
-            self.set_cell_value(result_ws, coord, value)
-            self.set_cell_color(result_ws, coord, self.blue_color)
+        """템플릿에 변경사항 적용 (연속된 셀은 블록 단위로 한 번에 쓰기)"""
+        cells = {self.address_to_rowcol(coord): value for coord, value in changes.items()}
+        for row1, col1, row2, col2 in self.coalesce_blocks(cells):
+            values = [[cells[(r, c)] for c in range(col1, col2 + 1)] for r in range(row1, row2 + 1)]
+            self.set_block_values(result_ws, row1, col1, values)
+            self.set_block_color(result_ws, row1, col1, row2, col2, self.blue_color)
+
+    def revert_changes(self, result_ws, sheet_fp, coords):
+        """변경된 셀들을 양식 값/색상으로 되돌리기 (블록 단위)"""
+        cells = [self.address_to_rowcol(coord) for coord in coords]
+        for row1, col1, row2, col2 in self.coalesce_blocks(cells):
+            values = [[sheet_fp.value_at(r, c) for c in range(col1, col2 + 1)] for r in range(row1, row2 + 1)]
+            self.set_block_values(result_ws, row1, col1, values)
+
+        # 양식 색상이 같은 셀끼리 묶어서 채우기
+        cells_by_color = defaultdict(list)
+        for row, col in cells:
+            cells_by_color[sheet_fp.color_at(row, col)].append((row, col))
+        for color, color_cells in cells_by_color.items():
+            for row1, col1, row2, col2 in self.coalesce_blocks(color_cells):
+                self.set_block_color(result_ws, row1, col1, row2, col2, color)
     
     def has_conflict(self, sheet_name, changes):
-        """충돌 여부 확인: 이미 변경된 셀 중복 체크"""
-        if sheet_name not in self.changed_cells:
-            return None
-        
-        for coord in changes:
-            if coord in self.changed_cells[sheet_name]:
-                return coord
-        return None
+        """충돌 여부 확인: 이미 변경된 셀 중복 체크
+
+        겹치는 셀 전체를 {좌표: 소유 파일명}으로 반환 (충돌 없으면 빈 딕셔너리)
+        """
+        return self.changed_cells.find_conflicts(sheet_name, changes)
     
     def record_changes(self, sheet_name, changes, filename):
         """변경된 셀 기록 (파일명 함께 저장)
@@ -237,19 +2265,138 @@ class ExcelConsolidator:
         - sheet_name: "Sheet1"
         - changes: {'A1': value1, 'B2': value2}
         - filename: "답변_01.xlsx"
-        - self.changed_cells["Sheet1"] = {
-            'A1': {'filename': '답변_01.xlsx', 'value': value1},
-            'B2': {'filename': '답변_01.xlsx', 'value': value2}
-            }
+        - self.changed_cells.get("Sheet1", 'A1') → ('답변_01.xlsx', value1)
+        - self.changed_cells.get("Sheet1", 'B2') → ('답변_01.xlsx', value2)
         """
-        for coord, value in changes.items():
-            self.changed_cells[sheet_name][coord] = {
-                'filename': filename,
-                'value': value
-            }
+        self.changed_cells.record(sheet_name, changes, filename)
     
+    def worker_options(self):
+        """작업 프로세스에 전달할 비교 옵션"""
+        return {
+            'compare_engine': self.compare_engine,
+            'compare_rules': self.compare_rules,
+            'sheet_compare_rules': self.sheet_compare_rules,
+        }
+
+    def extract_file_changes(self, file_path, template_fp):
+        """입력 파일 1개의 시트별 변경사항 추출
+
+        취합 상태(changed_cells)를 읽지 않으므로 파일 간 독립적이며 병렬 실행 가능
+        반환값의 error_at은 비교를 중단한 시트 (충돌 검사는 그 전 시트까지만 진행)
+        """
+        filename = os.path.basename(file_path)
+        result = {
+            'changes_by_sheet': {},
+            'missing_sheets': set(),
+            'error_at': None,       # 오류가 발생한 시트
+            'error_sheet': None,    # 시트 없음 오류인 경우 시트명
+            'error_msg': None,
+            'fatal_msg': None,      # 파일 열기 실패 등
+            'metrics': {},          # {시트명: {단계/카운터: 값}} (파일 단위 항목은 시트명 '')
+        }
+        metrics = result['metrics']
+        start = time.perf_counter()
+        try:
+            use_xml = self.use_xml_engine(file_path)
+            current_wb = XlsxReader(file_path) if use_xml else self.backend.open(file_path)
+            current_sheet_names = current_wb.sheet_names
+        except Exception as e:
+            result['fatal_msg'] = str(e)
+            return result
+        finally:
+            metrics[''] = {'open': time.perf_counter() - start}
+
+        futures = {}
+        try:
+            # 임의로 답변받아야 할 시트를 제거한 답변파일이 있는 경우
+            result['missing_sheets'] = set(template_fp.sheet_names) - set(current_sheet_names)
+            if result['missing_sheets']:
+                return result
+
+            # 입력 셀이 없는 시트는 읽지 않음
+            sheet_names = [name for name in template_fp.sheet_names if template_fp.sheets[name].has_inputs]
+            if use_xml and self.sheet_executor is not None and len(sheet_names) > 1:
+                # 시트를 동시에 비교하고 결과는 양식 시트 순서대로 받음
+                futures = {name: self.sheet_executor.submit(_compare_sheet_worker, file_path, name) for name in sheet_names}
+
+            for sheet_name in sheet_names:
+                try:
+                    start = time.perf_counter()
+                    sheet_metrics = metrics[sheet_name] = {}
+                    if sheet_name in futures:
+                        changes, worker_metrics = futures[sheet_name].result()
+                        sheet_metrics.update(worker_metrics)
+                    elif use_xml:
+                        changes = self.compare_sheet_xml(template_fp.sheets[sheet_name], current_wb, sheet_name, sheet_metrics)
+                    else:
+                        current_ws = current_wb.sheet(sheet_name)
+                        changes = self.compare_worksheets(template_fp.sheets[sheet_name], current_ws, sheet_metrics)
+                    if sheet_name not in futures:
+                        sheet_metrics['compare'] = time.perf_counter() - start
+                    sheet_metrics['cells_changed'] = len(changes)
+                    if changes:
+                        result['changes_by_sheet'][sheet_name] = changes
+                except KeyError:
+                    result['error_at'] = result['error_sheet'] = sheet_name
+                    result['error_msg'] = f"[ERROR] {filename} - 시트 '{sheet_name}' 없음"
+                    break
+                except Exception as e:
+                    result['error_at'] = sheet_name
+                    result['error_msg'] = f"[ERROR] {filename} 처리 중 오류: {str(e)}"
+                    break
+        except Exception as e:
+            result['fatal_msg'] = str(e)
+        finally:
+            for future in futures.values():     # 오류로 중단한 경우 남은 시트 비교 취소
+                future.cancel()
+            wait(futures.values())      # 비교 중인 시트가 끝나야 파일을 옮길 수 있음
+            try:
+                current_wb.close()
+            except Exception as e:
+                result['fatal_msg'] = result['fatal_msg'] or str(e)
+        return result
+
+    def iter_file_changes(self, input_files, template_fp):
+        """입력 파일별 변경사항을 파일명 정렬 순서대로 반환
+
+        workers > 1이면 파일 단위 병렬 추출, 아니면 sheet_workers > 1일 때 파일마다 시트 단위 병렬 비교
+        """
+        file_paths = [os.path.join(self.input_folder, filename) for filename in input_files]
+        workers = min(self.workers, len(file_paths))
+
+        if workers <= 1:
+            sheet_workers = min(self.sheet_workers, len(template_fp.sheet_names), os.cpu_count() or 1)
+            if sheet_workers > 1 and self.xml_engine_enabled():
+                print(f"작업 프로세스 {sheet_workers}개로 시트를 병렬 비교합니다.")
+                self.sheet_executor = ProcessPoolExecutor(
+                    max_workers=sheet_workers,
+                    initializer=_init_sheet_worker,
+                    initargs=(template_fp, self.worker_options()),
+                )
+            try:
+                for file_path in file_paths:
+                    yield self.extract_file_changes(file_path, template_fp)
+            finally:
+                if self.sheet_executor is not None:
+                    self.sheet_executor.shutdown(cancel_futures=True)
+                    self.sheet_executor = None
+            return
+
+        print(f"작업 프로세스 {workers}개로 병렬 비교합니다.")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_extract_worker,
+            initargs=(self.backend.name, template_fp, self.worker_options()),
+        ) as executor:
+            # map은 제출 순서대로 결과를 돌려주므로 적용 순서는 직렬 처리와 동일
+            yield from executor.map(_extract_worker, file_paths)
+
     def input_excel_cell(self):
         pattern = r'^[A-Za-z]+[1-9][0-9]*$'
+        if self.start_cell:
+            return self.start_cell
+        if not self.interactive:
+            raise RuntimeError("첫번째 칼럼 셀 위치(start_cell)가 지정되지 않았습니다.")
         while True:
             user_input = input('첫번째 칼럼 셀 위치를 입력하세요.(예: A4): ')
             if re.match(pattern, user_input):
@@ -257,236 +2404,663 @@ class ExcelConsolidator:
             else:
                 print('잘못된 형식입니다. 예) A4, B12 형식으로 입력해 주세요.')
 
-    def append_to_template_position(self):
-        """모든 파일 취합 시작"""
+    def open_session(self, watch=False):
+        """취합 준비: 양식 지문 로드, 결과 파일/상태 열기, 보호 해제, 중단된 실행 복구
+
+        처리할 입력 파일 목록 반환 (실패 시 None)
+        watch=True이면 입력 파일이 없어도 기다리지 않음 (감시 모드)
+        """
         # 폴더 생성
         self.create_directory_structure()
-        
+
         # 템플릿 확인
         template_file = self.check_template_file()
-        
+        self.template_sheet_names = self.read_sheet_names(template_file)
+
         # 결과 파일 확인 (경로 반환, 없으면 새 경로)
         result_file = self.check_output_files()
-        
+
         # 입력 파일 확인
-        input_files = self.check_input_files()
-        
+        if watch:
+            with self.metrics.timed('hash'):
+                input_files = self.collapse_duplicates(sorted(self.list_input_files()))
+        else:
+            input_files = self.check_input_files()
+
+        # 결과 파일 보호 해제 암호 (양식/결과 파일을 열기 전에 물어 입력 대기 전에는 Excel을 실행하지 않음)
+        wb_pw = self.prompt('통합문서 보호 암호를 입력하세요. 없으면 엔터를 누르세요.')
+        ws_pw = self.prompt('워크시트 보호 암호를 입력하세요. 없으면 엔터를 누르세요.')
+        self.passwords = (wb_pw, ws_pw)
+
         try:
-            template_wb = self.app.books.open(template_file)
+            with self.metrics.timed('template'):
+                template_fp = self.load_template_fingerprint(template_file)
 
         except Exception as e:
             print(f"❌ 양식 파일 열기 실패: {e}")
-            return
-        
-        # 결과 파일 생성/로드
-        if os.path.exists(result_file) and os.path.exists(self.state_file):
+            return None
+
+        # 결과 파일 생성/로드 (지연 반영 모드에서는 종료 시 생성하므로 열지 않음)
+        # 지연 반영 모드는 결과 파일을 만들기 전에 멈춘 경우에만 결과 파일 없이 이어서 취합
+        # (결과 파일을 지워 새로 시작하는 경우는 이전 상태를 초기화)
+        result_wb = None
+        if self.has_state() and (os.path.exists(result_file) or (self.defer_result and self.has_pending_result())):
             # 기존 파일: 상태 복원
             try:
-                result_wb = self.app.books.open(result_file)
+                if not self.defer_result:
+                    result_wb = self.backend.open(result_file)
                 self.load_state()
             except Exception as e:
                 print(f"❌ 기존 결과 파일 열기 실패: {e}")
-                return
+                return None
         else:
             # 새 파일: 템플릿 복사
-            shutil.copy(template_file, result_file)
             try:
-                result_wb = self.app.books.open(result_file)
+                if not self.defer_result:
+                    shutil.copy(template_file, result_file)
+                    result_wb = self.backend.open(result_file)
+                self.reset_state()
             except Exception as e:
                 print(f"❌ 결과 파일 생성 실패: {e}")
-                return
+                return None
+
+        if self.state is not None:
+            self.state.set_result_pending(self.defer_result)
 
         # 결과 파일에 시트 및 통합문서 보호 설정 해제
-        wb_pw = input('통합문서 보호 암호를 입력하세요. 없으면 엔터를 누르세요.')
-        ws_pw = input('워크시트 보호 암호를 입력하세요. 없으면 엔터를 누르세요.')
-        result_wb.api.Unprotect(Password=f'{wb_pw}')
+        if result_wb is not None:
+            self.unprotect_result(result_wb, template_fp)
 
-        template_sheet_names = [sheet.name for sheet in template_wb.sheets]
+        self.template_fp = template_fp
+        self.template_file = template_file
+        self.result_file = result_file
+        self.result_wb = result_wb
+        self.input_count = 0
+        self.processed_count = 0
+        self.error_count = 0
+        self.error_msgs = []
 
-        for sheet_name in template_sheet_names:
-            result_ws = result_wb.sheets[sheet_name]
-            result_ws.api.Unprotect(Password=f'{ws_pw}')
+        # 이전 실행이 중간에 멈춘 경우 이어서 복구 (지연 반영 모드는 결과 파일을 상태에서 새로 만들므로 불필요)
+        if result_wb is not None:
+            self.replay_unsaved_changes(result_wb, template_fp)
+        return self.skip_already_processed(input_files)
 
-        # 입력 파일 가져오기
+    def unprotect_result(self, result_wb, template_fp):
+        """결과 파일의 통합문서/양식 시트 보호 해제"""
+        wb_pw, ws_pw = self.passwords
+        result_wb.unprotect(f'{wb_pw}')
+        for sheet_name in template_fp.sheet_names:
+            result_ws = result_wb.sheet(sheet_name)
+            result_ws.unprotect(f'{ws_pw}')
+
+    def materialize_result(self):
+        """지연 반영 모드: 양식 복사본에 취합된 셀 전체를 한 번에 써서 결과 파일 생성 (열기/저장 1회)"""
+        with self.metrics.timed('open'):
+            shutil.copy(self.template_file, self.result_file)
+            result_wb = self.backend.open(self.result_file)
+        try:
+            self.unprotect_result(result_wb, self.template_fp)
+            for sheet_name in self.template_fp.sheet_names:
+                changes = self.changed_cells.sheet_changes(sheet_name)
+                if changes:
+                    with self.metrics.timed('write_back', '', sheet_name):
+                        self.apply_changes_to_template(result_wb.sheet(sheet_name), changes)
+            with self.metrics.timed('save'):
+                result_wb.save()
+        finally:
+            result_wb.close()
+
+    def process_files(self, input_files):
+        """입력 파일들을 파일명 순서대로 비교 → 충돌 검사 → 결과 파일에 반영"""
         print(f"총 {len(input_files)}개 파일 처리 시작...")
-        
-        processed_count = 0
-        error_count = 0
-        error_msgs = []
+        self.input_count += len(input_files)
 
-        for idx, filename in enumerate(input_files, 1):
-            file_path = os.path.join(self.input_folder, filename)
-            
-            try:
-                current_wb = self.app.books.open(file_path)
-                
-                # 1단계: 모든 시트 검증 및 변경사항 추출
-                changes_by_sheet = {}
-                file_has_error = False
-                error_sheet = None
-                error_coord = None
-                error_origin_file = None
-
-                current_sheet_names = [sheet.name for sheet in current_wb.sheets]
-                # if set(template_sheet_names) != set(current_sheet_names):
-                diff1 = set(template_sheet_names) - set(current_sheet_names)    # 임의로 답변받아야 할 시트를 제거한 답변파일이 있는 경우
-                if diff1:
-                    file_has_error = True
-                    error_sheet = diff1
-                    # diff1 = set(template_sheet_names) - set(current_sheet_names)    # 임의로 답변받아야 할 시트를 제거한 답변파일이 있는 경우
-                    # diff2 = set(current_sheet_names) - set(template_sheet_names)    # 임의로 시트를 추가한 답변파일이 있는 경우 / template 파일에서 일부 시트를 지운 경우(현재 임시로 정상)
-                    # error_sheet = diff1 | diff2
-                else:
-                    for sheet_name in template_sheet_names:     # $ 잠기지 않은 셀이 있는 시트만 하면 더 좋을 듯 // 일단은 template 파일에서 취합할 시트만 남겨서 진행하는 방식으로 사용
-                        try:
-                            if sheet_name not in current_sheet_names:
-                                file_has_error = True
-                                error_sheet = sheet_name
-                                break
-
-                            template_ws = template_wb.sheets[sheet_name]
-                            current_ws = current_wb.sheets[sheet_name]
-                            result_ws = result_wb.sheets[sheet_name]
-                            
-                            changes = self.compare_worksheets(template_ws, current_ws)
-                            
-                            if changes:
-                                conflict_coord = self.has_conflict(sheet_name, changes)
-                                if conflict_coord:
-                                    file_has_error = True
-                                    error_sheet = sheet_name
-                                    error_coord = conflict_coord
-                                    error_origin_file = self.changed_cells[sheet_name][error_coord]['filename']
-                                    break
-                                
-                                changes_by_sheet[sheet_name] = changes
-                        
-                        except KeyError:
-                            err_msg = f"[ERROR] {filename} - 시트 '{sheet_name}' 없음"
-                            print(err_msg)
-                            error_msgs.append(err_msg)
+        self.metrics.start_files(len(input_files))
+        file_results = self.iter_file_changes(input_files, self.template_fp)
+        for idx, (filename, file_result) in enumerate(zip(input_files, file_results), 1):
+            self.metrics.merge(filename, file_result['metrics'])
+            self.process_file(filename, file_result, idx, len(input_files))
+            self.metrics.progress(idx)
+
+    def process_file(self, filename, file_result, idx, total):
+        """입력 파일 1개의 추출 결과를 충돌 검사 후 결과 파일에 반영 (충돌/오류 파일은 이동)"""
+        file_path = os.path.join(self.input_folder, filename)
+
+        try:
+            # 1단계: 모든 시트 검증 및 변경사항 추출 (추출은 iter_file_changes에서 진행)
+            if file_result['fatal_msg']:
+                raise RuntimeError(file_result['fatal_msg'])
+
+            changes_by_sheet = {}
+            file_has_error = False
+            error_sheet = None
+            error_coord = None
+            error_origin_files = []
+
+            # if set(template_sheet_names) != set(current_sheet_names):
+            diff1 = file_result['missing_sheets']    # 임의로 답변받아야 할 시트를 제거한 답변파일이 있는 경우
+            if diff1:
+                file_has_error = True
+                error_sheet = diff1
+                # diff1 = set(template_sheet_names) - set(current_sheet_names)    # 임의로 답변받아야 할 시트를 제거한 답변파일이 있는 경우
+                # diff2 = set(current_sheet_names) - set(template_sheet_names)    # 임의로 시트를 추가한 답변파일이 있는 경우 / template 파일에서 일부 시트를 지운 경우(현재 임시로 정상)
+                # error_sheet = diff1 | diff2
+            else:
+                for sheet_name in self.template_fp.sheet_names:     # 입력 셀이 없는 시트는 추출 단계에서 비교하지 않음 (changes 없음)
+                    if sheet_name == file_result['error_at']:
+                        err_msg = file_result['error_msg']
+                        print(err_msg)
+                        self.error_msgs.append(err_msg)
+                        file_has_error = True
+                        error_sheet = file_result['error_sheet']
+                        break
+
+                    changes = file_result['changes_by_sheet'].get(sheet_name)
+                    
+                    if changes:
+                        with self.metrics.timed('conflict_check', filename, sheet_name):
+                            conflicts = self.has_conflict(sheet_name, changes)
+                        if conflicts:
+                            self.metrics.add('conflicts', len(conflicts), filename, sheet_name)
                             file_has_error = True
                             error_sheet = sheet_name
+                            error_coord = sorted(conflicts, key=self.address_to_rowcol)
+                            error_origin_files = sorted(set(conflicts.values()))
                             break
-                        except Exception as e:
-                            err_msg = f"[ERROR] {filename} 처리 중 오류: {str(e)}"
-                            print(err_msg)
-                            error_msgs.append(err_msg)
-                            file_has_error = True
-                            break
-                    
-                current_wb.close()
-                
-                # 2단계: 에러 있으면 파일만 이동
-                if file_has_error:
-                    err_msg = f"\n⚠️  [충돌/오류 감지] {filename}"
-                    print(err_msg)
-                    error_msgs.append(err_msg)
-                    if error_sheet:
-                        self.create_conflict_folders()
+                        
+                        changes_by_sheet[sheet_name] = changes
+            
+            # 2단계: 에러 있으면 파일만 이동
+            if file_has_error:
+                err_msg = f"\n⚠️  [충돌/오류 감지] {filename}"
+                print(err_msg)
+                self.error_msgs.append(err_msg)
+                if error_sheet:
+                    self.create_conflict_folders()
+                    with self.metrics.timed('move', filename):
                         shutil.move(file_path, os.path.join(self.conflict_folder, filename))
-                        self.conflict_files.append(filename)
+                    self.conflict_files.append(filename)
 
-                        if error_coord:
-                            err_msg = f"   시트: {error_sheet}, 충돌 셀: {error_coord}, 충돌 파일: {error_origin_file}"
-                            print(err_msg)
-                            error_msgs.append(err_msg)
-                            shutil.move(os.path.join(self.processed_folder, error_origin_file), os.path.join(self.conflict_folder, error_origin_file))
+                    if error_coord:
+                        coord_text = ', '.join(error_coord[:10])
+                        if len(error_coord) > 10:
+                            coord_text += f" 외 {len(error_coord) - 10}개"
+                        err_msg = f"   시트: {error_sheet}, 충돌 셀: {coord_text}, 충돌 파일: {', '.join(error_origin_files)}"
+                        print(err_msg)
+                        self.error_msgs.append(err_msg)
+                        for error_origin_file in error_origin_files:
                             # 원본 파일에서 변경됐던 셀들을 template 상태로 되돌리기
-                            print(f"   원본 파일의 변경사항을 되돌리고 있습니다...")
-                            for sheet_name_key in self.changed_cells:
-                                coords_to_revert = []
-                                for coord, info in self.changed_cells[sheet_name_key].items():
-                                    if info['filename'] == error_origin_file:
-                                        coords_to_revert.append(coord)
-                                
-                                if coords_to_revert:
-                                    result_ws = result_wb.sheets[sheet_name_key]
-                                    template_ws = template_wb.sheets[sheet_name_key]
-                                    
-                                    for coord in coords_to_revert:
-                                        template_value = self.get_cell_value(template_ws, coord)
-                                        self.set_cell_value(result_ws, coord, template_value)
+                            print(f"   원본 파일({error_origin_file})의 변경사항을 되돌리고 있습니다...")
+                            # 파일 이동 전에 상태에서 먼저 제거 (되돌릴 셀이 dirty에 기록되므로 이동 중 멈춰도 재실행 시 복구)
+                            with self.metrics.timed('state', error_origin_file):
+                                self.state.remove_file(error_origin_file)
+                            origin_path = os.path.join(self.processed_folder, error_origin_file)
+                            if os.path.exists(origin_path):
+                                with self.metrics.timed('move', error_origin_file):
+                                    shutil.move(origin_path, os.path.join(self.conflict_folder, error_origin_file))
+                            # changed_cells에서 제거하면서 되돌릴 셀 목록 받기 (해당 파일의 변경 셀만 조회)
+                            for sheet_name_key, coords_to_revert in self.changed_cells.remove_owner(error_origin_file).items():
+                                if self.result_wb is not None:     # 지연 반영 모드는 상태에서 지우는 것으로 끝
+                                    with self.metrics.timed('revert', error_origin_file, sheet_name_key):
+                                        result_ws = self.result_wb.sheet(sheet_name_key)
                                         # 파란색 제거 (template 상태로 원상복구)
-                                        self.set_cell_color(result_ws, coord, template_ws.range(coord).color)
-                                        
-                                        # changed_cells에서도 제거
-                                        del self.changed_cells[sheet_name_key][coord]
-                            processed_count -= 1
-
-                            print(f"   ✓ 원본 파일의 변경사항 복원 완료")
-                        else:
-                            err_msg = f"   시트: {error_sheet}"
-                            print(err_msg)
-                            error_msgs.append(err_msg)
+                                        self.revert_changes(result_ws, self.template_fp.sheets[sheet_name_key], coords_to_revert)
+                                self.metrics.add('reverts', len(coords_to_revert), error_origin_file, sheet_name_key)
+                            if error_origin_file in self.processed_files:   # 이번 실행에서 처리된 파일인 경우
+                                self.processed_files.remove(error_origin_file)
+                                self.processed_count -= 1
+
+                        print(f"   ✓ 원본 파일의 변경사항 복원 완료")
                     else:
-                        self.create_error_subfolders()
+                        err_msg = f"   시트: {error_sheet}"
+                        print(err_msg)
+                        self.error_msgs.append(err_msg)
+                else:
+                    self.create_error_subfolders()
+                    with self.metrics.timed('move', filename):
                         shutil.move(file_path, os.path.join(self.error_subfolder, filename))
-                        self.error_files.append(filename)
+                    self.error_files.append(filename)
 
-                    print("   → 파일 제외\n")
-                    error_count += 1
-                else:
-                    # 3단계: 에러 없으면 모든 변경사항 적용
-                    for sheet_name, changes in changes_by_sheet.items():
-                        result_ws = result_wb.sheets[sheet_name]
-                        self.apply_changes_to_template(result_ws, changes)
-                        self.record_changes(sheet_name, changes, filename)
-                    
-                    processed_file_path = os.path.join(self.processed_folder, filename)
-                    shutil.move(file_path, processed_file_path)
-                    self.processed_files.append(filename)
-                    print(f"[{idx}/{len(input_files)}] {filename} - 처리 완료 ✓")
-                    processed_count += 1
-                
-            except Exception as e:
-                err_msg = f"[ERROR] {filename} 처리 중 심각한 오류: {str(e)}\n"
-                print(err_msg)
                 print("   → 파일 제외\n")
-                error_msgs.append(err_msg)
-                self.create_error_folders()
-                shutil.move(file_path, os.path.join(self.error_subfolder, filename))
-                self.error_files.append(filename)
-                error_count += 1
-        
+                self.error_count += 1
+            else:
+                # 3단계: 에러 없으면 모든 변경사항 적용 (상태 저장소에 먼저 커밋)
+                with self.metrics.timed('state', filename):
+                    self.state.add_file(filename, *self.input_hashes.get(filename, (None, None)), changes_by_sheet)
+                for sheet_name, changes in changes_by_sheet.items():
+                    if self.result_wb is not None:     # 지연 반영 모드는 종료 시 한 번에 반영
+                        with self.metrics.timed('write_back', filename, sheet_name):
+                            result_ws = self.result_wb.sheet(sheet_name)
+                            self.apply_changes_to_template(result_ws, changes)
+                    self.record_changes(sheet_name, changes, filename)
+                
+                processed_file_path = os.path.join(self.processed_folder, filename)
+                with self.metrics.timed('move', filename):
+                    shutil.move(file_path, processed_file_path)
+                self.processed_files.append(filename)
+                print(f"[{idx}/{total}] {filename} - 처리 완료 ✓")
+                self.processed_count += 1
+            
+        except Exception as e:
+            err_msg = f"[ERROR] {filename} 처리 중 심각한 오류: {str(e)}\n"
+            print(err_msg)
+            print("   → 파일 제외\n")
+            self.error_msgs.append(err_msg)
+            self.create_error_subfolders()
+            shutil.move(file_path, os.path.join(self.error_subfolder, filename))
+            self.error_files.append(filename)
+            self.error_count += 1
+
+    def flush_result(self):
+        """결과 파일 저장 (저장된 셀은 상태 저장소의 dirty에서 제거)
+
+        지연 반영 모드에서는 양식 + 취합된 셀로 결과 파일을 새로 생성
+        """
+        if self.result_wb is None:
+            self.materialize_result()
+            self.state.set_result_pending(False)
+        else:
+            with self.metrics.timed('save'):
+                self.result_wb.save()
+        self.state.mark_saved()
+
+    def close_session(self):
+        """결과 파일 저장 후 닫기, 상태 저장, 실행 보고서 저장 및 완료 보고"""
         # 저장 및 닫기
         try:
-            result_wb.save()
-            result_wb.close()
-            template_wb.close()
+            self.flush_result()
+            if self.result_wb is not None:
+                self.result_wb.close()
         except Exception as e:
             print(f"파일 저장 중 오류: {e}")
 
         # 상태 저장
         self.save_state()
+        self.write_run_report({
+            'input_files': self.input_count,
+            'processed_files': self.processed_count,
+            'error_files': self.error_count,
+            'conflict_files': len(self.conflict_files),
+            'duplicate_files': len(self.duplicate_files),
+            'result_file': self.result_file,
+        })
         
         # 완료 보고
         print("\n" + "="*60)
         print(f"취합 완료!")
-        print(f"처리된 파일: {processed_count}개")
-        # print(f"오류 파일: {error_count}개")
-        print(f"\n📄 결과 파일: {result_file}")
+        print(f"처리된 파일: {self.processed_count}개")
+        # print(f"오류 파일: {self.error_count}개")
+        if self.duplicate_files:
+            print(f"중복 제외 파일: {len(self.duplicate_files)}개 (📁 {self.duplicate_folder})")
+        print(f"\n📄 결과 파일: {self.result_file}")
         print("="*60)
         
         # 에러 폴더 열기 (1건 이상)
-        if error_count > 0:
-            print(f"\n❌ 오류 발생 파일 ({error_count}개) 내역 요약")
-            print(f'{'\n'.join(error_msgs)}')
+        if self.error_count > 0:
+            print(f"\n❌ 오류 발생 파일 ({self.error_count}개) 내역 요약")
+            print(f'{'\n'.join(self.error_msgs)}')
             print(f"📁 오류 파일을 확인하고 수정하여 '취합' 폴더에 다시 넣고 재실행하세요.")
-            os.startfile(self.error_folder)
+            self.open_folder(self.error_folder)
         else:
             # 성공 시 결과 파일 열기
             print(f"\n✅ 모든 파일이 안전하게 처리되었습니다!")
             print(f"\n📄 결과 파일을 열고 있습니다...\n")
-            os.startfile(os.path.dirname(result_file))
+            self.open_folder(os.path.dirname(self.result_file))
+
+    def append_to_template_position(self):
+        """모든 파일 취합 시작"""
+        self.metrics = RunMetrics('append')
+
+        input_files = self.open_session()
+        if input_files is None:
+            return
+
+        # 입력 파일 가져오기
+        self.process_files(input_files)
+
+        self.close_session()
+
+    def poll_ready_files(self, pending, settle_seconds):
+        """쓰기가 끝난 새 입력 파일 목록 (감시 모드)
+
+        - pending: {파일명: ((크기, 수정 시각), 처음 확인한 시각)} - 호출 사이에 유지
+        - 크기/수정 시각이 settle_seconds 동안 그대로이고 다른 프로그램이 잡고 있지 않은 파일만 반환
+        """
+        now = time.monotonic()
+        current = set(self.list_input_files())
+        for filename in set(pending) - current:
+            del pending[filename]
+
+        ready = []
+        for filename in sorted(current):
+            file_path = os.path.join(self.input_folder, filename)
+            try:
+                stat = os.stat(file_path)
+            except OSError:     # 그 사이 이동/삭제됨
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            seen = pending.get(filename)
+            if seen is None or seen[0] != signature:
+                pending[filename] = (signature, now)
+                continue
+            if now - seen[1] < settle_seconds:
+                continue
+            try:
+                os.rename(file_path, file_path)     # 복사/저장 중인 파일은 잠겨 있어 실패 (Windows)
+            except OSError:
+                continue
+            del pending[filename]
+            ready.append(filename)
+        return ready
+
+    def watch_input_folder(self, poll_interval=2.0, settle_seconds=3.0, flush_interval=60.0, idle_timeout=None):
+        """감시 모드: 양식 지문·상태·결과 파일을 열어 둔 채 '취합' 폴더에 들어오는 파일을 바로 취합
+
+        - poll_interval초마다 폴더 확인, 쓰기가 끝난 파일만 처리 (poll_ready_files)
+        - 결과 파일은 변경이 있으면 flush_interval초마다 저장 (그 사이 멈춰도 상태 저장소로 복구)
+        - Ctrl+C 또는 idle_timeout초 동안 새 파일이 없으면 저장 후 종료
+        """
+        self.metrics = RunMetrics('watch')
+
+        input_files = self.open_session(watch=True)
+        if input_files is None:
+            return
+        if input_files:
+            self.process_files(input_files)
+            self.flush_result()
+
+        print(f"\n👀 '취합' 폴더 감시 중... (종료: Ctrl+C)")
+        print(f"📍 경로: {self.input_folder}\n")
+        pending = {}
+        unsaved = False
+        last_flush = last_activity = time.monotonic()
+        try:
+            while True:
+                time.sleep(poll_interval)
+                ready = self.poll_ready_files(pending, settle_seconds)
+                if ready:
+                    with self.metrics.timed('hash'):
+                        ready = self.collapse_duplicates(ready)
+                    ready = self.skip_already_processed(ready)
+                if ready:
+                    self.process_files(ready)
+                    unsaved = True
+                    last_activity = time.monotonic()
+
+                now = time.monotonic()
+                if unsaved and now - last_flush >= flush_interval:
+                    try:
+                        self.flush_result()
+                        print(f"💾 결과 파일 저장 ({datetime.now().strftime('%H:%M:%S')})")
+                    except Exception as e:
+                        print(f"파일 저장 중 오류: {e}")
+                    unsaved = False
+                    last_flush = now
+                if idle_timeout is not None and now - last_activity >= idle_timeout:
+                    print(f"{idle_timeout:.0f}초 동안 새 파일이 없어 감시를 종료합니다.")
+                    break
+        except KeyboardInterrupt:
+            print("\n감시를 종료합니다.")
+
+        self.close_session()
+
+    def load_consolidated_index(self):
+        """이미 취합된 셀 색인을 읽기만 함 (상태가 없으면 빈 색인, 점검 모드용)"""
+        if os.path.exists(self.state_file):
+            state = StateStore(self.state_file, read_only=True)
+            try:
+                return state.load_index()
+            finally:
+                state.close()
+        if os.path.exists(self.legacy_state_file):
+            with open(self.legacy_state_file, 'rb') as f:
+                return ConflictIndex(pickle.load(f))
+        return ConflictIndex()
+
+    def find_resubmissions(self, input_files):
+        """이미 취합된 파일과 같은 입력 파일 {파일명: 취합된 파일명} (skip_already_processed와 같은 기준, 점검 모드용)
+
+        상태를 읽기 전용으로 열어 확인 (collapse_duplicates로 input_hashes를 먼저 계산해야 함)
+        """
+        if not os.path.exists(self.state_file):
+            return {}
+        state = StateStore(self.state_file, read_only=True)
+        try:
+            found = {}
+            for filename in input_files:
+                file_hash, content_hash = self.input_hashes.get(filename) or (None, None)
+                recorded_hash = state.file_hash(filename)
+                original = state.find_content(content_hash) if content_hash else None
+                if recorded_hash and recorded_hash == file_hash:
+                    found[filename] = filename
+                elif original is not None and original != filename:
+                    found[filename] = original
+            return found
+        finally:
+            state.close()
+
+    def find_overlaps(self, changes_by_file):
+        """파일 × 파일 겹침 계산 (시트별 역색인: 좌표 → 변경한 파일 목록)
+
+        - changes_by_file: {파일명: {시트명: {좌표: 값}}} (파일명 순)
+        - 반환값: {(파일 A, 파일 B, 시트명): [좌표, ...]} (A가 파일명 순으로 앞)
+        """
+        filenames = list(changes_by_file)
+        owners_by_sheet = defaultdict(lambda: defaultdict(list))     # {시트명: {좌표 키: [파일 번호, ...]}}
+        for file_idx, filename in enumerate(filenames):
+            for sheet_name, changes in changes_by_file[filename].items():
+                owners = owners_by_sheet[sheet_name]
+                for coord in changes:
+                    owners[_address_to_key(coord)].append(file_idx)
+
+        overlaps = defaultdict(list)
+        for sheet_name, owners in owners_by_sheet.items():
+            for key, file_idxs in owners.items():
+                if len(file_idxs) < 2:
+                    continue
+                coord = _key_to_address(key)
+                for i, a in enumerate(file_idxs):
+                    for b in file_idxs[i + 1:]:
+                        overlaps[(filenames[a], filenames[b], sheet_name)].append(coord)
+        for coords in overlaps.values():
+            coords.sort(key=self.address_to_rowcol)
+        return overlaps
+
+    def write_conflict_report(self, report):
+        """결과 폴더에 충돌점검_<시각>.json/.csv 저장 후 경로 반환 (CSV는 겹치는 파일 쌍 목록)"""
+        base = os.path.join(self.output_folder, f"충돌점검_{self.metrics.started.strftime('%Y%m%d_%H%M%S')}")
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        with open(base + '.csv', 'w', encoding='utf-8-sig', newline='') as f:     # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+            writer = csv.DictWriter(f, fieldnames=['file_a', 'file_b', 'consolidated', 'sheet', 'cell_count', 'cells'])
+            writer.writeheader()
+            for pair in report['pairs']:
+                writer.writerow({**pair, 'cells': ' '.join(pair['cells'])})
+        return base + '.json', base + '.csv'
+
+    def dry_run_conflicts(self):
+        """충돌 점검 모드: '취합' 폴더의 모든 파일을 양식과 비교해 파일 간 겹치는 셀을 한 번에 보고
+
+        결과 파일·상태 저장소를 바꾸지 않고 파일도 옮기지 않음 (이미 취합된 셀과의 겹침도 함께 보고)
+        실제 취합처럼 내용이 같은 중복 제출·이미 취합된 파일의 재제출은 점검하지 않고 중복으로 보고 (상태는 읽기 전용으로 열기)
+        """
+        self.metrics = RunMetrics('dryrun')
+
+        self.create_directory_structure()
+        template_file = self.check_template_file()
+        self.template_sheet_names = self.read_sheet_names(template_file)
+        input_files = sorted(self.list_input_files())
+        if not input_files:
+            print("⚠️  '취합' 폴더에 점검할 파일이 없습니다.")
+            return
+        all_count = len(input_files)
+        duplicates = []
+        with self.metrics.timed('hash'):
+            input_files = self.collapse_duplicates(
+                input_files,
+                lambda filename, original: duplicates.append({'filename': filename, 'original': original, 'consolidated': False}),
+            )
+
+        try:
+            with self.metrics.timed('template'):
+                template_fp = self.load_template_fingerprint(template_file)
+            with self.metrics.timed('state'):
+                consolidated = self.load_consolidated_index()
+                resubmissions = self.find_resubmissions(input_files)
+        except Exception as e:
+            print(f"❌ 양식/상태 파일 열기 실패: {e}")
+            return
+        # 이미 취합된 파일의 재제출은 실제 취합처럼 점검에서 제외 (중복으로 보고)
+        for filename, original in resubmissions.items():
+            duplicates.append({'filename': filename, 'original': original, 'consolidated': True})
+        input_files = [filename for filename in input_files if filename not in resubmissions]
+
+        print(f"총 {len(input_files)}개 파일 충돌 점검 시작... (파일 이동/결과 파일 변경 없음)")
+        changes_by_file = {}
+        errors = []
+        self.metrics.start_files(len(input_files))
+        file_results = self.iter_file_changes(input_files, template_fp)
+        for idx, (filename, file_result) in enumerate(zip(input_files, file_results), 1):
+            self.metrics.merge(filename, file_result['metrics'])
+            if file_result['fatal_msg']:
+                errors.append({'filename': filename, 'error': file_result['fatal_msg']})
+            elif file_result['missing_sheets']:
+                errors.append({'filename': filename, 'error': f"시트 없음: {', '.join(sorted(file_result['missing_sheets']))}"})
+            elif file_result['error_msg']:
+                errors.append({'filename': filename, 'error': file_result['error_msg']})
+            else:
+                changes_by_file[filename] = file_result['changes_by_sheet']
+            self.metrics.progress(idx)
+
+        with self.metrics.timed('conflict_check'):
+            overlaps = self.find_overlaps(changes_by_file)
+            pairs = [
+                {'file_a': a, 'file_b': b, 'consolidated': False, 'sheet': sheet_name,
+                 'cell_count': len(coords), 'cells': coords}
+                for (a, b, sheet_name), coords in sorted(overlaps.items())
+            ]
+            # 이미 취합된 파일과의 겹침 (file_b: 취합된 파일)
+            for filename, changes_by_sheet in changes_by_file.items():
+                for sheet_name, changes in changes_by_sheet.items():
+                    coords_by_owner = defaultdict(list)
+                    for coord, owner in consolidated.find_conflicts(sheet_name, changes).items():
+                        coords_by_owner[owner].append(coord)
+                    for owner, coords in sorted(coords_by_owner.items()):
+                        coords.sort(key=self.address_to_rowcol)
+                        pairs.append({'file_a': filename, 'file_b': owner, 'consolidated': True, 'sheet': sheet_name,
+                                      'cell_count': len(coords), 'cells': coords})
+
+        # 파일 × 파일 겹치는 셀 수 (점검한 파일끼리, 대칭)
+        filenames = list(changes_by_file)
+        positions = {filename: i for i, filename in enumerate(filenames)}
+        matrix = [[0] * len(filenames) for _ in filenames]
+        for pair in pairs:
+            if not pair['consolidated']:
+                a, b = positions[pair['file_a']], positions[pair['file_b']]
+                matrix[a][b] += pair['cell_count']
+                matrix[b][a] += pair['cell_count']
+        conflict_files = sorted({pair['file_a'] for pair in pairs} | {pair['file_b'] for pair in pairs if not pair['consolidated']})
+        self.metrics.add('conflicts', sum(pair['cell_count'] for pair in pairs))
+
+        summary = {
+            'input_files': all_count,
+            'checked_files': len(filenames),
+            'duplicate_files': len(duplicates),
+            'error_files': len(errors),
+            'conflict_files': len(conflict_files),
+            'conflict_pairs': len(pairs),
+            'conflict_cells': sum(pair['cell_count'] for pair in pairs),
+        }
+        try:
+            json_file, csv_file = self.write_conflict_report({
+                'started': self.metrics.started.isoformat(timespec='seconds'),
+                'summary': summary,
+                'conflict_files': conflict_files,
+                'pairs': pairs,
+                'duplicates': duplicates,
+                'errors': errors,
+                'matrix': {'files': filenames, 'cells': matrix},
+            })
+        except Exception as e:
+            json_file = csv_file = None
+            print(f"⚠️  충돌 점검 보고서 저장 실패: {e}")
+        self.write_run_report(summary)
+
+        print("\n" + "="*60)
+        print(f"충돌 점검 완료! (점검 {len(filenames)}개, 오류 {len(errors)}개)")
+        if pairs:
+            print(f"⚠️  겹치는 파일 쌍: {len(pairs)}개, 관련 파일: {len(conflict_files)}개")
+            for pair in pairs[:10]:
+                label = " (이미 취합됨)" if pair['consolidated'] else ""
+                coord_text = ', '.join(pair['cells'][:5])
+                if pair['cell_count'] > 5:
+                    coord_text += f" 외 {pair['cell_count'] - 5}개"
+                print(f"   {pair['file_a']} ↔ {pair['file_b']}{label} | 시트: {pair['sheet']}, 셀: {coord_text}")
+            if len(pairs) > 10:
+                print(f"   ... 외 {len(pairs) - 10}쌍")
+        else:
+            print("✅ 겹치는 셀이 없습니다.")
+        for duplicate in duplicates:
+            if duplicate['filename'] == duplicate['original']:
+                print(f"ℹ️  {duplicate['filename']}: 이미 취합된 파일 (취합 시 처리완료로 이동)")
+            else:
+                label = "이미 취합된 " if duplicate['consolidated'] else ""
+                print(f"ℹ️  {duplicate['filename']}: {label}'{duplicate['original']}'과(와) 내용이 같은 파일 (취합 시 중복 제외)")
+        for error in errors:
+            print(f"❌ {error['filename']}: {error['error']}")
+        if json_file:
+            print(f"\n📄 충돌 점검 보고서: {json_file} (CSV: {os.path.basename(csv_file)})")
+        print("="*60)
+
+    def create_concat_sinks(self, result_wb, result_file, sheet_columns, start_row, start_col):
+        """concat_files 시트별 싱크 생성 (concat_outputs 형식마다 1개, 2개 이상이면 FanoutSink로 묶음)
+
+        - xlsx: 결과 통합문서의 헤더 바로 아래 셀부터 (행: +1, 열: 0)
+        - csv/parquet: 결과 파일명_시트명.csv/.parquet, sqlite: 결과 파일명.sqlite3 (시트명 테이블)
+        반환값: ({시트명: 싱크}, [결과 경로, ...], SQLite 연결 또는 None)
+        """
+        stem = os.path.splitext(result_file)[0]
+        paths = [result_file] if 'xlsx' in self.concat_outputs else []
+        conn = None
+        if 'sqlite' in self.concat_outputs:
+            db_file = stem + '.sqlite3'
+            if os.path.exists(db_file):
+                os.remove(db_file)
+            conn = sqlite3.connect(db_file)
+            paths.append(db_file)
+
+        sinks = {}
+        for sheet_name, columns in sheet_columns.items():
+            sheet_sinks = []
+            for output in self.concat_outputs:
+                if output == 'xlsx' and isinstance(result_wb, StreamingWorkbookWriter):
+                    sink = result_wb.sink(sheet_name, start_col, columns, self.concat_batch_rows)
+                elif output == 'xlsx':
+                    sink = WorkbookRangeSink(result_wb.sheet(sheet_name), start_row + 1, start_col, columns, self.concat_batch_rows)
+                elif output == 'csv':
+                    sink = CsvSink(f"{stem}_{sheet_name}.csv", columns, self.concat_batch_rows)
+                    paths.append(sink.path)
+                elif output == 'parquet':
+                    sink = ParquetSink(f"{stem}_{sheet_name}.parquet", columns, self.concat_batch_rows)
+                    paths.append(sink.path)
+                elif output == 'sqlite':
+                    sink = SqliteSink(conn, sheet_name, columns, self.concat_batch_rows)
+                else:
+                    raise ValueError(f"지원하지 않는 결과 형식: {output}")
+                sheet_sinks.append(sink)
+            sinks[sheet_name] = sheet_sinks[0] if len(sheet_sinks) == 1 else FanoutSink(sheet_sinks, columns, self.concat_batch_rows)
+        return sinks, paths, conn
 
     def concat_files(self):     # $$ 미확인
         """모든 파일 취합 시작"""
+        self.metrics = RunMetrics('concat')
+
         # 폴더 생성
         self.create_directory_structure()
         
         # 템플릿 확인
         template_file = self.check_template_file()
+        self.template_sheet_names = self.read_sheet_names(template_file)
 
         # 결과 파일 확인 (경로 반환, 없으면 새 경로)
         result_file = self.check_output_files()
@@ -496,32 +3070,47 @@ class ExcelConsolidator:
 
         start_cell = self.input_excel_cell()
 
-        header_row = int(re.search(r'\\d+', start_cell).group())
+        start_row, start_col = self.address_to_rowcol(start_cell)
+        header_row = start_row - 1      # pandas 헤더 행 번호 (0부터 시작)
+        first_col = start_col - 1       # pandas는 A열부터 읽으므로 첫번째 칼럼 앞의 열은 잘라냄
+        import pandas as pd     # 행 이어붙이기에서만 사용 (입력을 모두 받은 뒤 불러옴)
         try:
-            template_wb = self.app.books.open(template_file)
-            template_sheet_names = [sheet.name for sheet in template_wb.sheets]
-            template_wb.close()
+            with self.metrics.timed('template'):
+                template_sheets = pd.read_excel(template_file, header=header_row, sheet_name=None)
+            template_sheet_names = list(template_sheets)
             template_cols = {}
-            for sheet_name in template_sheet_names:
-                template_df = pd.read_excel(result_file, header=header_row, sheet_name=sheet_name)
-                template_cols[sheet_name] = set(template_df.columns)
-                offset_cnt = len(template_df)
-            del template_df
+            template_offsets = {}
+            for sheet_name, template_df in template_sheets.items():
+                template_df = template_df.iloc[:, first_col:]
+                template_cols[sheet_name] = list(template_df.columns)
+                template_offsets[sheet_name] = len(template_df)    # 양식의 예시 행 수
+            del template_sheets
 
         except Exception as e:
             print(f"❌ 양식 파일 열기 실패: {e}")
             return
 
-        # 새 파일: 템플릿 복사
-        shutil.copy(template_file, result_file)
+        # xlsx로 저장하는 경우: 쓰기 전용 스트리밍(xlsx 양식) 또는 템플릿 복사본에 쓰기
+        result_wb = None
         try:
-            result_wb = self.app.books.open(result_file)
+            if 'xlsx' in self.concat_outputs:
+                if self.concat_stream_xlsx and template_file.lower().endswith(('.xlsx', '.xlsm')) and result_file.lower().endswith('.xlsx'):
+                    result_wb = StreamingWorkbookWriter(template_file, result_file, start_row, self.concat_sheet_rows)
+                else:
+                    shutil.copy(template_file, result_file)
+                    result_wb = self.backend.open(result_file)
+            # 시트별 싱크: 배치 단위로 이어 쓰기
+            sinks, result_paths, result_conn = self.create_concat_sinks(
+                result_wb, result_file,
+                {sheet_name: template_cols[sheet_name] + ['출처 파일명'] for sheet_name in template_sheet_names},
+                start_row, start_col,
+            )
         except Exception as e:
             print(f"❌ 결과 파일 생성 실패: {e}")
+            if result_wb is not None:
+                result_wb.close()
             return
         
-        
-        
         # 입력 파일 가져오기
         print(f"총 {len(input_files)}개 파일 처리 시작...")
         
@@ -529,29 +3118,45 @@ class ExcelConsolidator:
         error_count = 0
         error_msgs = []
 
-        result_dfs = defaultdict(list)
-        changes_list = []
+        self.metrics.start_files(len(input_files))
         for idx, filename in enumerate(input_files, 1):
             file_path = os.path.join(self.input_folder, filename)
 
             try:
                 file_has_error = False
 
-                changes = {}
+                # 양식 시트가 빠진 파일은 셀을 읽기 전에 통합문서 목록만으로 걸러냄
+                with self.metrics.timed('open', filename):
+                    current_sheet_names = self.read_sheet_names(file_path)
+                missing_sheets = set(template_sheet_names) - set(current_sheet_names or template_sheet_names)
+                if missing_sheets:
+                    self.create_error_subfolders()
+                    with self.metrics.timed('move', filename):
+                        shutil.move(file_path, os.path.join(self.error_subfolder, filename))
+                    self.error_files.append(filename)
+                    err_msg = f"\n⚠️  [충돌/오류 감지] {filename}\n   양식 시트가 없습니다.\n   시트: {', '.join(sorted(missing_sheets))}"
+                    error_msgs.append(err_msg)
+                    print("   → 파일 제외\n")
+                    error_count += 1
+                    self.metrics.progress(idx)
+                    continue
+
+                # 파일 1개는 모든 양식 시트를 한 번에 파싱 (양식에 없는 시트는 읽지 않음)
+                with self.metrics.timed('open', filename):
+                    current_sheets = pd.read_excel(file_path, header=header_row, sheet_name=template_sheet_names)
+                current_sheets = {name: df.iloc[:, first_col:] for name, df in current_sheets.items()}
                 for sheet_name in template_sheet_names:
-                    current_ws = pd.read_excel(file_path, header=header_row, sheet_name=sheet_name)
-                    if template_cols[sheet_name] != set(current_ws.columns):
+                    current_ws = current_sheets[sheet_name]
+                    if set(template_cols[sheet_name]) != set(current_ws.columns):
                         ## 에러 처리
                         error_sheet_name = sheet_name
                         file_has_error = True
                         break
-                    else:
-                        current_ws.loc[:, '출처 파일명'] = filename
-                        changes[sheet_name] = current_ws
 
                 if file_has_error:
                     self.create_error_subfolders()
-                    shutil.move(file_path, os.path.join(self.error_subfolder, filename))
+                    with self.metrics.timed('move', filename):
+                        shutil.move(file_path, os.path.join(self.error_subfolder, filename))
                     self.error_files.append(filename)
                     
                     err_msg = f"\n⚠️  [충돌/오류 감지] {filename}\n   칼럼명이 불일치 합니다.\n   시트: {error_sheet_name}, 칼럼: {list(current_ws.columns)}"
@@ -560,9 +3165,23 @@ class ExcelConsolidator:
                     error_count += 1
 
                 else:
-                    changes_list.append(changes)
+                    # 모든 시트가 결과 형식에 맞는지 확인한 뒤에 이어 씀 (일부 시트만 들어가지 않도록)
+                    frames = {}
+                    for sheet_name in template_sheet_names:
+                        with self.metrics.timed('write_back', filename, sheet_name):
+                            current_ws = current_sheets[sheet_name].iloc[template_offsets[sheet_name]:, :]     # 양식의 예시 행 있다면 제거
+                            frames[sheet_name] = current_ws.drop_duplicates().assign(**{'출처 파일명': filename})
+                            sinks[sheet_name].check(frames[sheet_name])
+                    del current_sheets
+                    for sheet_name, current_ws in frames.items():
+                        with self.metrics.timed('write_back', filename, sheet_name):
+                            sinks[sheet_name].append(current_ws)
+                        self.metrics.add('rows_appended', len(current_ws), filename, sheet_name)
+                    del frames
+
                     processed_file_path = os.path.join(self.processed_folder, filename)
-                    shutil.move(file_path, processed_file_path)
+                    with self.metrics.timed('move', filename):
+                        shutil.move(file_path, processed_file_path)
                     self.processed_files.append(filename)
                     print(f"[{idx}/{len(input_files)}] {filename} - 처리 완료 ✓")
                     processed_count += 1
@@ -572,42 +3191,49 @@ class ExcelConsolidator:
                 print(err_msg)
                 print("   → 파일 제외\n")
                 error_msgs.append(err_msg)
-                self.create_error_folders()
+                self.create_error_subfolders()
                 shutil.move(file_path, os.path.join(self.error_subfolder, filename))
                 self.error_files.append(filename)
                 error_count += 1
 
+            self.metrics.progress(idx)
+
         # 저장 및 닫기
         try:
-            # 취합을 위해 result_dfs(dict)에 저장
-            for d in changes_list:
-                for k, v in d.items():
-                    v = v.iloc[offset_cnt:, :]   # 양식의 예시 행 있다면 제거
-                    result_dfs[k].append(v)
-
-            # result_dfs(dict) 순회하면서 concat하여 저장하기
-            for sheet_name in template_sheet_names:
-                result_ws = result_wb.sheets[sheet_name]
-
-                start_cell = result_ws.range(start_cell)
-                insert_cell = start_cell.offset(1, 0)   # 바로 아래 셀 위치로 이동 (행: +1, 열: 0)
-
-                ws_concat_df = pd.concat(result_dfs[sheet_name], axis=0)    # DataFrame 값만 삽입 (헤더 없이)
-                ws_concat_df = ws_concat_df.drop_duplicates()
-                insert_cell.options(index=False, header=False).value = ws_concat_df
+            # 남은 배치 내보내기
+            with self.metrics.timed('write_back'):
+                for sink in sinks.values():
+                    sink.close()
 
-            result_wb.save()
-            result_wb.close()
+            with self.metrics.timed('save'):
+                if result_wb is not None:
+                    result_wb.save()
+                    result_wb.close()
+                if result_conn is not None:
+                    result_conn.close()
 
         except Exception as e:
             print(f"파일 저장 중 오류: {e}")
 
+        self.write_run_report({
+            'input_files': len(input_files),
+            'processed_files': processed_count,
+            'error_files': error_count,
+            'duplicate_files': len(self.duplicate_files),
+            'result_file': result_paths[0] if result_paths else None,
+            'result_files': result_paths,
+        })
+
         # 완료 보고
         print("\n" + "="*60)
         print(f"취합 완료!")
         print(f"처리된 파일: {processed_count}개")
         # print(f"오류 파일: {error_count}개")
-        print(f"\n📄 결과 파일: {result_file}")
+        if self.duplicate_files:
+            print(f"중복 제외 파일: {len(self.duplicate_files)}개 (📁 {self.duplicate_folder})")
+        print()
+        for result_path in result_paths:
+            print(f"📄 결과 파일: {result_path}")
         print("="*60)
         
         # 에러 폴더 열기 (1건 이상)
@@ -615,23 +3241,34 @@ class ExcelConsolidator:
             print(f"\n❌ 오류 발생 파일 ({error_count}개) 내역 요약")
             print(f'{'\n'.join(error_msgs)}')
             print(f"📁 오류 파일을 확인하고 수정하여 '취합' 폴더에 다시 넣고 재실행하세요.")
-            os.startfile(self.error_folder)
+            self.open_folder(self.error_folder)
         else:
             # 성공 시 결과 파일 열기
             print(f"\n✅ 모든 파일이 안전하게 처리되었습니다!")
             print(f"\n📄 결과 파일 폴더를 열고 있습니다...\n")
-            os.startfile(os.path.dirname(result_file))
+            self.open_folder(os.path.dirname(result_file))
 
 # 사용 예제
 if __name__ == "__main__":
+    multiprocessing.freeze_support()    # exe(PyInstaller)에서 병렬 처리 시 필요
 
-    # app = xw.App(visible=True)     # 작업용: 엑셀 창 실시간으로 보면서 확인 가능
-    app = xw.App(visible=False)
+    # backend = LazyBackend(visible=True)     # 작업용: 엑셀 창 실시간으로 보면서 확인 가능
+    backend = LazyBackend(visible=False)     # 처음 파일을 열 때 Excel 실행 (입력 대기 전에는 xlwings를 불러오지 않음)
 
     try:
-        consolidator = ExcelConsolidator(app)
-        consolidator.append_to_template_position()
-        input('종료하려면 아무키나 누르세요.')
+        consolidator = ExcelConsolidator(backend)
+        # consolidator.workers = os.cpu_count()     # 병렬 비교 (파일이 많을 때)
+        # consolidator.sheet_workers = os.cpu_count()       # 시트 병렬 비교 (시트가 많은 큰 파일을 취합할 때)
+        # consolidator.defer_result = True      # 결과 파일을 종료 시 한 번에 생성 (충돌 되돌리기가 많을 때)
+        # consolidator.sheet_compare_rules = {'Sheet1': CompareRules(abs_tol=0.01)}     # 시트별 값 비교 규칙 (금액 등)
+        if '--watch' in sys.argv[1:]:
+            # 감시 모드: '취합' 폴더에 파일이 들어올 때마다 바로 취합 (종료: Ctrl+C)
+            consolidator.watch_input_folder()
+        elif '--dry-run' in sys.argv[1:]:
+            # 충돌 점검 모드: 파일 간 겹치는 셀을 한 번에 보고 (파일 이동/결과 파일 변경 없음)
+            consolidator.dry_run_conflicts()
+        else:
+            consolidator.append_to_template_position()
+        consolidator.prompt('종료하려면 아무키나 누르세요.')
     finally:
-        app.quit()
-
+        backend.quit()
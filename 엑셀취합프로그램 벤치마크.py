@@ -0,0 +1,506 @@
+# 엑셀 취합프로그램 벤치마크
+#
+# 사용 예:
+#   python "엑셀취합프로그램 벤치마크.py" --files 50 --rows 200 --cols 60 --save 기준.json
+#   python "엑셀취합프로그램 벤치마크.py" --files 50 --rows 200 --cols 60 --compare 기준.json
+#
+# - 가상 양식/답변 파일을 '양식'/'취합' 폴더 구조로 생성
+# - append(동일위치 v2), concat(행 이어붙이기), v1(동일위치 v1.0.0)을 각각 별도 프로세스에서 실행
+# - startup: 실행 파일과 같은 진입 경로(__main__)로 프로그램 import 시간과 프로세스 실행부터 첫 입력 대기까지의 시간 측정
+#   시작 예산(--startup-budget)을 넘거나 첫 입력 전에 무거운 모듈(pandas, xlwings 등)을 불러오면 실패
+# - 단계별 시간, 전체 시간, 최대 메모리, 초당 셀(행) 수를 JSON으로 저장/비교
+import argparse
+import builtins
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+V2_PROGRAM = os.path.join(BASE_PATH, "엑셀취합프로그램 v2.1.0.py")
+V1_PROGRAM = os.path.join(BASE_PATH, "엑셀취합프로그램(동일위치) v1.0.0.py")
+MODES = ('append', 'concat', 'v1', 'startup')
+# 첫 입력 대기 전(모든 모드 공통 경로)에 불러오면 안 되는 모듈
+HEAVY_MODULES = ('pandas', 'pyarrow', 'xlwings', 'matplotlib', 'scipy')
+
+try:
+    import resource     # 리눅스/맥: 프로세스 최대 메모리(RSS)
+except ImportError:     # 윈도우: tracemalloc으로 파이썬 할당 최대치 측정
+    resource = None
+
+
+############################## 가상 파일 생성 ##############################
+def generate_position_workload(base, config):
+    """동일위치 취합용(append, v1) 양식과 답변 파일 생성
+
+    - 양식: 시트마다 1행 헤더, 1열 라벨, 일부 수식 셀, 병합된 헤더 블록
+      (unlock_inputs: 입력 영역 셀을 잠금 해제해 입력 셀만 비교하도록 지정)
+    - 답변: 입력 영역(2행~, 2열~)의 셀을 파일별로 나눠 채움 (fill_density 비율)
+    - 충돌: conflict_rate 비율의 파일이 앞 파일 셀 1개를 덮어씀
+    """
+    import openpyxl     # startup 측정 자식 프로세스에 섞이지 않도록 쓰는 곳에서 불러옴
+    from openpyxl.styles import Protection
+    rng = random.Random(config['seed'])
+    for folder in ("양식", "취합", "결과"):
+        os.makedirs(os.path.join(base, folder), exist_ok=True)
+
+    rows, cols = config['rows'], config['cols']
+    input_cells = [(r, c) for r in range(2, rows + 1) for c in range(2, cols + 1)]
+    formula_cells = set(rng.sample(input_cells, int(len(input_cells) * config['formula_rate'])))
+    input_cells = [cell for cell in input_cells if cell not in formula_cells]
+
+    wb = openpyxl.Workbook()
+    for sheet_idx in range(config['sheets']):
+        ws = wb.active if sheet_idx == 0 else wb.create_sheet()
+        ws.title = f"시트{sheet_idx + 1}"
+        for c in range(1, cols + 1):
+            ws.cell(1, c).value = f"항목{c}"
+        for r in range(2, rows + 1):
+            ws.cell(r, 1).value = f"구분{r}"
+        for r, c in formula_cells:
+            ws.cell(r, c).value = f"=ROW()*{c}"
+        if config.get('unlock_inputs'):
+            for r, c in input_cells:
+                ws.cell(r, c).protection = Protection(locked=False)
+        # 병합된 헤더 블록 (1행에 2칸씩)
+        for i in range(min(config['merged'], (cols - 1) // 2)):
+            ws.merge_cells(start_row=1, start_column=2 + i * 2, end_row=1, end_column=3 + i * 2)
+    template_file = os.path.join(base, "양식", "양식.xlsx")
+    wb.save(template_file)
+
+    # 파일별 담당 셀 나누기
+    n_files = config['files']
+    filled = rng.sample(input_cells, int(len(input_cells) * config['fill_density']))
+    owned = defaultdict(list)
+    for i, cell in enumerate(filled):
+        owned[i % n_files].append(cell)
+
+    for file_idx in range(n_files):
+        wb = openpyxl.load_workbook(template_file)
+        cells = list(owned[file_idx])
+        if file_idx > 0 and rng.random() < config['conflict_rate'] and owned[file_idx - 1]:
+            cells.append(owned[file_idx - 1][0])    # 앞 파일과 충돌
+        for ws in wb.worksheets:
+            for r, c in cells:
+                ws.cell(r, c).value = rng.choice((rng.randint(1, 1000), round(rng.random() * 100, 2), f"값{r}_{c}"))
+        wb.save(os.path.join(base, "취합", f"답변_{file_idx + 1:04d}.xlsx"))
+
+
+def generate_concat_workload(base, config):
+    """행 이어붙이기(concat)용 양식과 답변 파일 생성
+
+    - 양식: 1행 제목, 3행 헤더(칼럼 cols개), 예시 행 1개
+    - 답변: 시트마다 rows행, duplicate_row_rate 비율로 같은 파일 안 중복 행 포함
+    """
+    import openpyxl
+    rng = random.Random(config['seed'])
+    for folder in ("양식", "취합", "결과"):
+        os.makedirs(os.path.join(base, folder), exist_ok=True)
+
+    cols = config['cols']
+    wb = openpyxl.Workbook()
+    for sheet_idx in range(config['sheets']):
+        ws = wb.active if sheet_idx == 0 else wb.create_sheet()
+        ws.title = f"시트{sheet_idx + 1}"
+        ws["A1"] = f"{ws.title} 제출 목록"
+        for c in range(1, cols + 1):
+            ws.cell(3, c).value = f"칼럼{c}"
+            ws.cell(4, c).value = "예시"
+    template_file = os.path.join(base, "양식", "양식.xlsx")
+    wb.save(template_file)
+
+    for file_idx in range(config['files']):
+        wb = openpyxl.load_workbook(template_file)
+        for ws in wb.worksheets:
+            previous = None
+            for r in range(5, 5 + config['rows']):
+                if previous and rng.random() < config['duplicate_row_rate']:
+                    row_values = previous
+                else:
+                    row_values = [rng.choice((rng.randint(1, 1000), f"값{file_idx}_{r}_{c}")) for c in range(1, cols + 1)]
+                for c, value in enumerate(row_values, 1):
+                    ws.cell(r, c).value = value
+                previous = row_values
+        wb.save(os.path.join(base, "취합", f"제출_{file_idx + 1:04d}.xlsx"))
+
+
+############################## 실행 (자식 프로세스) ##############################
+def load_program(path):
+    """공백이 포함된 파일명의 프로그램을 모듈로 로드"""
+    spec = importlib.util.spec_from_file_location("excel_consolidator", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class PhaseTimer:
+    """메서드를 감싸 단계별 누적 시간 측정"""
+    def __init__(self):
+        self.phases = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    def wrap(self, owner, attr, phase):
+        original = getattr(owner, attr)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.phases[phase] += time.perf_counter() - start
+                self.calls[phase] += 1
+
+        setattr(owner, attr, timed)
+
+
+def reported_counters(consolidator):
+    """프로그램 내장 계측(RunMetrics)의 카운터 (이전 버전에는 없음)"""
+    metrics = getattr(consolidator, 'metrics', None)
+    if metrics is None:
+        return {}
+    totals = metrics.totals()
+    return {name: int(totals[name]) for name in metrics.COUNTERS if totals[name]}
+
+
+def run_append(program, workdir, config):
+    module = load_program(program)
+    timer = PhaseTimer()
+    backend = module.create_backend(name=config['backend'])
+    consolidator = module.ExcelConsolidator(backend, base_path=workdir)
+    consolidator.interactive = False
+    consolidator.workers = config['workers']
+    consolidator.sheet_workers = config.get('sheet_workers', 1)
+    consolidator.defer_result = config.get('defer_result', False)
+    consolidator.compare_engine = config.get('compare_engine', 'auto')
+
+    timer.wrap(consolidator, 'collapse_duplicates', 'hash_inputs')
+    timer.wrap(consolidator, 'load_template_fingerprint', 'template')
+    timer.wrap(consolidator, 'extract_file_changes', 'open_compare')
+    timer.wrap(consolidator, 'has_conflict', 'conflict_check')
+    timer.wrap(consolidator, 'apply_changes_to_template', 'write_back')
+    timer.wrap(consolidator, 'revert_changes', 'revert')
+    timer.wrap(module.StateStore, 'add_file', 'state')
+    timer.wrap(module.StateStore, 'remove_file', 'state')
+    for book_class in (module.OpenpyxlBook, module.XlwingsBook):
+        timer.wrap(book_class, 'save', 'save')
+    try:
+        consolidator.append_to_template_position()
+    finally:
+        backend.quit()
+
+    cells = config['files'] * config['sheets'] * config['rows'] * config['cols']
+    return timer, {'cells': cells, 'processed_files': len(consolidator.processed_files), **reported_counters(consolidator)}
+
+
+def run_concat(program, workdir, config):
+    module = load_program(program)
+    timer = PhaseTimer()
+    backend = module.create_backend(name=config['backend'])
+    consolidator = module.ExcelConsolidator(backend, base_path=workdir)
+    consolidator.interactive = False
+    consolidator.start_cell = "A3"
+    if hasattr(consolidator, 'concat_outputs'):
+        consolidator.concat_outputs = tuple(config.get('concat_outputs', 'xlsx').split(','))
+
+    timer.wrap(consolidator, 'collapse_duplicates', 'hash_inputs')
+    import pandas   # 프로그램은 concat_files 안에서 pandas를 불러오므로 모듈 함수를 감쌈
+    timer.wrap(pandas, 'read_excel', 'read')
+    timer.wrap(module.ConcatSink, 'flush', 'write')
+    for book_class in (module.OpenpyxlBook, module.XlwingsBook, getattr(module, 'StreamingWorkbookWriter', None)):
+        if book_class is not None:
+            timer.wrap(book_class, 'save', 'save')
+    try:
+        consolidator.concat_files()
+    finally:
+        backend.quit()
+
+    rows = config['files'] * config['sheets'] * config['rows']
+    return timer, {'rows': rows, 'cells': rows * config['cols'], 'processed_files': len(consolidator.processed_files),
+                   **reported_counters(consolidator)}
+
+
+def run_v1(program, workdir, config):
+    timer = PhaseTimer()
+    cwd = os.getcwd()
+    os.chdir(workdir)   # v1은 현재 폴더 기준으로 동작
+    try:
+        with open(program, encoding='utf-8') as f:
+            has_main = '\ndef main(' in f.read()     # 이전 버전은 import만 해도 실행되므로 소스로 확인
+        if has_main:
+            module = load_program(program)
+            timer.wrap(module, 'load_template', 'template')
+            timer.wrap(module, 'build_merged_index', 'merged_index')
+            timer.wrap(module, 'read_cells', 'open')
+            timer.wrap(module, 'merge_cells', 'compare')
+            if hasattr(module, 'merge_rows_stream'):
+                timer.wrap(module, 'merge_rows_stream', 'open_compare')     # stream: 읽기와 비교가 함께 진행
+            timer.wrap(module, 'apply_changes', 'write_back')
+            timer.wrap(module, 'save_result', 'save')
+            module.main(workdir)
+        else:   # 함수로 나뉘기 전 버전: 스크립트 전체를 한 단계로 측정
+            start = time.perf_counter()
+            runpy.run_path(program, run_name="__main__")
+            timer.phases['total'] += time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+
+    cells = config['files'] * config['rows'] * config['cols']    # v1은 활성 시트만 취합
+    return timer, {'cells': cells}
+
+
+class FirstPrompt(Exception):
+    """startup: 첫 입력 대기에 도달하면 실행 중단"""
+
+
+def run_startup(program, workdir, config):
+    """실행 파일과 같은 진입 경로(__main__)로 빈 작업 폴더에서 프로그램을 실행해 첫 입력 대기(양식 파일 안내)까지 측정
+
+    - 프로그램은 자기 폴더를 작업 폴더로 쓰므로 작업 폴더에 복사해 실행
+    - interpreter: 프로세스 실행 ~ 프로그램 실행 시작 (부모가 넘긴 실행 시각 기준)
+    - import: 프로그램 모듈 수준 코드 (__main__ 블록의 freeze_support 호출까지)
+    - first_prompt: 프로세스 실행 ~ 첫 input() 호출
+    - heavy_imports: 첫 입력 대기 전에 불러온 무거운 모듈 (xlwings 포함: Excel 백엔드는 파일을 열 때 생성)
+    """
+    import multiprocessing
+
+    class Console(io.StringIO):
+        """대화형 실행으로 보이도록 하는 표준 입력"""
+        def isatty(self):
+            return True
+
+    timer = PhaseTimer()
+    script = os.path.join(workdir, os.path.basename(program))
+    shutil.copy(program, script)
+    prompted = {}
+
+    def module_loaded():
+        prompted['loaded'] = time.perf_counter()
+
+    def first_prompt(*args, **kwargs):
+        prompted['at'] = time.time()
+        prompted['modules'] = set(sys.modules)
+        raise FirstPrompt
+
+    patches = [(builtins, 'input', first_prompt), (multiprocessing, 'freeze_support', module_loaded),
+               (sys, 'stdin', Console()), (sys, 'argv', [script])]
+    if hasattr(os, 'startfile'):
+        patches.append((os, 'startfile', lambda *args, **kwargs: None))     # 탐색기는 열지 않음
+    originals = [(owner, attr, getattr(owner, attr)) for owner, attr, _ in patches]
+    for owner, attr, value in patches:
+        setattr(owner, attr, value)
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except FirstPrompt:
+        pass
+    finally:
+        for owner, attr, value in originals:
+            setattr(owner, attr, value)
+    if 'at' not in prompted:
+        raise RuntimeError("첫 입력 대기에 도달하지 않았습니다.")
+
+    timer.phases['interpreter'] = started_at - config['launched_at']
+    if 'loaded' in prompted:
+        timer.phases['import'] = prompted['loaded'] - start
+    timer.phases['first_prompt'] = prompted['at'] - config['launched_at']
+    heavy = [name for name in HEAVY_MODULES if name in prompted['modules']]
+    return timer, {'cells': 0, 'heavy_imports': heavy}
+
+
+def run_child(mode, program, workdir, config):
+    """자식 프로세스에서 모드 1개 실행 후 측정값을 JSON으로 출력"""
+    if resource is None:
+        tracemalloc.start()
+    runner = {'append': run_append, 'concat': run_concat, 'v1': run_v1, 'startup': run_startup}[mode]
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):     # 프로그램 출력은 숨김
+        timer, counts = runner(program, workdir, config)
+    wall_time = time.perf_counter() - start
+    if mode == 'startup':   # 프로세스 실행부터 첫 입력 대기까지
+        wall_time = timer.phases['first_prompt']
+
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    else:
+        peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+
+    result = {
+        'wall_time': round(wall_time, 4),
+        'peak_memory_mb': round(peak_mb, 1),
+        'cells_per_sec': round(counts['cells'] / wall_time, 1) if wall_time and counts['cells'] else None,
+        'phases': {phase: round(seconds, 4) for phase, seconds in sorted(timer.phases.items())},
+        'calls': dict(sorted(timer.calls.items())),
+        'counts': counts,
+    }
+    if 'rows' in counts:
+        result['rows_per_sec'] = round(counts['rows'] / wall_time, 1) if wall_time else None
+    print(json.dumps(result, ensure_ascii=False))
+
+
+############################## 실행 (부모 프로세스) ##############################
+def run_mode(mode, args, config, workroot):
+    """작업 폴더 생성 후 자식 프로세스로 모드 실행"""
+    workdir = os.path.join(workroot, mode)
+    if mode == 'startup':
+        os.makedirs(workdir)    # 빈 폴더: 양식 파일 안내에서 첫 입력 대기
+        config = {**config, 'launched_at': time.time()}
+    elif mode == 'concat':
+        generate_concat_workload(workdir, config)
+    else:
+        generate_position_workload(workdir, config)
+
+    program = args.v1_program if mode == 'v1' else args.program
+    command = [
+        sys.executable, os.path.abspath(__file__), "--child", mode,
+        "--workdir", workdir, "--program", program, "--config", json.dumps(config),
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True, encoding='utf-8')
+    if completed.returncode != 0:
+        raise RuntimeError(f"{mode} 실행 실패\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare_with_baseline(results, baseline_file, tolerance):
+    """기준 결과 대비 느려진 모드 목록 반환"""
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = []
+    for mode, result in results.items():
+        base = baseline.get('results', {}).get(mode)
+        if not base:
+            continue
+        ratio = result['wall_time'] / base['wall_time'] if base['wall_time'] else 1.0
+        print(f"  {mode:7s} {base['wall_time']:8.2f}s → {result['wall_time']:8.2f}s ({ratio - 1:+.0%})")
+        if ratio > 1 + tolerance:
+            regressions.append(mode)
+    return regressions
+
+
+def check_startup_budget(result, budget):
+    """시작 예산 확인: 첫 입력 대기까지 budget초 이내, 공통 경로에서 무거운 모듈을 불러오지 않음 (위반 목록 반환)"""
+    violations = []
+    if result['wall_time'] > budget:
+        violations.append(f"첫 입력 대기 {result['wall_time']:.2f}s > 예산 {budget:.2f}s")
+    heavy = result['counts'].get('heavy_imports')
+    if heavy:
+        violations.append(f"첫 입력 전에 불러온 무거운 모듈: {', '.join(heavy)}")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="엑셀 취합프로그램 벤치마크")
+    parser.add_argument("--modes", default=",".join(MODES), help="실행할 모드 (append,concat,v1,startup)")
+    parser.add_argument("--files", type=int, default=20, help="답변 파일 수")
+    parser.add_argument("--sheets", type=int, default=3, help="시트 수")
+    parser.add_argument("--rows", type=int, default=100, help="행 수 (concat: 파일·시트당 데이터 행 수)")
+    parser.add_argument("--cols", type=int, default=30, help="열 수")
+    parser.add_argument("--fill-density", type=float, default=0.3, help="입력 영역 중 답변으로 채울 셀 비율")
+    parser.add_argument("--formula-rate", type=float, default=0.02, help="양식 수식 셀 비율")
+    parser.add_argument("--merged", type=int, default=5, help="양식의 병합 헤더 블록 수")
+    parser.add_argument("--unlock-inputs", action="store_true", help="양식 입력 영역을 잠금 해제 (입력 셀만 비교)")
+    parser.add_argument("--conflict-rate", type=float, default=0.05, help="충돌을 일으키는 파일 비율")
+    parser.add_argument("--duplicate-row-rate", type=float, default=0.1, help="concat: 파일 내 중복 행 비율")
+    parser.add_argument("--concat-outputs", default="xlsx", help="concat 결과 형식 (xlsx,csv,parquet,sqlite)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", default="openpyxl", choices=("openpyxl", "xlwings"))
+    parser.add_argument("--workers", type=int, default=1, help="append 병렬 비교 프로세스 수")
+    parser.add_argument("--sheet-workers", type=int, default=1, help="append 시트 병렬 비교 프로세스 수 (파일 1개 안에서)")
+    parser.add_argument("--defer-result", action="store_true", help="append 결과 파일을 종료 시 한 번에 생성")
+    parser.add_argument("--compare-engine", default="auto", choices=("auto", "block", "xml"), help="append 비교 방식")
+    parser.add_argument("--program", default=V2_PROGRAM, help="측정할 v2 프로그램 경로 (이전 버전 비교용)")
+    parser.add_argument("--v1-program", default=V1_PROGRAM, help="측정할 v1 프로그램 경로")
+    parser.add_argument("--save", help="결과를 기준(JSON)으로 저장할 경로")
+    parser.add_argument("--compare", help="비교할 기준(JSON) 경로")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 지연 비율 (0.2 = 20%%)")
+    parser.add_argument("--startup-budget", type=float, default=2.0, help="startup: 첫 입력 대기까지 허용 시간(초)")
+    parser.add_argument("--keep", action="store_true", help="생성한 작업 폴더 남기기")
+    # 내부용 (자식 프로세스)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.program, args.workdir, json.loads(args.config))
+        return 0
+
+    config = {
+        'files': args.files, 'sheets': args.sheets, 'rows': args.rows, 'cols': args.cols,
+        'fill_density': args.fill_density, 'formula_rate': args.formula_rate, 'merged': args.merged,
+        'unlock_inputs': args.unlock_inputs,
+        'conflict_rate': args.conflict_rate, 'duplicate_row_rate': args.duplicate_row_rate,
+        'seed': args.seed, 'backend': args.backend, 'workers': args.workers, 'sheet_workers': args.sheet_workers,
+        'defer_result': args.defer_result,
+        'compare_engine': args.compare_engine, 'concat_outputs': args.concat_outputs,
+    }
+    workroot = tempfile.mkdtemp(prefix="취합벤치_")
+    results = {}
+    try:
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            print(f"▶ {mode} 실행 중...")
+            results[mode] = run_mode(mode, args, config, workroot)
+            r = results[mode]
+            phases = ", ".join(f"{k} {v:.2f}s" for k, v in r['phases'].items())
+            throughput = f", {r['cells_per_sec']} 셀/초" if r['cells_per_sec'] is not None else ""
+            print(f"  {r['wall_time']:.2f}s, 최대 메모리 {r['peak_memory_mb']}MB{throughput}")
+            print(f"  단계: {phases}")
+    finally:
+        if args.keep:
+            print(f"작업 폴더: {workroot}")
+        else:
+            shutil.rmtree(workroot, ignore_errors=True)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'program': os.path.basename(args.program),
+        },
+        'config': config,
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✓ 기준 저장: {args.save}")
+
+    exit_code = 0
+    if 'startup' in results:
+        print(f"시작 예산: 첫 입력 대기 {args.startup_budget:.2f}s 이내, 무거운 모듈({', '.join(HEAVY_MODULES)}) 없음")
+        violations = check_startup_budget(results['startup'], args.startup_budget)
+        for violation in violations:
+            print(f"❌ {violation}")
+        if violations:
+            exit_code = 1
+        else:
+            print("✅ 시작 예산 이내")
+
+    if args.compare:
+        print(f"기준 비교: {args.compare} (허용 {args.tolerance:.0%})")
+        regressions = compare_with_baseline(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"❌ 느려진 모드: {', '.join(regressions)}")
+            return 1
+        print("✅ 기준 대비 느려진 모드 없음")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
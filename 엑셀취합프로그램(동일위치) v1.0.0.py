@@ -1,113 +1,200 @@
 # !pip install openpyxl
 import os
 import shutil
+from bisect import bisect_right
 import openpyxl
 from openpyxl.styles import PatternFill
 
-# 병합된 셀인지 확인하는 함수
-def is_merged_cell(cell):
+# 'stream': read_only 모드로 행을 하나씩 읽으며 비교 (파일당 메모리 1행), 'full': 파일 전체를 딕셔너리로 읽어 비교
+ENGINE = 'stream'
+
+############################## merged_index: 병합 셀 색인 ##############################
+# 병합 범위를 행별 열 구간으로 한 번만 색인 (셀마다 전체 병합 범위를 훑지 않음)
+def build_merged_index(ws):
+    """{row: ([구간 시작 열...], [(시작 열, 끝 열, 왼쪽 위 셀 좌표)...])} (시작 열 순 정렬)"""
+    merged_index = {}
     for merged_range in ws.merged_cells.ranges:
-        if cell.coordinate in merged_range:
-            return True
-    return False
-
-path = os.getcwd()
-ori_folder_path = os.path.join(path, '양식')
-ori_file = os.listdir(ori_folder_path)[0]
-ok_folder_path = os.path.join(path, '완료')
-check_folder_path = os.path.join(path, '검토')
-# 취합할 파일들
-files_folder_path = os.path.join(path, '취합')
-# 폴더가 없으면 생성
-for p in [ori_folder_path, ok_folder_path, check_folder_path, files_folder_path]:
-    if not os.path.exists(p):
-        os.makedirs(p, exist_ok=True)
-files_list = os.listdir(files_folder_path)
+        anchor = (merged_range.min_row, merged_range.min_col)
+        for row in range(merged_range.min_row, merged_range.max_row + 1):
+            merged_index.setdefault(row, []).append((merged_range.min_col, merged_range.max_col, anchor))
+    for row, intervals in merged_index.items():
+        intervals.sort()
+        merged_index[row] = ([interval[0] for interval in intervals], intervals)
+    return merged_index
+
+# 병합된 셀이면 병합 범위의 왼쪽 위 셀 좌표, 아니면 None
+def merged_anchor(merged_index, row, col):
+    bucket = merged_index.get(row)
+    if bucket is None:
+        return None
+    starts, intervals = bucket
+    i = bisect_right(starts, col) - 1
+    if i >= 0 and col <= intervals[i][1]:
+        return intervals[i][2]
+    return None
+
+# 병합 범위 안의 셀 중 값을 쓸 수 없는 셀(왼쪽 위 셀 제외)인지 확인하는 함수
+def is_covered_cell(merged_index, key):
+    anchor = merged_anchor(merged_index, *key)
+    return anchor is not None and anchor != key
 
 ############################## ori_cell_dict: 양식 정보 딕셔너리 ##############################
-ori_path = os.path.join(ori_folder_path, ori_file)
-# ori_df = pd.read_excel(ori_path, header=k)
-
-ori_wb = openpyxl.load_workbook(ori_path)
-ori_ws = ori_wb.active
-
-# 셀 값을 딕셔너리로 변환
-ori_cell_dict = {}
-for row in ori_ws.iter_rows(min_row=1, max_row=ori_ws.max_row, min_col=1, max_col=ori_ws.max_column):
-    for cell in row:
-        ori_cell_dict[(cell.row, cell.column)] = cell.value
-# print(ori_cell_dict)
-
-############################## out_cell_dict: 결과 정보 딕셔너리 ##############################
-# 값만 None으로 변경
-out_cell_dict = {key: None for key in ori_cell_dict}
-# print(out_cell_dict)
-
-############################## flag_cell_dict: 플래그 정보 딕셔너리 ##############################
-flag_cell_dict = out_cell_dict.copy()
-# print(flag_cell_dict)
+def load_template(ori_path):
+    ori_wb = openpyxl.load_workbook(ori_path)
+    ori_ws = ori_wb.active
+
+    # 셀 값을 딕셔너리로 변환
+    ori_cell_dict = {}
+    for row in ori_ws.iter_rows(min_row=1, max_row=ori_ws.max_row, min_col=1, max_col=ori_ws.max_column):
+        for cell in row:
+            ori_cell_dict[(cell.row, cell.column)] = cell.value
+    # print(ori_cell_dict)
+    return ori_wb, ori_ws, ori_cell_dict
 
 ############################## cell_dict: 취합할 파일 정보 딕셔너리 ##############################
-############### 파일별 for문 작업 ###############
-for f in files_list:
-
-    try:
-        file_path = os.path.join(files_folder_path, f)
-        if f[:2] == '(군':
-            pass
-        wb = openpyxl.load_workbook(file_path, data_only=True)
-        ws = wb.active
-        
-        # 셀 값을 딕셔너리로 변환
-        cell_dict = {}
-        for row in ws.iter_rows(min_row=1, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
-            for cell in row:
-                cell_dict[(cell.row, cell.column)] = cell.value
-        # print(cell_dict)
-
-        # ori_cell_dict, cell_dict이 키가 동일하고 값이 다른 경우 out_cell_dict, flag_cell_dict 갱신
-        for key in cell_dict:
-            if (cell_dict[key] != ori_cell_dict[key]):    # 원본과 값이 다르면
-                if (flag_cell_dict[key] is None):         # 덮어쓴 적 없으면
-                    if ori_cell_dict[key] is None:
+def read_cells(file_path):
+    wb = openpyxl.load_workbook(file_path, data_only=True)
+    ws = wb.active
+
+    # 셀 값을 딕셔너리로 변환
+    cell_dict = {}
+    for row in ws.iter_rows(min_row=1, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
+        for cell in row:
+            cell_dict[(cell.row, cell.column)] = cell.value
+    # print(cell_dict)
+    return cell_dict
+
+# ori_cell_dict, cell_dict이 키가 동일하고 값이 다른 경우 out_cell_dict, flag_cell_dict 갱신
+# 덮어쓴 적 있는 셀을 만나면 그 셀 좌표 반환 (없으면 None)
+def merge_cells(f, cell_dict, ori_cell_dict, out_cell_dict, flag_cell_dict, merged_index):
+    for key in cell_dict:
+        if is_covered_cell(merged_index, key):       # 병합된 셀(왼쪽 위 셀 제외)은 값을 쓸 수 없으므로 비교하지 않음
+            continue
+        if (cell_dict[key] != ori_cell_dict[key]):    # 원본과 값이 다르면
+            if (flag_cell_dict[key] is None):         # 덮어쓴 적 없으면
+                if ori_cell_dict[key] is None:
+                    out_cell_dict[key] = cell_dict[key]      # 덮어쓰기
+                    flag_cell_dict[key] = (1, f)             # flag에 덮어썼다는 의미의 1 삽입 // flag의 값은 None(덮어쓰지않음) 또는 1(덮어씀)
+                else:
+                    if (str(ori_cell_dict[key])[:1] != '='):     # 덮어쓴 적 없으면(수식 셀이 아닐 때)
                         out_cell_dict[key] = cell_dict[key]      # 덮어쓰기
                         flag_cell_dict[key] = (1, f)             # flag에 덮어썼다는 의미의 1 삽입 // flag의 값은 None(덮어쓰지않음) 또는 1(덮어씀)
                     else:
-                        if (str(ori_cell_dict[key])[:1] != '='):     # 덮어쓴 적 없으면(수식 셀이 아닐 때)
-                            out_cell_dict[key] = cell_dict[key]      # 덮어쓰기
-                            flag_cell_dict[key] = (1, f)             # flag에 덮어썼다는 의미의 1 삽입 // flag의 값은 None(덮어쓰지않음) 또는 1(덮어씀)
-                        else:
-                            pass
-                else:                                   # 덮어쓴 적 있으면 이 파일 검토 폴더로 이동(shutil.move) 후 다음 파일로 넘어가기
-                    break
-        else:           # 위 for문이 무사히 break 없이 실행됐다면,
-            shutil.move(os.path.join(files_folder_path, f), os.path.join(ok_folder_path, f))
-            continue    # 다음 파일로
-
-        # 위 for문이 break에 걸렸다면,
-        shutil.move(os.path.join(files_folder_path, f), os.path.join(check_folder_path, f'{f}_{flag_cell_dict[key][1]}'))
-
-    except:
-        continue
+                        pass
+            else:                                   # 덮어쓴 적 있으면 이 파일 검토 폴더로 이동(shutil.move) 후 다음 파일로 넘어가기
+                return key
+    return None
+
+############################## stream: 행 단위 비교 ##############################
+# read_only 모드로 활성 시트의 행을 하나씩 반환: (행 번호, 값 튜플)
+def iter_rows_stream(file_path):
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        for row, values in enumerate(ws.iter_rows(values_only=True), 1):
+            yield row, values
+    finally:
+        wb.close()
+
+# 행이 들어오는 대로 양식과 비교
+# - 양식 범위 밖의 셀은 빈 셀(None)과 비교 (값이 있으면 변경으로 취급)
+# - 변경 사항은 pending에 모았다가 파일 전체에 충돌이 없을 때만 out_cell_dict, flag_cell_dict에 반영
+# - 덮어쓴 적 있는 셀을 만나면 바로 중단하고 그 셀 좌표 반환 (없으면 None)
+def merge_rows_stream(f, rows, ori_cell_dict, out_cell_dict, flag_cell_dict, merged_index):
+    pending = {}
+    for row, values in rows:
+        for col, value in enumerate(values, 1):
+            key = (row, col)
+            ori_value = ori_cell_dict.get(key)
+            if value == ori_value or is_covered_cell(merged_index, key):
+                continue
+            if flag_cell_dict.get(key) is not None:     # 덮어쓴 적 있으면 중단
+                return key
+            if ori_value is not None and str(ori_value)[:1] == '=':     # 수식 셀
+                continue
+            pending[key] = value
+
+    for key, value in pending.items():
+        out_cell_dict[key] = value
+        flag_cell_dict[key] = (1, f)
+    return None
 
 ############################## 변경 셀 값을 적용 ##############################
-# 셀 값 적용
-# for (row, col), value in out_cell_dict.items():
-#     cell = ori_ws.cell(row=row, column=col)
-#     if not is_merged_cell(cell):
-#         ori_ws.cell(row=row, column=col).value = value
-
-############################## 변경 셀 색을 파랑색으로 표시 ##############################
-# 파란색 배경 설정
-blue_fill = PatternFill(start_color="ADD8E6", end_color="ADD8E6", fill_type="solid")
-
-# 셀 서식 적용
-for (row, col), value in flag_cell_dict.items():
-    cell = ori_ws.cell(row=row, column=col)
-    if not is_merged_cell(cell) and value is not None:
-        ori_ws.cell(row=row, column=col).fill = blue_fill
-        ori_ws.cell(row=row, column=col).value = out_cell_dict[(row, col)]
-
-# 수정된 엑셀 파일 저장
-ori_wb.save('output.xlsx')
-
+def apply_changes(ori_ws, out_cell_dict, flag_cell_dict, merged_index):
+    # 파란색 배경 설정
+    blue_fill = PatternFill(start_color="ADD8E6", end_color="ADD8E6", fill_type="solid")
+
+    # 셀 값/서식 적용 (병합 범위는 왼쪽 위 셀에만)
+    for (row, col), value in flag_cell_dict.items():
+        if value is not None and not is_covered_cell(merged_index, (row, col)):
+            cell = ori_ws.cell(row=row, column=col)
+            cell.fill = blue_fill
+            cell.value = out_cell_dict[(row, col)]
+
+def save_result(ori_wb, output_path):
+    # 수정된 엑셀 파일 저장
+    ori_wb.save(output_path)
+
+
+def main(path=None, engine=ENGINE):
+    path = path or os.getcwd()
+    ori_folder_path = os.path.join(path, '양식')
+    ok_folder_path = os.path.join(path, '완료')
+    check_folder_path = os.path.join(path, '검토')
+    # 취합할 파일들
+    files_folder_path = os.path.join(path, '취합')
+    # 폴더가 없으면 생성
+    for p in [ori_folder_path, ok_folder_path, check_folder_path, files_folder_path]:
+        if not os.path.exists(p):
+            os.makedirs(p, exist_ok=True)
+    ori_file = os.listdir(ori_folder_path)[0]
+    files_list = os.listdir(files_folder_path)
+
+    ori_path = os.path.join(ori_folder_path, ori_file)
+    # ori_df = pd.read_excel(ori_path, header=k)
+    ori_wb, ori_ws, ori_cell_dict = load_template(ori_path)
+    merged_index = build_merged_index(ori_ws)
+
+    ############################## out_cell_dict: 결과 정보 딕셔너리 ##############################
+    # 값만 None으로 변경
+    out_cell_dict = {key: None for key in ori_cell_dict}
+    # print(out_cell_dict)
+
+    ############################## flag_cell_dict: 플래그 정보 딕셔너리 ##############################
+    flag_cell_dict = out_cell_dict.copy()
+    # print(flag_cell_dict)
+
+    ############### 파일별 for문 작업 ###############
+    for f in files_list:
+
+        try:
+            file_path = os.path.join(files_folder_path, f)
+            if f[:2] == '(군':
+                pass
+            if engine == 'stream':
+                rows = iter_rows_stream(file_path)
+                try:
+                    key = merge_rows_stream(f, rows, ori_cell_dict, out_cell_dict, flag_cell_dict, merged_index)
+                finally:
+                    rows.close()    # 중간에 멈춰도 파일 닫기
+            else:
+                cell_dict = read_cells(file_path)
+                key = merge_cells(f, cell_dict, ori_cell_dict, out_cell_dict, flag_cell_dict, merged_index)
+            if key is None:     # 덮어쓴 셀과 겹치지 않았다면,
+                shutil.move(os.path.join(files_folder_path, f), os.path.join(ok_folder_path, f))
+                continue    # 다음 파일로
+
+            # 덮어쓴 셀과 겹쳤다면,
+            shutil.move(os.path.join(files_folder_path, f), os.path.join(check_folder_path, f'{f}_{flag_cell_dict[key][1]}'))
+
+        except:
+            continue
+
+    ############################## 변경 셀 색을 파랑색으로 표시 ##############################
+    apply_changes(ori_ws, out_cell_dict, flag_cell_dict, merged_index)
+
+    save_result(ori_wb, os.path.join(path, 'output.xlsx'))
+
+
+if __name__ == "__main__":
+    main()